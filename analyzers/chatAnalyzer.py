@@ -1,119 +1,156 @@
 import pickle
 import time
 from datetime import datetime
+from queue import Empty
 from threading import Thread
-import re
-
-from numpy import array
 
 from data_structure import gameStatus
+from data_structure.gameEvents import parseEvent, GameStarted, GameFinished, StageChanged, EmergencyCalled, \
+    Condemned, Shot, Hit
 from nlp import preprocessing
-from sklearn.feature_extraction.text import TfidfVectorizer
+from nlp.classificationCache import sharedClassifier
 
 
-def chatAnalysis(vectorizer, model_misogyny):
+def chatAnalysis(classifier, received):
     """
     Analyze every chat's message to update information about the game and all the players' actions
     Also analyze every message from other player to determine if it contains offensive language or not
-    :param vectorizer: tfidf_vectorizer
-    :param model_misogyny: prediction model
+    :param classifier: misogyny classifier with its cache (see nlp.classificationCache)
+    :param received: the message, a pair (line, monotonic timestamp)
     """
-    received = gameStatus.sharedList.pop()  # è coppia stringa timestamp
-    received_str = received[0]
-    received_time = received[1]
-    # print('\n TIME: ' + str(received_time) + '\n')
-    tmp = re.split(' |\n', received_str)
-    if tmp[0] == '#GLOBAL':
-        if tmp[1] == '@GameServer':
-            None
-            # notifiche di sistema
-    else:
-        if tmp[1] == '@GameServer':
-            # notifiche del server relative alla partita
-            if tmp[2] == 'Now':
-                gameStatus.game.state = 'ACTIVE'
-            if tmp[2] == 'Game':
-                gameStatus.game.state = 'FINISHED'
-            if tmp[2] == 'Hunting':
-                gameStatus.game.stage = 1
-                # 654324 @GameServer Hunting season open!
-            if tmp[2] == 'You':
-                gameStatus.game.stage = 2
-                # 104223 @GameServer You can now catch the flag!
-            if tmp[2] == 'EMERGENCY':
-                if tmp[4] == 'Called':
-                    gameStatus.game.emergencyMeeting = 1
-                    # EM, fai votare karen
-                if tmp[4] == 'condamned':
-                    # espulso da EM, metti a KILLED il suo stato
-                    if gameStatus.game.me.name == tmp[5]:
-                        gameStatus.game.me.state = 'KILLED'
-
-                    for i in gameStatus.game.allies.keys():
-                        if gameStatus.game.allies.get(i).name == tmp[5]:
-                            gameStatus.game.allies.get(i).state = 'KILLED'
-                            break
-                    for i in gameStatus.game.enemies.keys():
-                        if gameStatus.game.enemies.get(i).name == tmp[5]:
-                            gameStatus.game.enemies.get(i).state = 'KILLED'
-
-                            break
-
-            if tmp[3] == 'shot':
-                # aggiungo 'spara' a lista azioni player
-                if gameStatus.game.allies.get(tmp[2]) is not None:
-                    gameStatus.game.allies.get(tmp[2]).actionList.append(0)    #(tmp[4], received_time))
-
-                elif gameStatus.game.enemies.get(tmp[2]) is not None:
-                    gameStatus.game.enemies.get(tmp[2]).actionList.append(0)   #(tmp[4], received_time))
-
-
-            if tmp[3] == 'hit':
-                # 654324 @GameServer pinko2 hit pinko
-                # aggiungo pinko a lista killed di pinko2
-
-                if gameStatus.game.allies.get(tmp[2]) is not None:
-                    gameStatus.game.allies.get(tmp[2]).kills.append((tmp[4], received_time))
-
-                elif gameStatus.game.enemies.get(tmp[2]) is not None:
-                    gameStatus.game.enemies.get(tmp[2]).kills.append((tmp[4], received_time))
-
-                if gameStatus.game.me.name == tmp[4]:
-                    gameStatus.game.me.state = 'KILLED'
-
-                for i in gameStatus.game.allies.keys():
-                    if gameStatus.game.allies.get(i).name == tmp[4]:
-                        gameStatus.game.allies.get(i).state = 'KILLED'
-
-                        break
-                for i in gameStatus.game.enemies.keys():
-                    if gameStatus.game.enemies.get(i).name == tmp[4]:
-                        gameStatus.game.enemies.get(i).state = 'KILLED'
-
-                        break
-                # aggiorna status del giocatore ucciso in MORTO
+    event = parseEvent(received[0], received[1])
+    if event is not None:
+        # notifiche del server relative alla partita, ai gestori iscritti (vedi GAME_HANDLERS)
+        gameStatus.game.events.dispatch(event)
 
-        else:
-            # messaggi player
-            preprocessed = preprocessing.pre_process(received_str.lower(), False)
-            sentence = vectorizer.transform([preprocessed]).toarray()
-
-            # 1 offensive, 0 not offensive
-            is_offensive = int(model_misogyny.predict(array(sentence).reshape(1, -1))[0])
-
-            for k in gameStatus.game.allies.keys():
-                if gameStatus.game.allies.get(k).name == tmp[1]:
-                    gameStatus.game.allies.get(k).messages.append((received_str, received_time))
-                    if is_offensive == 1:
-                        gameStatus.game.allies.get(k).offensivePlayer = True
-                    break
+    elif isPlayerMessage(received):
+        # messaggi player
+        classifyMessages(classifier, [received])
 
-            for k in gameStatus.game.enemies.keys():
-                if gameStatus.game.enemies.get(k).name == tmp[1]:
-                    gameStatus.game.enemies.get(k).messages.append((received_str, received_time))
-                    if is_offensive == 1:
-                        gameStatus.game.enemies.get(k).offensivePlayer = True
-                    break
+
+def killPlayer(name):
+    """
+    Set to KILLED the state of a player (or Karen).
+    """
+    if gameStatus.game.me.name == name:
+        gameStatus.game.me.state = 'KILLED'
+
+    player = gameStatus.game.playerByName(name)
+    if player is not None:
+        player.state = 'KILLED'
+
+
+def onGameStarted(event):
+    gameStatus.game.state = 'ACTIVE'
+
+
+def onGameFinished(event):
+    gameStatus.game.state = 'FINISHED'
+
+
+def onStageChanged(event):
+    # 654324 @GameServer Hunting season open! -> 1, 104223 @GameServer You can now catch the flag! -> 2
+    gameStatus.game.stage = event.stage
+
+
+def onEmergencyCalled(event):
+    # EM, fai votare karen
+    gameStatus.game.emergencyMeeting = 1
+
+
+def onCondemned(event):
+    # espulso da EM, metti a KILLED il suo stato
+    killPlayer(event.name)
+
+
+def onShot(event):
+    # aggiungo 'spara' a lista azioni player
+    shooter = gameStatus.game.playerByName(event.shooter)
+    if shooter is not None and shooter is not gameStatus.game.me:
+        shooter.actionList.append(0)
+
+
+def onHit(event):
+    # 654324 @GameServer pinko2 hit pinko: aggiungo pinko a lista killed di pinko2 e lo metto a KILLED
+    shooter = gameStatus.game.playerByName(event.shooter)
+    if shooter is not None and shooter is not gameStatus.game.me:
+        shooter.kills.append((event.target, event.time))
+    killPlayer(event.target)
+
+
+# the handlers that keep gameStatus.game up to date
+GAME_HANDLERS = [(GameStarted, onGameStarted),
+                 (GameFinished, onGameFinished),
+                 (StageChanged, onStageChanged),
+                 (EmergencyCalled, onEmergencyCalled),
+                 (Condemned, onCondemned),
+                 (Shot, onShot),
+                 (Hit, onHit)]
+
+
+def subscribeGameHandlers(dispatcher):
+    """
+    Subscribe the GAME_HANDLERS to the events of a game.
+    :param dispatcher: the eventDispatcher of the game (Game.events).
+    """
+    for eventType, handler in GAME_HANDLERS:
+        dispatcher.subscribe(eventType, handler)
+
+
+def isPlayerMessage(received):
+    """
+    :param received: the message, a pair (line, monotonic timestamp)
+    :return: True if it is a message of a player in a game channel (the ones to classify), False ow.
+    """
+    tmp = received[0].split(' ', 2)
+    return len(tmp) == 3 and tmp[0] != '#GLOBAL' and tmp[1] != '@GameServer'
+
+
+def classifyMessages(classifier, messages):
+    """
+    Classify a batch of player messages with one predict, and record them in their senders.
+    :param classifier: misogyny classifier with its cache (see nlp.classificationCache)
+    :param messages: list of pairs (line, monotonic timestamp)
+    """
+    if len(messages) == 0:
+        return
+    # the whole lowercased line is classified, as always; the cache is keyed by the text alone, without channel and
+    # sender, so the same line from anyone hits it
+    preprocessed = [preprocessing.pre_process(received[0].lower(), False) for received in messages]
+    keys = [received[0].split(' ', 2)[2] for received in messages]
+    offensive = classifier.predict(preprocessed, keys)
+
+    for received, is_offensive in zip(messages, offensive):
+        # 1 offensive, 0 not offensive
+        recordMessage(received, int(is_offensive))
+
+
+def recordMessage(received, is_offensive):
+    """
+    Add a classified message to its sender.
+    :param received: the message, a pair (line, monotonic timestamp)
+    :param is_offensive: 1 offensive, 0 not offensive
+    """
+    sender = gameStatus.game.playerByName(received[0].split(' ', 2)[1])
+    if sender is not None and sender is not gameStatus.game.me:
+        sender.messages.append(received)
+        if is_offensive == 1:
+            sender.offensivePlayer = True
+
+
+def analyzeMessages(classifier, messages):
+    """
+    Analyze a batch of messages: the game notifications in order, then all the player messages in a single
+    classification.
+    :param messages: list of pairs (line, monotonic timestamp)
+    """
+    players = []
+    for received in messages:
+        if isPlayerMessage(received):
+            players.append(received)
+        else:
+            chatAnalysis(classifier, received)
+    classifyMessages(classifier, players)
 
 
 def load_file(filename):
@@ -126,17 +163,21 @@ def load_file(filename):
 class chatAnalyzer(Thread):
     def __init__(self, name):
         Thread.__init__(self)
-        self.model_misoginy = load_file('nlp/model_english_log_reg_tfidf.pk')
+        # the compiled linear scorer when available (sklearn is imported only as a fallback), behind the LRU cache
+        # shared by the Karens of this process
+        self.classifier = sharedClassifier()
         self.name = name
-        self.vectorizer = load_file('nlp/vectorizer.pk')
 
     def run(self):
         dt1 = datetime.now()
         t1 = dt1.time()
 
         while True:
-            time.sleep(0.1)
-
-            # If something arrives in chat, analyze it
-            if len(gameStatus.sharedList) > 0:
-                chatAnalysis(self.vectorizer, self.model_misoginy)
+            # wake up as soon as something arrives in chat, then take everything that is pending
+            pending = [gameStatus.chatQueue.get()]
+            while True:
+                try:
+                    pending.append(gameStatus.chatQueue.get_nowait())
+                except Empty:
+                    break
+            analyzeMessages(self.classifier, pending)
@@ -1,15 +1,15 @@
 import time
-import pickle
 from threading import Thread
 from numpy import array
-import tensorflow as tf
-
-from keras.utils import to_categorical
 from scipy.spatial import distance
 
+from analyzers.models import lstmModel
 from data_structure import gameStatus
 from strategy.onMapFunctions import findFireLineCoordinateForKilling
 
+# code of the recharge cells in gameStatus.game.serverGrid
+RECHARGE = ord("$")
+
 
 
 
@@ -110,7 +110,7 @@ def aroundMeSituation(maxWeight):
             # if (gameStatus.game.me.symbol == "A"):
             #    print("fine: " + str(time.time()))
 
-            if gameStatus.game.serverMap[i][j] == "$":
+            if gameStatus.game.serverGrid[i, j] == RECHARGE:
                 manhattan = distance.cityblock([myx, myy], [j, i])
                 if nearestRecharge[0] > manhattan:
                     nearestRecharge = [int(manhattan), j, i]
@@ -187,6 +187,9 @@ def nextActionsPrediction(model):
     """
     Calculate the prediction looking at other player's actions and update the actual players behaviour
     """
+    # keras (and TensorFlow behind it) is loaded by the first prediction, not by importing the analyzer
+    from keras.utils import to_categorical
+
     if gameStatus.game.stage is not 0:
         for k in gameStatus.game.enemies.keys():
             if len(gameStatus.game.enemies.get(k).actionList) > 0:
@@ -287,8 +290,8 @@ class gameAnalyzer(Thread):
     def run(self):
 
 
-        a_file = open("lstm_prediction\LSTM_model2.pickle", "rb")
-        model = pickle.load(a_file)
+        # loaded once per process (see analyzers/models.py)
+        model = lstmModel()
 
         while gameStatus.game.state == "ACTIVE":
 
@@ -0,0 +1,56 @@
+import os
+import pickle
+from threading import Lock
+
+from nlp.classificationCache import sharedClassifier
+
+"""
+The models of the analyzers, loaded once per process and shared by all the Karens in it (see launcher.py).
+"""
+
+LSTM_FILE = os.path.join('lstm_prediction', 'LSTM_model2.pickle')
+
+# the modules imported by the subsystems of Karen, loaded by preload
+# sklearn is not among them: the chat is scored by the compiled nlp/linearScorer, the pickled sklearn models (which
+# import it) are loaded only when the scorer has not been compiled
+HEAVY_MODULES = ['scipy.spatial', 'skfuzzy', 'skfuzzy.control', 'numpy', 'pathfinding']
+
+# TensorFlow starts its thread pools when it is imported: a process forked afterwards inherits them in an undefined
+# state, so it is loaded by every forked process on its own (the LSTM is unpickled at the first prediction)
+FORK_UNSAFE_MODULES = ['tensorflow', 'keras']
+
+# the subsystems that karen imports lazily, at their first use (see benchmarks/startupProfile.py)
+AGENT_MODULES = ['karen', 'analyzers.gameAnalyzer', 'analyzers.playersAnalyzer', 'data_structure.lookParser',
+                 'strategy.fuzzyStrategy', 'strategy.lowLevelStrategy', 'strategy.onMapFunctions',
+                 'strategy.pathFinder', 'connection.recorder']
+
+lstm = None
+lstmLock = Lock()
+
+
+def lstmModel():
+    """
+    :return: the LSTM model of nextActionsPrediction, unpickled on the first call.
+    """
+    global lstm
+    with lstmLock:
+        if lstm is None:
+            with open(LSTM_FILE, "rb") as fin:
+                lstm = pickle.load(fin)
+        return lstm
+
+
+def preload(beforeFork=False):
+    """
+    Import the heavy modules, the subsystems of Karen and load every model, so that the Karens of this process (or
+    the processes forked afterwards) share them.
+    :param beforeFork: True to load only what can be shared by forked processes: TensorFlow, keras and the LSTM are
+    left to every child.
+    """
+    for module in HEAVY_MODULES + AGENT_MODULES:
+        __import__(module)
+    if not beforeFork:
+        for module in FORK_UNSAFE_MODULES:
+            __import__(module)
+        lstmModel()
+    sharedClassifier()
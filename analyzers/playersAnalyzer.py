@@ -1,8 +1,9 @@
 from datetime import datetime
 from datetime import timedelta
 
-from threading import Thread
+from threading import Thread, Event
 from data_structure import gameStatus
+from data_structure.gameEvents import EmergencyCalled, GameFinished
 import time
 
 from strategy.pathFinder import findPath
@@ -114,6 +115,13 @@ class playersAnalyzer(Thread):
     def __init__(self, name):
         Thread.__init__(self)
         self.name = name
+        # set by an emergency meeting or by the end of the game, wakes up the analyzer
+        self.wakeUp = Event()
+        gameStatus.game.events.subscribe(EmergencyCalled, self.notify)
+        gameStatus.game.events.subscribe(GameFinished, self.notify)
+
+    def notify(self, event):
+        self.wakeUp.set()
 
     def run(self):
         dt1 = datetime.now()
@@ -131,4 +139,5 @@ class playersAnalyzer(Thread):
             # From time to time update social deduction
             if True:
                 turingTest(t1)
-            time.sleep(0.2)
+            self.wakeUp.wait(0.2)
+            self.wakeUp.clear()
@@ -0,0 +1,624 @@
+import random
+import time
+
+import numpy as np
+
+from data_structure import gameStatus
+from data_structure.gameStatus import Game, Player
+from scipy.spatial import distance
+
+from strategy.mapEngine import lineOfFire, symbolGrid, threatSpec, threatView, threatViews, weightsToMap
+from strategy.onMapFunctions import deterministicMap, deterministicImpostorMap, deterministicMaps, \
+    findFireLineCoordinateForKilling
+
+"""
+Equivalence check and benchmark of the weighted maps of the vectorized engine (strategy/mapEngine.py) against the old
+per-cell implementations, on random maps of the three sizes, also after the players moved over the static layer, and
+of the segment index against a walk from the shooter to the target.
+The loyal and impostor maps are updated incrementally from the previous ones: they must be the same as the maps computed
+from scratch, and the same as the references but where the reference kept the quarter weight of the first line painted
+on a cell also crossed by a half weight line (the strongest line wins in the engine). The views computed together in
+one pass must be the same as the ones computed one by one.
+The reference of findFireLineCoordinateForKilling searches its own map of the fire lines of the players to kill (the
+old one searched the loyal weighted map instead).
+Run from the repository root: python -m benchmarks.deterministicMap
+"""
+
+SIZES = {"0": 32, "1": 64, "2": 128}
+
+TERRAIN = ".........~~#@&!$"
+
+
+def referenceDeterministicMap(maxWeight):
+
+    value = [int(maxWeight / 2), int(maxWeight / 4)]
+    walkable = ["."]
+    river = ["~"]
+    trap = ["!"]
+    obstacles = ["#", "@"]
+    recharge = ["$"]
+    barrier = ["&"]
+    allies = gameStatus.game.allies.keys()
+    enemies = gameStatus.game.enemies.keys()
+    serverMap = list(gameStatus.game.serverMap)
+    weightedMap = [list(row) for row in serverMap]
+
+    def recursiveMap(count, j, rec_weightedMap, weight):
+        """
+        Recursive map generation. Resamble Cellular Automata decision adding weight to the map consistently with the distance from enemies
+        :param count: the horizontal coordinate
+        :param j: the vertical coordinate
+        :param rec_weightedMap: the map
+        :param weight: the weight of being in [i:,:j] position
+        :return: a weighted map
+        """
+        # da  muro a nemico
+        for position in range(enemy.x, -1, -1):
+            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
+                    rec_weightedMap[count][position] not in list(allies):
+                if isinstance(rec_weightedMap[count][position], int) is False:
+                    rec_weightedMap[count][position] = weight
+            else:
+                break
+
+        # da nemico a muro
+        for position in range(enemy.x, len(rec_weightedMap[count])):
+            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
+                    rec_weightedMap[count][position] not in list(allies):
+                if isinstance(rec_weightedMap[count][position], int) is False:
+                    rec_weightedMap[count][position] = weight
+            else:
+                break
+
+        # Controllo per colonne
+        for position in range(enemy.y, -1, -1):
+            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
+                    rec_weightedMap[position][j] not in list(allies):
+                if isinstance(rec_weightedMap[position][j], int) is False:
+                    rec_weightedMap[position][j] = weight
+            else:
+                break
+        # print("POS ENEMY: " + str(enemy.x) + " " +str(enemy.y) +  "j value : " + str(j) + " max for value " + str(len(rec_weightedMap[j])))
+        for position in range(enemy.y, len(rec_weightedMap)):
+            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
+                    rec_weightedMap[position][j] not in list(allies):
+                if isinstance(rec_weightedMap[position][j], int) is False:
+                    rec_weightedMap[position][j] = weight
+            else:
+                break
+
+        return rec_weightedMap
+
+    # ---------------------------------------------------------------------------------------------------
+    # For each enemy that is still alive, create a weighted map assigning value to all the position in the map around the enemy
+    for enemykey in gameStatus.game.enemies.keys():
+        enemy = gameStatus.game.enemies.get(enemykey)
+        if enemy.state == "ACTIVE":
+            # First call to assign weight to the enemy's 'x column' and 'y row' coordinate
+            weightedMap = recursiveMap(enemy.y, enemy.x, weightedMap, int(maxWeight / 2))
+
+            # Recursive calls giving the already weighted to assign weight to all the coordinate around the enemy player
+            if enemy.y - 1 >= 0:
+                if enemy.x - 1 >= 0:
+                    weightedMap = recursiveMap(enemy.y - 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
+                if enemy.x + 1 < gameStatus.game.mapWidth:
+                    weightedMap = recursiveMap(enemy.y - 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
+
+            if enemy.y + 1 < gameStatus.game.mapHeight:
+                if enemy.x - 1 >= 0:
+                    weightedMap = recursiveMap(enemy.y + 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
+                if enemy.x + 1 < len(weightedMap[0]):
+                    weightedMap = recursiveMap(enemy.y + 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
+
+    # For each position, assign different weight considering their nature
+    for i in range(0, gameStatus.game.mapHeight):
+        for j in range(0, gameStatus.game.mapWidth):
+
+            if weightedMap[i][j] in value:
+                None
+
+            elif serverMap[i][j] in walkable:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] in river:
+                weightedMap[i][j] = int(maxWeight / 3)
+
+            elif serverMap[i][j] in trap:
+                weightedMap[i][j] = int(maxWeight)
+
+            elif serverMap[i][j] in obstacles:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] in recharge:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] in barrier:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] == gameStatus.game.wantedFlagName:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] == gameStatus.game.toBeDefendedFlagName:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] in allies or serverMap[i][j] in enemies or serverMap[i][
+                j] == gameStatus.game.me.symbol:
+                weightedMap[i][j] = 1
+
+    return weightedMap
+
+
+def referenceDeterministicImpostorMap(maxWeight):
+
+    value = [int(maxWeight / 2), int(maxWeight / 4)]
+    walkable = ["."]
+    river = ["~"]
+    trap = ["!"]
+    obstacles = ["#", "@"]
+    recharge = ["$"]
+    barrier = ["&"]
+    enemies = gameStatus.game.allies.keys()
+    allies = gameStatus.game.enemies.keys()
+    serverMap = list(gameStatus.game.serverMap)
+    weightedMap = [list(row) for row in serverMap]
+
+    def recursiveMap(count, j, rec_weightedMap, weight):
+        """
+        Recursive map generation. Resamble Cellular Automata decision adding weight to the map consistently with the distance from enemies
+        :param count: the horizontal coordinate
+        :param j: the vertical coordinate
+        :param rec_weightedMap: the map
+        :param weight: the weight of being in [i:,:j] position
+        :return: a weighted map
+        """
+        # da  muro a nemico
+        for position in range(enemy.x, -1, -1):
+            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
+                    rec_weightedMap[count][position] not in list(allies):
+                if isinstance(rec_weightedMap[count][position], int) is False:
+                    rec_weightedMap[count][position] = weight
+            else:
+                break
+
+        # da nemico a muro
+        for position in range(enemy.x, len(rec_weightedMap[count])):
+            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
+                    rec_weightedMap[count][position] not in list(allies):
+                if isinstance(rec_weightedMap[count][position], int) is False:
+                    rec_weightedMap[count][position] = weight
+            else:
+                break
+
+        # Controllo per colonne
+        for position in range(enemy.y, -1, -1):
+            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
+                    rec_weightedMap[position][j] not in list(allies):
+                if isinstance(rec_weightedMap[position][j], int) is False:
+                    rec_weightedMap[position][j] = weight
+            else:
+                break
+        # print("POS ENEMY: " + str(enemy.x) + " " +str(enemy.y) +  "j value : " + str(j) + " max for value " + str(len(rec_weightedMap[j])))
+        for position in range(enemy.y, len(rec_weightedMap)):
+            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
+                    rec_weightedMap[position][j] not in list(allies):
+                if isinstance(rec_weightedMap[position][j], int) is False:
+                    rec_weightedMap[position][j] = weight
+            else:
+                break
+
+        return rec_weightedMap
+
+    # ---------------------------------------------------------------------------------------------------
+    # For each enemy that is still alive, create a weighted map assigning value to all the position in the map around the enemy
+    for enemykey in gameStatus.game.allies.keys():
+        enemy = gameStatus.game.allies.get(enemykey)
+        if enemy.state == "ACTIVE":
+            # First call to assign weight to the enemy's 'x column' and 'y row' coordinate
+            weightedMap = recursiveMap(enemy.y, enemy.x, weightedMap, int(maxWeight / 2))
+
+            # Recursive calls giving the already weighted to assign weight to all the coordinate around the enemy player
+            if enemy.y - 1 >= 0:
+                if enemy.x - 1 >= 0:
+                    weightedMap = recursiveMap(enemy.y - 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
+                if enemy.x + 1 < gameStatus.game.mapWidth:
+                    weightedMap = recursiveMap(enemy.y - 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
+
+            if enemy.y + 1 < gameStatus.game.mapHeight:
+                if enemy.x - 1 >= 0:
+                    weightedMap = recursiveMap(enemy.y + 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
+                if enemy.x + 1 < len(weightedMap[0]):
+                    weightedMap = recursiveMap(enemy.y + 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
+
+    # For each position, assign different weight considering their nature
+    for i in range(0, gameStatus.game.mapHeight):
+        for j in range(0, gameStatus.game.mapWidth):
+
+            if weightedMap[i][j] in value:
+                None
+
+            elif serverMap[i][j] in walkable:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] in river:
+                weightedMap[i][j] = int(maxWeight / 3)
+
+            elif serverMap[i][j] in trap:
+                weightedMap[i][j] = int(maxWeight)
+
+            elif serverMap[i][j] in obstacles:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] in recharge:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] in barrier:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] == gameStatus.game.wantedFlagName:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] == gameStatus.game.toBeDefendedFlagName:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] in allies or serverMap[i][j] in enemies or serverMap[i][
+                j] == gameStatus.game.me.symbol:
+                weightedMap[i][j] = 1
+
+    return weightedMap
+
+
+def referenceFindFireLineCoordinateForKilling(playerList):
+
+    walkable = ["."]
+    river = ["~"]
+    trap = ["!"]
+    obstacles = ["#", "@"]
+    recharge = ["$"]
+    barrier = ["&"]
+    allies = gameStatus.game.allies.keys()
+    enemies = playerList
+    serverMap = list(gameStatus.game.serverMap)
+    weightedMap = [list(row) for row in serverMap]
+    maxWeight = 32
+    value = [int(maxWeight / 2), int(maxWeight / 4)]
+
+    def recursiveMap(count, j, rec_weightedMap, weight):
+        """
+        Recursive map generation. Resamble Cellular Automata decision adding weight to the map consistently with the distance from enemies
+        :param count: the horizontal coordinate
+        :param j: the vertical coordinate
+        :param rec_weightedMap: the map
+        :param weight: the weight of being in [i:,:j] position
+        :return: a weighted map
+        """
+        # da  muro a nemico
+        for position in range(enemy.x, -1, -1):
+            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
+                    rec_weightedMap[count][position] not in list(allies):
+                if isinstance(rec_weightedMap[count][position], int) is False:
+                    rec_weightedMap[count][position] = weight
+            else:
+                break
+
+        # da nemico a muro
+        for position in range(enemy.x, len(rec_weightedMap[count])):
+            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
+                    rec_weightedMap[count][position] not in list(allies):
+                if isinstance(rec_weightedMap[count][position], int) is False:
+                    rec_weightedMap[count][position] = weight
+            else:
+                break
+
+        # Controllo per colonne
+        for position in range(enemy.y, -1, -1):
+            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
+                    rec_weightedMap[position][j] not in list(allies):
+                if isinstance(rec_weightedMap[position][j], int) is False:
+                    rec_weightedMap[position][j] = weight
+            else:
+                break
+        # print("POS ENEMY: " + str(enemy.x) + " " +str(enemy.y) +  "j value : " + str(j) + " max for value " + str(len(rec_weightedMap[j])))
+        for position in range(enemy.y, len(rec_weightedMap)):
+            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
+                    rec_weightedMap[position][j] not in list(allies):
+                if isinstance(rec_weightedMap[position][j], int) is False:
+                    rec_weightedMap[position][j] = weight
+            else:
+                break
+
+        return rec_weightedMap
+
+    # ---------------------------------------------------------------------------------------------------
+    # For each enemy that is still alive, create a weighted map assigning value to all the position in the map around the enemy
+    for enemykey in enemies:
+        enemy = gameStatus.game.enemies.get(enemykey)
+        if enemy.state == "ACTIVE":
+            # First call to assign weight to the enemy's 'x column' and 'y row' coordinate
+            weightedMap = recursiveMap(enemy.y, enemy.x, weightedMap, int(maxWeight / 2))
+
+
+    # For each position, assign different weight considering their nature
+    for i in range(0, gameStatus.game.mapHeight):
+        for j in range(0, gameStatus.game.mapWidth):
+
+            if weightedMap[i][j] in value:
+                None
+
+            elif serverMap[i][j] in walkable:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] in river:
+                weightedMap[i][j] = int(maxWeight / 3)
+
+            elif serverMap[i][j] in trap:
+                weightedMap[i][j] = int(maxWeight)
+
+            elif serverMap[i][j] in obstacles:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] in recharge:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] in barrier:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] == gameStatus.game.wantedFlagName:
+                weightedMap[i][j] = 1
+
+            elif serverMap[i][j] == gameStatus.game.toBeDefendedFlagName:
+                weightedMap[i][j] = 0
+
+            elif serverMap[i][j] in allies or serverMap[i][j] in enemies or serverMap[i][
+                j] == gameStatus.game.me.symbol:
+                weightedMap[i][j] = 1
+
+    coordinateForKilling = [gameStatus.game.mapWidth, 0, 0]
+    for i in range(0, gameStatus.game.mapHeight):
+       for j in range(0, gameStatus.game.mapWidth):
+
+        if weightedMap[i][j] == maxWeight / 2:
+            manhattan = distance.cityblock([gameStatus.game.toBeDefendedFlagX, gameStatus.game.toBeDefendedFlagY], [j, i])
+            if  coordinateForKilling[0] > int(manhattan):
+                coordinateForKilling = [int(manhattan), j, i]
+
+    return coordinateForKilling[1], coordinateForKilling[2]
+
+
+def randomGame(size, rng):
+    """
+    :return: a Game on a random size x size map, with flags and up to 10 players per team placed on it (some of them
+    killed), plus the occasional symbol of an unknown player.
+    """
+    rows = [[rng.choice(TERRAIN) for _ in range(size)] for _ in range(size)]
+    game = Game("benchmark")
+    game.mapHeight = size
+    game.mapWidth = size
+
+    used = set()
+
+    def place(symbol):
+        x, y = rng.randrange(size), rng.randrange(size)
+        while (x, y) in used:
+            x, y = rng.randrange(size), rng.randrange(size)
+        used.add((x, y))
+        rows[y][x] = symbol
+        return x, y
+
+    game.me = Player("me")
+    game.me.symbol = "A"
+    game.me.state = "ACTIVE"
+    game.me.x, game.me.y = place("A")
+    game.indexPlayer(game.me, True)
+    upper = "BCDEFGHIJ"
+    lower = "abcdefghijk"
+    for symbol in upper[:rng.randint(0, 9)]:
+        ally = Player(symbol)
+        ally.symbol = symbol
+        ally.state = "ACTIVE"
+        ally.x, ally.y = place(symbol)
+        game.addPlayer(ally, True)
+    for symbol in lower[:rng.randint(1, 10)]:
+        enemy = Player(symbol)
+        enemy.symbol = symbol
+        enemy.state = "ACTIVE" if rng.random() < 0.8 else "KILLED"
+        enemy.x, enemy.y = place(symbol)
+        game.addPlayer(enemy, False)
+    if rng.random() < 0.3:
+        place("Z")
+
+    game.wantedFlagName = "x"
+    game.wantedFlagX, game.wantedFlagY = place("x")
+    game.toBeDefendedFlagName = "X"
+    game.toBeDefendedFlagX, game.toBeDefendedFlagY = place("X")
+
+    game.serverGrid = np.frombuffer("".join("".join(row) for row in rows).encode('ascii'),
+                                    dtype=np.uint8).reshape(size, size).copy()
+    return game
+
+
+def movePlayers(game, rng):
+    """
+    Move some players to a free cell of the map, leaving ground where they were, and kill or revive some enemies.
+    """
+    size = game.mapWidth
+    for player in list(game.bySymbol.values()):
+        if player.symbol in game.enemies and rng.random() < 0.1:
+            player.state = "KILLED" if player.state == "ACTIVE" else "ACTIVE"
+        if rng.random() < 0.5:
+            x, y = rng.randrange(size), rng.randrange(size)
+            if game.serverMap[y][x] == ".":
+                game.setCell(player.x, player.y, ".")
+                game.setCell(x, y, player.symbol)
+                player.x, player.y = x, y
+
+
+def stepPlayers(game, rng, share=1.0):
+    """
+    Move players to a free cell next to them, as in a turn of the game.
+    :param share: the probability that a player moves.
+    """
+    for player in list(game.bySymbol.values()):
+        if rng.random() >= share:
+            continue
+        x, y = rng.choice(((0, 1), (0, -1), (1, 0), (-1, 0)))
+        x, y = player.x + x, player.y + y
+        if 0 <= x < game.mapWidth and 0 <= y < game.mapHeight and game.serverMap[y][x] == ".":
+            game.setCell(player.x, player.y, ".")
+            game.setCell(x, y, player.symbol)
+            player.x, player.y = x, y
+
+
+def referenceCanHit(shooter, target):
+    """
+    Walk the cells from the shooter to the target.
+    """
+    serverMap = list(gameStatus.game.serverMap)
+    allies = gameStatus.game.allies.keys()
+    (x, y), (targetX, targetY) = shooter, target
+    if x != targetX and y != targetY:
+        return False
+    stepX = (targetX > x) - (targetX < x)
+    stepY = (targetY > y) - (targetY < y)
+    while True:
+        if serverMap[y][x] in "#&" or serverMap[y][x] in allies:
+            return False
+        if (x, y) == (targetX, targetY):
+            return True
+        x += stepX
+        y += stepY
+
+
+def sameHits(tries=50):
+    """
+    :return: True if segmentIndex.canHit agrees with the walk on random pairs of cells, many of them aligned.
+    """
+    segments, cuts = lineOfFire(gameStatus.game, gameStatus.game.allies.keys())
+    size = gameStatus.game.mapWidth
+    for _ in range(tries):
+        shooter = (random.randrange(size), random.randrange(size))
+        target = (random.randrange(size), random.randrange(size))
+        if random.random() < 0.5:
+            target = (shooter[0], target[1])
+        else:
+            target = (target[0], shooter[1])
+        if segments.canHit(shooter, target, cuts) != referenceCanHit(shooter, target):
+            return False
+    return True
+
+
+def sameWeights(engine, reference, maxWeight):
+    """
+    :return: True if the maps are the same but where the reference has a quarter weight and the engine a half one.
+    """
+    for engineRow, referenceRow in zip(engine, reference):
+        for cell, expected in zip(engineRow, referenceRow):
+            if cell != expected and (expected != int(maxWeight / 4) or cell != int(maxWeight / 2)):
+                return False
+    return len(engine) == len(reference)
+
+
+def scratchMap(maxWeight, hostile, blocking):
+    weights, _ = threatView(maxWeight, gameStatus.game, hostile.values(), blocking.keys())
+    return weightsToMap(weights, symbolGrid(gameStatus.game))
+
+
+def threatSpecs(maxWeight, runners):
+    """
+    :return: the views of the loyal Karen, of the impostor and of the runners to kill.
+    """
+    game = gameStatus.game
+    return [threatSpec(maxWeight, game.enemies.values(), game.allies.keys()),
+            threatSpec(maxWeight, game.allies.values(), game.enemies.keys()),
+            threatSpec(32, [game.enemies.get(k) for k in runners], game.allies.keys(), around=False)]
+
+
+def sameViews(maxWeight, runners):
+    """
+    :return: True if the views computed in one pass are the same as the ones computed one by one.
+    """
+    specs = threatSpecs(maxWeight, runners)
+    for (weights, painted), spec in zip(threatViews(gameStatus.game, specs), specs):
+        alone, alonePainted = threatView(spec.maxWeight, gameStatus.game, spec.hostile, spec.blocking, spec.around)
+        if not np.array_equal(weights, alone) or not np.array_equal(painted, alonePainted):
+            return False
+    return True
+
+
+def sameMaps(maxWeight):
+    """
+    :return: True if the engine and the references agree on the current game.
+    """
+    game = gameStatus.game
+    runners = [symbol for symbol in game.enemies.keys() if random.random() < 0.5]
+    loyal = deterministicMap(maxWeight)
+    impostor = deterministicImpostorMap(maxWeight)
+    return (loyal, impostor) == deterministicMaps(maxWeight) and sameViews(maxWeight, runners) and \
+        loyal == scratchMap(maxWeight, game.enemies, game.allies) and \
+        impostor == scratchMap(maxWeight, game.allies, game.enemies) and \
+        sameWeights(loyal, referenceDeterministicMap(maxWeight), maxWeight) and \
+        sameWeights(impostor, referenceDeterministicImpostorMap(maxWeight), maxWeight) and \
+        findFireLineCoordinateForKilling(runners) == referenceFindFireLineCoordinateForKilling(runners) and \
+        sameHits()
+
+
+def timing(function, maxWeight, repetitions):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        function(maxWeight)
+    return (time.perf_counter() - start) / repetitions * 1000
+
+
+def timingMoves(function, maxWeight, repetitions, rng, share=1.0):
+    """
+    :return: ms per call of a function called after every step of the players.
+    """
+    function(maxWeight)
+    spent = 0
+    for _ in range(repetitions):
+        stepPlayers(gameStatus.game, rng, share)
+        start = time.perf_counter()
+        function(maxWeight)
+        spent += time.perf_counter() - start
+    return spent / repetitions * 1000
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    for flag, size in SIZES.items():
+        different = 0
+        maps = 300
+        for _ in range(maps):
+            gameStatus.context().game = randomGame(size, rng)
+            maxWeight = rng.choice([32, 16, 10])
+            same = sameMaps(maxWeight)
+            for _ in range(3):
+                movePlayers(gameStatus.game, rng)
+                same = same and sameMaps(maxWeight)
+                stepPlayers(gameStatus.game, rng)
+                same = same and sameMaps(maxWeight)
+            if not same:
+                different += 1
+
+        gameStatus.context().game = randomGame(size, rng)
+        for name, reference, engine, hostile, blocking in (
+                ("loyal", referenceDeterministicMap, deterministicMap, "enemies", "allies"),
+                ("impostor", referenceDeterministicImpostorMap, deterministicImpostorMap, "allies", "enemies")):
+            before = timing(reference, 32, 20)
+            scratch = timingMoves(lambda maxWeight: scratchMap(maxWeight, getattr(gameStatus.game, hostile),
+                                                               getattr(gameStatus.game, blocking)), 32, 200, rng)
+            every = timingMoves(engine, 32, 200, rng)
+            some = timingMoves(engine, 32, 200, rng, 0.2)
+            print("size %s (%dx%d) %-8s reference %6.2f ms   from scratch %5.2f ms   incremental %5.2f ms "
+                  "(1 in 5 moving %5.2f ms)" % (flag, size, size, name, before, scratch, every, some))
+        apart = timingMoves(lambda maxWeight: (deterministicMap(maxWeight), deterministicImpostorMap(maxWeight)), 32,
+                            200, rng)
+        together = timingMoves(deterministicMaps, 32, 200, rng)
+        print("size %s (%dx%d) loyal and impostor maps: one by one %5.2f ms   together %5.2f ms"
+              % (flag, size, size, apart, together))
+        runners = list(gameStatus.game.enemies.keys())[::2]
+        alone = timing(lambda maxWeight: [threatView(spec.maxWeight, gameStatus.game, spec.hostile, spec.blocking,
+                                                     spec.around) for spec in threatSpecs(maxWeight, runners)], 32, 200)
+        together = timing(lambda maxWeight: threatViews(gameStatus.game, threatSpecs(maxWeight, runners)), 32, 200)
+        print("size %s (%dx%d) loyal, impostor and runner views: one by one %5.2f ms   in one pass %5.2f ms"
+              % (flag, size, size, alone, together))
+        print("size %s: %d/%d games different" % (flag, different, maps))
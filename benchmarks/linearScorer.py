@@ -0,0 +1,51 @@
+import random
+import time
+import warnings
+
+from nlp import preprocessing
+from nlp.linearScorer import linearScorer, sklearnClassifier
+
+"""
+Check and benchmark of the compiled misogyny scorer against the sklearn vectorizer and model it was compiled from, on
+held-out synthetic chat lines (vocabulary words mixed with unknown words, case and repetitions).
+Run from the repository root, with sklearn installed: python -m benchmarks.linearScorer
+"""
+
+warnings.filterwarnings("ignore")
+
+UNKNOWN = ["karen", "gg", "lol", "xd", "flag", "camper", "noob", "42", "àèìòù", "ctf", "rekt", "a", "i"]
+
+
+def heldOutSet(vocabulary, size, seed=0):
+    """
+    :return: list of preprocessed messages.
+    """
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(size):
+        words = [rng.choice(vocabulary) if rng.random() < 0.7 else rng.choice(UNKNOWN)
+                 for _ in range(rng.randint(0, 20))]
+        if len(words) > 0 and rng.random() < 0.3:
+            words.append(words[0].upper())
+        messages.append(preprocessing.pre_process(" ".join(words).lower(), False))
+    return messages
+
+
+def throughput(predict, messages):
+    start = time.perf_counter()
+    for message in messages:
+        predict([message])
+    return len(messages) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    reference = sklearnClassifier()
+    scorer = linearScorer()
+    messages = heldOutSet(sorted(scorer.index), 5000)
+
+    worst = max(abs(scorer.decision(message) - reference.decision(message)) for message in messages)
+    mismatches = sum(1 for a, b in zip(scorer.predict(messages), reference.predict(messages)) if a != b)
+    print("%d messages: %d different predictions, max decision difference %.2e" % (len(messages), mismatches, worst))
+
+    print("sklearn %10.0f messages/s   linearScorer %10.0f messages/s"
+          % (throughput(reference.predict, messages), throughput(scorer.predict, messages)))
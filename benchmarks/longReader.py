@@ -0,0 +1,88 @@
+import random
+import socket
+import telnetlib
+import time
+import warnings
+from threading import Thread
+
+from connection.blockReader import blockReader
+
+"""
+Benchmark of the "OK LONG" readers on synthetic maps: the old per-row telnetlib loop against the buffered blockReader.
+Run from the repository root: python -m benchmarks.longReader
+"""
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+SIZES = {"0": 32, "1": 64, "2": 128}
+
+
+def syntheticMap(height, width):
+    """
+    :return: the bytes of a LOOK response for a random map.
+    """
+    symbols = ".........~~#@&!$"
+    rows = ["".join(random.choice(symbols) for _ in range(width)) for _ in range(height)]
+    return ("OK LONG\n" + "\n".join(rows) + "\n«ENDOFMAP»\n").encode('utf-8')
+
+
+def server(conn, payload, repetitions):
+    for _ in range(repetitions):
+        conn.recv(64)
+        conn.sendall(payload)
+
+
+def telnetRead(net):
+    """
+    The reading loop used by connectToServer before the blockReader.
+    """
+    response = [text.strip() for text in net.read_until(b"\n").decode('utf-8').splitlines()]
+    if response[0] == "OK LONG":
+        nextField = ""
+        while nextField != "«ENDOFSTATUS»" and nextField != "«ENDOFMAP»":
+            nextField = net.read_until(b"\n").decode('utf-8').rstrip()
+            response.append(nextField)
+    return response
+
+
+def blockRead(reader):
+    header = reader.readLine()
+    block, terminator = reader.readBlock()
+    return header, block
+
+
+def run(payload, repetitions, useTelnet):
+    client, remote = socket.socketpair()
+    worker = Thread(target=server, args=(remote, payload, repetitions))
+    worker.start()
+
+    if useTelnet:
+        net = telnetlib.Telnet()
+        net.sock = client
+    else:
+        reader = blockReader(client)
+
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        client.sendall(b"LOOK\n")
+        if useTelnet:
+            telnetRead(net)
+        else:
+            blockRead(reader)
+    elapsed = time.perf_counter() - start
+
+    worker.join()
+    client.close()
+    remote.close()
+    return elapsed / repetitions
+
+
+if __name__ == '__main__':
+    repetitions = 50
+    for flag, height in SIZES.items():
+        for shape, width in (("Q", height), ("W", height * 2)):
+            payload = syntheticMap(height, width)
+            old = run(payload, repetitions, True)
+            new = run(payload, repetitions, False)
+            print("%s%s %4dx%-4d telnetlib %8.3f ms   blockReader %8.3f ms   x%.1f"
+                  % (shape, flag, height, width, old * 1000, new * 1000, old / new))
@@ -0,0 +1,84 @@
+import random
+import re
+import time
+
+from nlp import preprocessing
+
+"""
+Equivalence check and benchmark of nlp.preprocessing.pre_process against a plain reference implementation: one re.sub
+per step with the patterns compiled on the fly, and substitute_repeats applied for every length from 1 to 19 in
+sequence (the intended behavior: the old loop kept only the last length).
+Run from the repository root: python -m benchmarks.preprocessing
+"""
+
+
+def referenceRemoveSpecials(sentence):
+    sentence = re.sub(r"(@[A-Za-z0–9_]+)|([^-9A-Za-z \t])|(\w+:\/\/\S+)", " ", sentence)
+    sentence = re.sub(r'\W', ' ', sentence)
+    sentence = re.sub(r'\s+[a-zA-Z]\s+', ' ', sentence)
+    sentence = re.sub(r'\s+', ' ', sentence)
+    return sentence
+
+
+def referenceRemoveUrls(sentence):
+    sentence = re.sub(
+        r"https?:\ / \ / (www\.)?[-a - zA - Z0–9 @: %._\+~# =]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0–9@:%_\+.~#?&//=]*)", ' ',
+        sentence)
+    sentence = re.sub(r"[-a - zA - Z0–9 @: %._\+~  # =]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0–9@:%_\+.~#?&//=]*)", ' ',
+                      sentence)
+    sentence = re.sub(r'(https|http)?:\/\/(\w|\.|\-|\/|\?|\=|\&|\%)*\b', '', sentence)
+    sentence = re.sub(r'(www)(\w|\.|\-|\/|\?|\=|\&|\%)*\b', '', sentence)
+    return sentence
+
+
+def referenceSubstituteRepeats(sentence, ntimes=3):
+    for nchars in range(1, 20):
+        sentence = re.sub(r"(\S{{{}}})(\1{{{},}})".format(nchars, ntimes - 1), r"\1", sentence)
+    return sentence
+
+
+def referencePreProcess(sentence):
+    sentence = sentence.lower()
+    sentence = referenceRemoveUrls(sentence)
+    sentence = referenceRemoveSpecials(sentence)
+    return referenceSubstituteRepeats(sentence)
+
+
+WORDS = ["gg", "you", "are", "so", "bad", "go", "back", "to", "the", "kitchen", "nice", "shot", "flag", "camper",
+         "team", "noob", "lol", "ez", "wp", "why", "did", "shoot", "me", "impostor", "sus", "karen", "vote", "she",
+         "woman", "girls", "can't", "play", "hahaha", "nooooo", "lolololol", "ahahahahah", "yesyesyes", "!!!", "???",
+         "@bot3", "#GLOBAL", "http://example.com/x?y=1", "www.site.org", "see https://t.co/AbC", "mail.me",
+         "x-ray", "e-mail", "\t", "42", "1v1", "😂", "😂😂😂", "perché", "niña", "...", ":)", "<3", "a", "i", "k"]
+
+
+def chatCorpus(size, seed=0):
+    """
+    :return: list of synthetic chat lines, in the "<channel> <sender> <text>" form received by chatAnalysis.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 15)))
+        if rng.random() < 0.1:
+            text = text.upper()
+        corpus.append("game" + str(rng.randint(1, 9)) + " player" + str(rng.randint(1, 9)) + " " + text)
+    return corpus
+
+
+def throughput(function, corpus):
+    start = time.perf_counter()
+    for message in corpus:
+        function(message)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    corpus = chatCorpus(20000)
+    different = [message for message in corpus
+                 if preprocessing.pre_process(message, False) != referencePreProcess(message)]
+    print("%d messages, %d different from the reference" % (len(corpus), len(different)))
+    for message in different[:5]:
+        print(repr(message))
+
+    print("reference %8.0f messages/s   pre_process %8.0f messages/s"
+          % (throughput(referencePreProcess, corpus), throughput(lambda m: preprocessing.pre_process(m, False), corpus)))
@@ -0,0 +1,68 @@
+import re
+import subprocess
+import sys
+
+from analyzers.models import HEAVY_MODULES
+
+"""
+Startup profiler: imports a module in a fresh interpreter with -X importtime and reports where the time goes, per
+module and per top level package, and which of the heavy dependencies (see analyzers/models.py) were loaded.
+Run from the repository root: python -m benchmarks.startupProfile [module ...] (default: karen)
+"""
+
+# "import time: <self us> | <cumulative us> | <indentation><module>"
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+TOP = 15
+
+
+def importTimes(module):
+    """
+    :param module: the module to import.
+    :return: list of (module, self us, cumulative us, depth), in the order printed by the interpreter.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                            stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, universal_newlines=True)
+    if result.returncode != 0:
+        raise RuntimeError("import " + module + " failed:\n" + result.stderr[-2000:])
+    times = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match is not None:
+            times.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return times
+
+
+def byPackage(times):
+    """
+    :return: dict top level package -> self us of all its modules.
+    """
+    packages = dict()
+    for name, own, _, _ in times:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + own
+    return packages
+
+
+def report(module, top=TOP):
+    times = importTimes(module)
+    total = sum(own for _, own, _, _ in times)
+    print("import %s: %.1f ms, %d modules" % (module, total / 1000, len(times)))
+
+    print("\nslowest modules (cumulative ms, self ms)")
+    for name, own, cumulative, depth in sorted(times, key=lambda t: -t[2])[:top]:
+        print("  %8.1f %8.1f  %s%s" % (cumulative / 1000, own / 1000, "  " * depth, name))
+
+    print("\nslowest packages (ms)")
+    for package, own in sorted(byPackage(times).items(), key=lambda p: -p[1])[:top]:
+        print("  %8.1f  %s" % (own / 1000, package))
+
+    loaded = set(name for name, _, _, _ in times)
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    print("\nheavy modules loaded: " + (", ".join(heavy) if len(heavy) > 0 else "none"))
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or ["karen"]:
+        report(name)
+        print()
@@ -0,0 +1,187 @@
+import asyncio
+import time
+
+from connection.blockReader import TERMINATOR
+from connection.rateLimiter import tokenBucket
+from connection.serverConnection import MAX_RETRY, serverResponse, splitBlock
+from data_structure import gameStatus
+
+
+# Driver asyncio per server e chat: nessun thread dedicato, più agenti possono condividere lo stesso event loop.
+
+class asyncConnectToServer(object):
+    """
+    Asyncio driver used for the connection with the server. Same protocol as connectToServer, but the reads are
+    scheduled by the event loop instead of blocking an OS thread.
+    """
+
+    def __init__(self, host, port, delay, limiter=None, recorder=None):
+        """
+        Define the connection parameters. The connection is opened by 'open'.
+        :param host: define the host server name.
+        :param port: define the port.
+        :param delay: define the delay time
+        :param limiter: the tokenBucket pacing the commands, default one command every 'delay' seconds.
+        :param recorder: a wireRecorder that logs the commands and the responses, None to not record.
+        """
+        self.HOST = host
+        self.port = port
+        self.delay = float(delay)
+        self.reader = None
+        self.writer = None
+        self.lock = None
+        self.limiter = limiter if limiter is not None else tokenBucket(1 / self.delay)
+        self.recorder = recorder
+        self.ts = time.time()
+
+    async def open(self):
+        """
+        Open the connection with the server.
+        :return: True if connected, False ow.
+        """
+        try:
+            # the limit must hold a whole map block
+            self.reader, self.writer = await asyncio.open_connection(self.HOST, int(self.port), limit=2 ** 20)
+        except OSError:
+            print("Connection Error")
+            return False
+        # a single command at a time is in flight on a connection, responses come back in order
+        self.lock = asyncio.Lock()
+        self.ts = time.time()
+        return True
+
+    async def close(self):
+        """
+        Close the connection with the server.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+    async def _readResponse(self):
+        """
+        Read a complete response from the server. An "OK LONG" block is read with a single readuntil on its
+        terminator.
+        :return: the response as a serverResponse.
+        :raise ConnectionError: if the server closed the connection before the end of the response.
+        """
+        line = await self.reader.readline()
+        if line == b'':
+            raise ConnectionError("Connection closed by the server")
+        response = serverResponse(text.strip() for text in line.decode('utf-8').splitlines())
+
+        if response[0] == "OK LONG":
+            try:
+                block = await self.reader.readuntil(TERMINATOR)
+            except asyncio.IncompleteReadError:
+                raise ConnectionError("Connection closed by the server inside a block")
+            response.block = block[:-len(TERMINATOR)]
+            response.terminator = (TERMINATOR + await self.reader.readline()).decode('utf-8').rstrip()
+            response.extend(splitBlock(response.block))
+            response.append(response.terminator)
+
+        return response
+
+    async def send(self, command):
+        """
+        Send a string to the server. Wait for the rate limiter slot before writing, a command refused with
+        "ERROR 401 Too fast" is sent again after the limiter backoff (at most MAX_RETRY times).
+        :param command: define the command to send to the server.
+        :return: the response from server.
+        """
+        async with self.lock:
+            retry = 0
+            while True:
+                await self.limiter.acquireAsync(command)
+
+                if self.recorder is not None:
+                    self.recorder.command(command)
+                self.writer.write(command.encode('utf-8') + b"\n")
+                await self.writer.drain()
+
+                response = await self._readResponse()
+                self.ts = time.time()
+                if self.recorder is not None:
+                    self.recorder.response(command, response)
+
+                if not self.limiter.feedback(response) or retry >= MAX_RETRY:
+                    return response
+                retry += 1
+
+
+class asyncConnectToChat(object):
+    """
+    Asyncio driver used for the connection with the chat system. The receiving side is a task of the event loop
+    instead of a ReceiveThread.
+    """
+
+    def __init__(self, host, port, name, onMessage=None, recorder=None):
+        """
+        :param host: define the remote hostName.
+        :param port: define the port.
+        :param name: define the "player"/"chatMember" name.
+        :param onMessage: callback(text, time) for every received line. Default: gameStatus.postMessage.
+        :param recorder: a wireRecorder that logs the received messages, None to not record.
+        """
+        self.HOST = host
+        self.port = port
+        self.name = name
+        self.onMessage = onMessage
+        self.recorder = recorder
+        self.reader = None
+        self.writer = None
+        self.receiver = None
+
+    async def open(self):
+        """
+        Open the connection with the chat system, join the global channels and start the receiving task.
+        :return: True if connected, False ow.
+        """
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.HOST, int(self.port))
+        except OSError:
+            print("Connection Error \n")
+            return False
+
+        await self._write("NAME " + self.name)
+        # JOIN the Global Channel for communication from the Server.
+        await self._write("JOIN " + "#GLOBAL")
+        await self._write("JOIN " + "#LEAGUE")
+
+        self.receiver = asyncio.ensure_future(self._receive())
+        return True
+
+    async def close(self):
+        if self.receiver is not None:
+            self.receiver.cancel()
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+    async def _write(self, message):
+        self.writer.write(str.encode(message + "\n"))
+        await self.writer.drain()
+
+    async def _receive(self):
+        while True:
+            received = await self.reader.readline()
+            if received == b'':
+                break
+            line = received.decode('utf-8', errors='replace').rstrip("\r\n")
+            if line == '':
+                continue
+            if self.recorder is not None:
+                self.recorder.chat(line)
+            if self.onMessage is not None:
+                self.onMessage(line, time.monotonic())
+            else:
+                gameStatus.postMessage(line, time.monotonic())
+
+    async def connectToChannel(self, game):
+        await self._write("JOIN " + game)
+
+    async def leaveChannel(self, game):
+        await self._write("LEAVE " + game)
+
+    async def sendInChat(self, game, message):
+        await self._write("POST " + game + " " + message)
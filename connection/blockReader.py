@@ -0,0 +1,71 @@
+# Lettore bufferizzato per le risposte del server: le righe "OK LONG" vengono lette come un unico blocco.
+
+# Every "OK LONG" block ends with a «ENDOFMAP» or «ENDOFSTATUS» line.
+TERMINATOR = "«ENDOF".encode('utf-8')
+
+
+class blockReader(object):
+    """
+    Buffered reader on the raw server socket. It receives big chunks into a single buffer and looks for line
+    and block terminators with one search over the new data, instead of one Python-level read per line.
+    """
+
+    def __init__(self, sock, chunkSize=65536):
+        """
+        :param sock: the connected socket.
+        :param chunkSize: max number of bytes read by a single recv.
+        """
+        self.sock = sock
+        self.chunkSize = chunkSize
+        self.buffer = bytearray()
+
+    def _fill(self):
+        """
+        Append the next chunk received from the socket to the buffer.
+        """
+        data = self.sock.recv(self.chunkSize)
+        if not data:
+            raise EOFError("Connection closed by the server")
+        self.buffer += data
+
+    def _find(self, pattern, start=0):
+        """
+        Search a pattern in the buffer, receiving more data until found. Data already scanned is not scanned again.
+        :param pattern: the bytes to look for.
+        :param start: where to start the search.
+        :return: the position of the pattern.
+        """
+        while True:
+            position = self.buffer.find(pattern, start)
+            if position >= 0:
+                return position
+            start = max(start, len(self.buffer) - len(pattern) + 1)
+            self._fill()
+
+    def _consume(self, end):
+        """
+        Remove the first 'end' bytes of the buffer and return them (as a new, writable, bytearray).
+        """
+        data = self.buffer[:end]
+        del self.buffer[:end]
+        return data
+
+    def readLine(self):
+        """
+        :return: the next line, newline excluded.
+        """
+        end = self._find(b"\n")
+        line = self._consume(end + 1)
+        return bytes(line[:-1])
+
+    def readBlock(self):
+        """
+        Read a whole "OK LONG" block.
+        :return: (block, terminator). block is a bytearray with all the lines before the terminator line (newlines
+        included), terminator is the decoded terminator line.
+        """
+        position = self._find(TERMINATOR)
+        end = self._find(b"\n", position)
+        block = self._consume(position)
+        terminator = self._consume(end + 1 - position)
+        return block, terminator.decode('utf-8').rstrip()
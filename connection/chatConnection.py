@@ -1,38 +1,62 @@
+import codecs
 import socket
 from threading import Thread, Lock, RLock
 import time
-from datetime import *
 
 from data_structure import gameStatus
 
 
+class lineFramer(object):
+    """
+    Split the chat stream in lines. A multi-byte character or a line cut between two recv are kept until the rest
+    arrives.
+    """
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.pending = ""
+
+    def feed(self, data):
+        """
+        :param data: the bytes received.
+        :return: the list of the completed lines, without the newline.
+        """
+        lines = (self.pending + self.decoder.decode(data)).split("\n")
+        self.pending = lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+
 class ReceiveThread(Thread):
     """
     Define a listener thread that wait for chat messages.
     """
-    def __init__(self, name, conn, tmp):
+    def __init__(self, name, conn, tmp, recorder=None):
         """
         Set the basic thread parameters.
         :param name: the thread name.
         :param conn: the socket
+        :param recorder: a wireRecorder that logs the received messages, None to not record.
         """
         Thread.__init__(self)
         self.conn = conn
         self.name = name
         self.plname = tmp
+        self.recorder = recorder
 
     def run(self):
+        framer = lineFramer()
         while (True):
             received = self.conn.recv(4096)
-            #ts = time.time()
-            dateTimeObj = datetime.now()
-            timeObj = dateTimeObj.time()
-            received = received.decode('utf-8')
-            if received == '':
+            if received == b'':
                 break
-            # print('Sono ' + self.plname + ', Ricevuto: ' + received)
-            pair = (received, timeObj)
-            gameStatus.sharedList.append(pair)
+            timestamp = time.monotonic()
+            for line in framer.feed(received):
+                if line == '':
+                    continue
+                if self.recorder is not None:
+                    self.recorder.chat(line)
+                # print('Sono ' + self.plname + ', Ricevuto: ' + line)
+                gameStatus.postMessage(line, timestamp)
 
 
 class ConnectToChat(object):
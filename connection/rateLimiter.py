@@ -0,0 +1,177 @@
+import time
+from threading import Lock
+
+
+# Rate limiter adattivo: parte dal DELAY del config e impara il budget reale del server dagli "ERROR 401 Too fast".
+
+TOO_FAST = "ERROR 401"
+
+# Command keywords understood by the game server, used to group costs and counters.
+COMMANDS = ("NEW", "JOIN", "START", "LEAVE", "STATUS", "LOOK", "MOVE", "SHOOT", "ACCUSE", "JUDGE", "NOP")
+
+
+def commandType(command):
+    """
+    Extract the command keyword from a raw command string ("<game> MOVE N" -> "MOVE", "NEW <game>" -> "NEW").
+    :param command: the raw command.
+    :return: the command keyword, "OTHER" if not recognized.
+    """
+    words = command.split(' ')
+    if words[0] in COMMANDS:
+        return words[0]
+    if len(words) > 1 and words[1] in COMMANDS:
+        return words[1]
+    return "OTHER"
+
+
+def parseCosts(value):
+    """
+    Parse a per-command cost list as written in the config file ("LOOK:1, MOVE:0.8").
+    :param value: the string to parse, None or empty for no costs.
+    :return: dict command type -> cost.
+    """
+    costs = dict()
+    if value is None:
+        return costs
+    for item in value.split(','):
+        if item.strip() == "":
+            continue
+        kind, cost = item.split(':')
+        costs[kind.strip().upper()] = float(cost)
+    return costs
+
+
+class tokenBucket(object):
+    """
+    Token bucket used to pace the commands sent to the server. Every command takes 'cost' tokens (1 by default),
+    tokens are refilled at 'rate' tokens per second up to 'capacity'.
+    The rate is adapted with an AIMD policy: after 'probeAfter' accepted commands in a row the rate grows by
+    'increase' (up to maxRate), after an "ERROR 401 Too fast" it is multiplied by 'decrease' (down to minRate) and the
+    bucket is emptied, so the next command waits a full slot at the new rate. The refused rate is remembered: maxRate
+    is lowered just below it, so the probing settles under the budget of the server instead of hitting it again.
+    Probing is opt-in: by default maxRate is the initial rate, so the limiter never goes faster than the DELAY of the
+    server (which closes the socket of the clients that are too fast) and only slows down after a refusal.
+    """
+
+    def __init__(self, rate, capacity=1.0, costs=None, minRate=None, maxRate=None, probeAfter=20, increase=0.05,
+                 decrease=0.5):
+        """
+        :param rate: initial rate (tokens per second), usually 1 / DELAY.
+        :param capacity: max number of tokens (burst size).
+        :param costs: dict command type -> cost in tokens.
+        :param minRate: lower bound for the rate, default rate / 4.
+        :param maxRate: upper bound for the rate, default rate (no probing). Lowered after a "Too fast".
+        :param probeAfter: number of accepted commands before trying a faster rate.
+        :param increase: relative increment of the rate when probing.
+        :param decrease: multiplicative factor applied to the rate after a "Too fast".
+        """
+        self.lock = Lock()
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.costs = costs if costs is not None else dict()
+        self.minRate = float(minRate) if minRate is not None else self.rate / 4
+        self.maxRate = float(maxRate) if maxRate is not None else self.rate
+        self.probeAfter = probeAfter
+        self.increase = increase
+        self.decrease = decrease
+
+        self.tokens = self.capacity
+        self.last = time.time()
+        self.accepted = 0
+
+        # usage counters
+        self.started = self.last
+        self.commands = 0
+        self.tooFast = 0
+        self.used = 0.0
+        # the bucket starts full: its capacity is part of the budget
+        self.offered = self.capacity
+
+    def cost(self, command):
+        """
+        :param command: the raw command.
+        :return: the number of tokens needed by the command.
+        """
+        return self.costs.get(commandType(command), 1.0)
+
+    def _refill(self, now):
+        elapsed = now - self.last
+        if elapsed > 0:
+            self.offered += elapsed * self.rate
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last = now
+
+    def reserve(self, command):
+        """
+        Take the tokens for a command. The bucket can go below zero: the debt is the time the caller has to wait.
+        :param command: the raw command.
+        :return: seconds to wait before writing the command.
+        """
+        cost = self.cost(command)
+        with self.lock:
+            self._refill(time.time())
+            self.tokens -= cost
+            self.commands += 1
+            self.used += cost
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, command):
+        """
+        Blocking wait for the slot of a command.
+        :param command: the raw command.
+        :return: the time waited.
+        """
+        wait = self.reserve(command)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquireAsync(self, command):
+        """
+        Same as acquire, for the asyncio drivers.
+        """
+        # already loaded by the asyncio drivers, the threaded ones never pay for it
+        import asyncio
+        wait = self.reserve(command)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def feedback(self, response):
+        """
+        Adapt the rate to the server response.
+        :param response: the response (list of lines) of the last command.
+        :return: True if the server refused the command because it was too fast, False ow.
+        """
+        with self.lock:
+            if len(response) > 0 and response[0].startswith(TOO_FAST):
+                self.tooFast += 1
+                self.accepted = 0
+                self._refill(time.time())
+                self.maxRate = max(self.minRate, min(self.maxRate, self.rate * (1 - self.increase)))
+                self.rate = max(self.minRate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, 0.0)
+                return True
+
+            self.accepted += 1
+            if self.accepted >= self.probeAfter and self.rate < self.maxRate:
+                self._refill(time.time())
+                self.rate = min(self.maxRate, self.rate * (1 + self.increase))
+                self.accepted = 0
+            return False
+
+    def usage(self):
+        """
+        :return: dict with the current rate, the commands sent, the "Too fast" received and the fraction of the
+        offered budget actually used.
+        """
+        with self.lock:
+            self._refill(time.time())
+            return {"rate": self.rate,
+                    "commands": self.commands,
+                    "tooFast": self.tooFast,
+                    "used": self.used,
+                    "offered": self.offered,
+                    "utilization": self.used / self.offered if self.offered > 0 else 0.0}
@@ -0,0 +1,173 @@
+import struct
+import time
+from queue import Queue, Full
+from threading import Thread
+
+import numpy as np
+
+from connection.rateLimiter import commandType
+from connection.serverConnection import serverResponse
+
+"""
+Wire-traffic recorder: every command, response and chat message is appended to a binary log with its monotonic
+timestamp. The hot loop only puts the frame in a bounded queue, a background thread encodes and writes it.
+
+Log format: MAGIC, then the frames. A frame is a header (kind, timestamp, payload length) and the payload:
+- COMMAND, CHAT: the utf-8 text.
+- RESPONSE: the first line, "\n", the terminator (empty if none), "\n", the raw block (empty if none).
+- LOOK: as RESPONSE, but the block is delta-encoded against the block of the previous LOOK frame:
+  KEY_FRAME + the whole block, or DELTA_FRAME + count + positions (uint32) + values (uint8) of the changed bytes.
+"""
+
+MAGIC = b"KAREC1"
+FRAME = struct.Struct("<BdI")
+COUNT = struct.Struct("<I")
+
+COMMAND = 1
+RESPONSE = 2
+LOOK = 3
+CHAT = 4
+
+KEY_FRAME = b"\x00"
+DELTA_FRAME = b"\x01"
+
+
+def encodeDelta(previous, block):
+    """
+    :param previous: the previous LOOK block, None if there is none.
+    :param block: the new LOOK block.
+    :return: the encoded block.
+    """
+    if previous is None or len(previous) != len(block):
+        return KEY_FRAME + block
+    current = np.frombuffer(block, dtype=np.uint8)
+    changed = np.flatnonzero(current != np.frombuffer(previous, dtype=np.uint8))
+    # 5 bytes per changed cell: a key frame is smaller when too many cells changed
+    if len(changed) * 5 >= len(block):
+        return KEY_FRAME + block
+    return DELTA_FRAME + COUNT.pack(len(changed)) + changed.astype('<u4').tobytes() + current[changed].tobytes()
+
+
+def decodeDelta(previous, encoded):
+    """
+    Inverse of encodeDelta.
+    :return: the LOOK block as bytes.
+    """
+    if encoded[:1] == KEY_FRAME:
+        return bytes(encoded[1:])
+    count = COUNT.unpack_from(encoded, 1)[0]
+    start = 1 + COUNT.size
+    positions = np.frombuffer(encoded, dtype='<u4', count=count, offset=start)
+    values = np.frombuffer(encoded, dtype=np.uint8, count=count, offset=start + 4 * count)
+    block = np.frombuffer(previous, dtype=np.uint8).copy()
+    block[positions] = values
+    return block.tobytes()
+
+
+class wireRecorder(object):
+    """
+    Opt-in recorder of the traffic of a Karen (see connectToServer and ReceiveThread, or the asyncio drivers of host.py).
+    """
+
+    def __init__(self, path, bufferSize=4096):
+        """
+        :param path: the log file, frames are appended when it already exists.
+        :param bufferSize: maximum number of frames waiting for the writer. When the buffer is full the frames are
+        dropped (and counted) instead of slowing down the game.
+        """
+        self.path = path
+        self.frames = Queue(bufferSize)
+        self.dropped = 0
+        self.file = open(path, "ab", buffering=1 << 16)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.writer = Thread(target=self._write, name="wireRecorder", daemon=True)
+        self.writer.start()
+
+    def _put(self, frame):
+        try:
+            self.frames.put_nowait(frame)
+        except Full:
+            self.dropped += 1
+
+    def command(self, command):
+        self._put((COMMAND, time.monotonic(), command))
+
+    def response(self, command, response):
+        # the block is copied: the LOOK parser edits it in place
+        block = bytes(response.block) if response.block is not None else None
+        self._put((RESPONSE, time.monotonic(), (command, response[0], response.terminator, block)))
+
+    def chat(self, text):
+        self._put((CHAT, time.monotonic(), text))
+
+    def close(self):
+        """
+        Write the pending frames and close the log.
+        """
+        self.frames.put(None)
+        self.writer.join()
+        self.file.close()
+
+    def _write(self):
+        previousLook = None
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                self.file.flush()
+                return
+            kind, timestamp, value = frame
+
+            if kind == RESPONSE:
+                command, first, terminator, block = value
+                payload = (first + "\n" + (terminator or "") + "\n").encode('utf-8')
+                if block is not None and commandType(command) == "LOOK":
+                    kind = LOOK
+                    payload += encodeDelta(previousLook, block)
+                    previousLook = block
+                elif block is not None:
+                    payload += block
+            else:
+                payload = value.encode('utf-8')
+
+            self.file.write(FRAME.pack(kind, timestamp, len(payload)))
+            self.file.write(payload)
+            if self.frames.empty():
+                self.file.flush()
+
+
+def readLog(path):
+    """
+    Read a log written by a wireRecorder.
+    :return: generator of (kind, timestamp, value): value is the text for COMMAND and CHAT frames, a serverResponse
+    (lines of the block not split, see sendBlock) for RESPONSE and LOOK frames.
+    """
+    with open(path, "rb") as log:
+        data = log.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(path + " is not a Karen wire log")
+
+    previousLook = None
+    offset = len(MAGIC)
+    while offset + FRAME.size <= len(data):
+        kind, timestamp, length = FRAME.unpack_from(data, offset)
+        offset += FRAME.size
+        if offset + length > len(data):
+            # the last frame was cut (the recording process was killed while writing it)
+            return
+        payload = data[offset:offset + length]
+        offset += length
+
+        if kind == COMMAND or kind == CHAT:
+            yield kind, timestamp, payload.decode('utf-8')
+            continue
+
+        first, terminator, block = payload.split(b"\n", 2)
+        response = serverResponse([first.decode('utf-8')])
+        if terminator != b"":
+            response.terminator = terminator.decode('utf-8')
+            if kind == LOOK:
+                block = decodeDelta(previousLook, block)
+                previousLook = block
+            response.block = bytearray(block)
+        yield kind, timestamp, response
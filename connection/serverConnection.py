@@ -1,11 +1,94 @@
 import telnetlib
 
 import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Thread, Lock, Condition
+
+from connection.blockReader import blockReader
+from connection.rateLimiter import tokenBucket, commandType
 
 
 # Driver per la connessione tra Server e il nostro sistema. Resta in esecuzione mantenendo la connessione con il server.
 # Internamente offrirà una socket per leggere e scrivere
 
+# A command refused with "ERROR 401 Too fast" is sent again at most this number of times (Jarvis closes the socket
+# of clients that keep flooding it).
+MAX_RETRY = 1
+
+class serverResponse(list):
+    """
+    Lines of a server response. For "OK LONG" responses 'block' holds the raw bytes of the lines before the
+    terminator and 'terminator' the terminator line, so parsers can work on the block without per-line copies.
+    """
+    block = None
+    terminator = None
+
+
+def splitBlock(block):
+    """
+    :param block: the raw bytes of an "OK LONG" block.
+    :return: the list of its lines.
+    """
+    return [line.rstrip() for line in block.decode('utf-8').split('\n')[:-1]]
+
+
+class commandLatency(object):
+    """
+    Per-command latency counters. For every command type it keeps:
+    - queued: time between the request of the command and its write on the socket (rate limit slot)
+    - wire: time between the write and the complete response
+    - own: time spent in our own code between the previous response and the request of the command
+    The summary holds the mean of every time and the maximum of 'own'.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = dict()
+        self.lastAnswered = None
+
+    def record(self, command, requested, written, answered):
+        """
+        Account a completed command.
+        :param command: the raw command.
+        :param requested: timestamp of the request.
+        :param written: timestamp of the write on the socket.
+        :param answered: timestamp of the complete response.
+        :return: None
+        """
+        kind = commandType(command)
+        with self.lock:
+            own = 0.0
+            if self.lastAnswered is not None and requested > self.lastAnswered:
+                own = requested - self.lastAnswered
+            self.lastAnswered = max(answered, self.lastAnswered or answered)
+
+            counter = self.counters.get(kind)
+            if counter is None:
+                counter = [0, 0.0, 0.0, 0.0, 0.0]
+                self.counters[kind] = counter
+            counter[0] += 1
+            counter[1] += written - requested
+            counter[2] += answered - written
+            counter[3] += own
+            counter[4] = max(counter[4], own)
+
+    def summary(self):
+        """
+        :return: a dict command type -> {count, queued, wire, own, ownMax} with the mean times and the longest own
+        time in seconds.
+        """
+        with self.lock:
+            result = dict()
+            for kind, (count, queued, wire, own, ownMax) in self.counters.items():
+                result[kind] = {"count": count,
+                                "queued": queued / count,
+                                "wire": wire / count,
+                                "own": own / count,
+                                "ownMax": ownMax}
+            return result
+
+
 class connectToServer(object):
     """
     Diver used for the connection with the server.
@@ -13,50 +96,189 @@ class connectToServer(object):
     net = None
     internalSocket = None
 
-    def __init__(self, host, port, delay):
+    def __init__(self, host, port, delay, pipelined=False, limiter=None, recorder=None):
         """
         Open the connection with the server.
         :param host: define the host server name.
         :param port: define the port.
         :param delay: define the delay time
+        :param pipelined: if True commands are queued and written as soon as the rate limit allows it, the responses
+        are delivered as futures in FIFO order (see sendAsync).
+        :param limiter: the tokenBucket pacing the commands, default one command every 'delay' seconds.
+        :param recorder: a wireRecorder that logs the commands and the responses, None to not record.
         """
         self.HOST = host
         self.port = port
         self.delay = float(delay)
+        self.pipelined = pipelined
+        self.latency = commandLatency()
+        self.limiter = limiter if limiter is not None else tokenBucket(1 / self.delay)
+        self.recorder = recorder
         try:
             self.net = telnetlib.Telnet(self.HOST, self.port)
+            # responses are read straight from the socket, telnetlib is used only to write
+            self.reader = blockReader(self.net.get_socket())
             self.ts = time.time()
         except:
             print("Connection Error")
             return
 
-    def send(self, command):
+        if self.pipelined:
+            # outbound: commands waiting for their rate limit slot. inflight: commands written, waiting for a response.
+            # resend: a refused command to write again before any other one
+            self.outbound = deque()
+            self.inflight = deque()
+            self.resend = None
+            # the exception that closed the connection, None while it is open
+            self.closed = None
+            self.outboundReady = Condition()
+            Thread(target=self._writer, name="serverWriter", daemon=True).start()
+            Thread(target=self._reader, name="serverReader", daemon=True).start()
+
+    def _readResponse(self, split=True):
+        """
+        Read a complete response from the server. An "OK LONG" block is read in a single buffered scan up to its
+        terminator.
+        :param split: if False the lines of the block are not added to the response (see sendBlock).
+        :return: the response as a serverResponse.
         """
-        Send a string to the server. Wait a prefixed delay checking the difference between the last 'send' timestamp with the new one
+        response = serverResponse(text.strip() for text in self.reader.readLine().decode('utf-8').splitlines())
+
+        if response[0] == "OK LONG":
+            response.block, response.terminator = self.reader.readBlock()
+            if split:
+                response.extend(splitBlock(response.block))
+                response.append(response.terminator)
+
+        return response
+
+    def send(self, command, split=True):
+        """
+        Send a string to the server. Wait for the rate limiter slot before writing, a command refused with
+        "ERROR 401 Too fast" is sent again after the limiter backoff (at most MAX_RETRY times).
         :param command: define the command to send to the server.
+        :param split: if False the lines of an "OK LONG" block are left in response.block only.
         :return: the response from server.
         """
-        response = []
+        if self.pipelined:
+            return self.sendAsync(command, split).result()
 
-        if abs(self.ts - time.time()) <= float(self.delay):
-            time.sleep(float(self.delay) - abs(self.ts - time.time()))
+        retry = 0
+        while True:
+            requested = time.time()
+            self.limiter.acquire(command)
 
-        self.net.write(command.encode('utf-8') + b"\n")
+            written = time.time()
+            if self.recorder is not None:
+                self.recorder.command(command)
+            self.net.write(command.encode('utf-8') + b"\n")
 
+            response = self._readResponse(split)
+            self.ts = time.time()
+            self.latency.record(command, requested, written, self.ts)
+            if self.recorder is not None:
+                self.recorder.response(command, response)
 
-        response = [text.strip() for text in self.net.read_until(b"\n").decode('utf-8').splitlines()]
-        self.ts = time.time()
+            if not self.limiter.feedback(response) or retry >= MAX_RETRY:
+                return response
+            retry += 1
+
+    def sendBlock(self, command):
+        """
+        Send a command whose response is an "OK LONG" block (LOOK, STATUS), without splitting the block in lines.
+        :param command: define the command to send to the server.
+        :return: the response from server, the block is in response.block.
+        """
+        return self.send(command, False)
 
-        # if(response[0] == "ERROR 401 Too fast"):
-        #    per ora non usato perchè if True Jarvis ci chiude la socket
-        #    return self.send(command)
+    def sendAsync(self, command, split=True):
+        """
+        Queue a command without waiting for its response (pipelined mode only).
+        :param command: define the command to send to the server.
+        :param split: if False the lines of an "OK LONG" block are left in response.block only.
+        :return: a Future that will hold the response from server.
+        """
+        future = Future()
+        with self.outboundReady:
+            if self.closed is not None:
+                future.set_exception(self.closed)
+                return future
+            self.outbound.append((command, future, time.time(), 0, split))
+            self.outboundReady.notify()
+        return future
 
-        if response[0] == "OK LONG":
-            nextField = ""
-            while nextField != "«ENDOFSTATUS»" and nextField != "«ENDOFMAP»":
+    def _writer(self):
+        """
+        Write the queued commands as soon as their rate limit slot opens. A refused command is written again before
+        any other one.
+        """
+        while True:
+            with self.outboundReady:
+                while self.resend is None and len(self.outbound) == 0:
+                    self.outboundReady.wait()
+                if self.resend is not None:
+                    item, self.resend = self.resend, None
+                else:
+                    item = self.outbound.popleft()
+            command, future, requested, retry, split = item
 
-                nextField = self.net.read_until(b"\n").decode('utf-8').rstrip()
-                response.append((nextField))
+            self.limiter.acquire(command)
+            with self.outboundReady:
+                if self.closed is not None:
+                    future.set_exception(self.closed)
+                    continue
+                if self.resend is not None:
+                    # a command was refused while waiting for the slot: it goes first
+                    self.outbound.appendleft(item)
+                    continue
+                written = time.time()
+                # register the command before writing it, so the reader always finds it
+                self.inflight.append((command, future, requested, written, retry, split))
+                if self.recorder is not None:
+                    self.recorder.command(command)
+                try:
+                    self.net.write(command.encode('utf-8') + b"\n")
+                except Exception as e:
+                    self.inflight.pop()
+                    future.set_exception(e)
+                    continue
+                self.ts = written
 
+    def _reader(self):
+        """
+        Read the responses and match them with the written commands in FIFO order.
+        """
+        while True:
+            try:
+                response = self._readResponse(False)
+            except Exception as e:
+                # connection lost: fail every pending command
+                with self.outboundReady:
+                    self.closed = e
+                    pending = [item[1] for item in self.inflight] + [item[1] for item in self.outbound]
+                    if self.resend is not None:
+                        pending.append(self.resend[1])
+                    self.inflight.clear()
+                    self.outbound.clear()
+                    self.resend = None
+                for future in pending:
+                    future.set_exception(e)
+                return
+            answered = time.time()
+            command, future, requested, written, retry, split = self.inflight.popleft()
+            self.latency.record(command, requested, written, answered)
+            if self.recorder is not None:
+                self.recorder.response(command, response)
 
-        return response
+            if self.limiter.feedback(response) and retry < MAX_RETRY:
+                with self.outboundReady:
+                    # refused: it is written again only if no later command is on the wire yet, ow the server would
+                    # run the commands out of order and the refusal is its response
+                    if len(self.inflight) == 0:
+                        self.resend = (command, future, requested, retry + 1, split)
+                        self.outboundReady.notify()
+                        continue
+            if split and response.block is not None:
+                response.extend(splitBlock(response.block))
+                response.append(response.terminator)
+            future.set_result(response)
@@ -0,0 +1,77 @@
+import re
+from collections import namedtuple
+
+"""
+Typed @GameServer notifications. A single precompiled grammar turns a chat line into an event, the events reach the
+handlers subscribed to their type through a dispatch table (see Game.events).
+"""
+
+GameStarted = namedtuple('GameStarted', ['game', 'time'])
+GameFinished = namedtuple('GameFinished', ['game', 'time'])
+StageChanged = namedtuple('StageChanged', ['game', 'stage', 'time'])
+EmergencyCalled = namedtuple('EmergencyCalled', ['game', 'caller', 'time'])
+Condemned = namedtuple('Condemned', ['game', 'name', 'time'])
+Shot = namedtuple('Shot', ['game', 'shooter', 'direction', 'time'])
+Hit = namedtuple('Hit', ['game', 'shooter', 'target', 'time'])
+
+# "<game> @GameServer <notification>", the #GLOBAL and #LEAGUE channels excluded. Every alternative ends with its own
+# named group, so match.lastgroup tells which notification matched.
+GRAMMAR = re.compile(r"(?P<game>[^#\s]\S*) @GameServer (?:"
+                     r"(?P<started>Now)"
+                     r"|(?P<finished>Game)"
+                     r"|(?P<hunting>Hunting)"
+                     r"|(?P<catch>You)"
+                     r"|EMERGENCY \S+ (?:(?P<called>Called)(?: by (?P<caller>\S+))?|condamned (?P<condemned>\S+))"
+                     r"|(?P<shooter>\S+) (?:(?P<shot>shot)(?: (?P<direction>\S+))?|hit (?P<target>\S+))"
+                     r")(?: |$)")
+
+# last group of the match -> event builder
+BUILDERS = {
+    'started': lambda m, t: GameStarted(m['game'], t),
+    'finished': lambda m, t: GameFinished(m['game'], t),
+    'hunting': lambda m, t: StageChanged(m['game'], 1, t),
+    'catch': lambda m, t: StageChanged(m['game'], 2, t),
+    'called': lambda m, t: EmergencyCalled(m['game'], None, t),
+    'caller': lambda m, t: EmergencyCalled(m['game'], m['caller'], t),
+    'condemned': lambda m, t: Condemned(m['game'], m['condemned'], t),
+    'shot': lambda m, t: Shot(m['game'], m['shooter'], None, t),
+    'direction': lambda m, t: Shot(m['game'], m['shooter'], m['direction'], t),
+    'target': lambda m, t: Hit(m['game'], m['shooter'], m['target'], t),
+}
+
+
+def parseEvent(line, timestamp=None):
+    """
+    :param line: a chat line, without the newline.
+    :param timestamp: its arrival time.
+    :return: the event of a @GameServer notification of a game, None for every other line.
+    """
+    match = GRAMMAR.match(line)
+    if match is None:
+        return None
+    return BUILDERS[match.lastgroup](match, timestamp)
+
+
+class eventDispatcher(object):
+    """
+    Dispatch table: event type -> handlers, called in the order of subscription.
+    """
+
+    def __init__(self):
+        self.handlers = dict()
+
+    def subscribe(self, eventType, handler):
+        """
+        :param eventType: one of the event types (GameStarted, Hit, ...).
+        :param handler: callable receiving the event.
+        """
+        self.handlers.setdefault(eventType, []).append(handler)
+
+    def unsubscribe(self, eventType, handler):
+        handlers = self.handlers.get(eventType)
+        if handlers is not None and handler in handlers:
+            handlers.remove(handler)
+
+    def dispatch(self, event):
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
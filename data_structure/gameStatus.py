@@ -1,3 +1,9 @@
+from contextvars import ContextVar, copy_context
+from functools import partial
+from queue import Queue, Full, Empty
+
+from data_structure.gameEvents import eventDispatcher
+
 """
 Class that contains all the player's info
 """
@@ -65,6 +71,12 @@ class Game:
         # list of enemies player
         self.enemies = dict()
 
+        # indexes of all the players, Karen included (see addPlayer and indexPlayer):
+        # name -> Player, symbol -> Player, symbol -> True if ally of Karen (Karen too), False if enemy
+        self.byName = dict()
+        self.bySymbol = dict()
+        self.isAlly = dict()
+
 
         self.activeEnemies = None
         self.activeAllies = None
@@ -84,8 +96,13 @@ class Game:
         self.wantedFlagMaxEuclideanDistance = None
         self.wantedFlagEuclideanDistance = None
 
-        # map retrieved from the server
-        self.serverMap = None
+        # map retrieved from the server, as a uint8 grid (see lookParser). serverMap reads it as rows of symbols
+        self.serverGrid = None
+
+        # layers of the weighted maps (see strategy/mapEngine.py): the terrain, built once after the first LOOK, and
+        # the players on the map at the last weighted map, with the fire lines updated move by move
+        self.staticLayer = None
+        self.dynamicLayer = None
 
         # weighted deterministic map
         self.weightedMap = None
@@ -113,8 +130,162 @@ class Game:
 
         self.judgeList = []
 
-
-global game
-
-global sharedList
-sharedList = []
+        # @GameServer notifications of this game (see gameEvents): strategy and analyzers subscribe to them
+        self.events = eventDispatcher()
+
+        # last STATUS received (statusParser.statusRecord) and its differences with the previous one
+        self.lastStatus = None
+        self.lastStatusDiff = None
+
+    def addPlayer(self, player, ally):
+        """
+        Add a new player to the allies or to the enemies, and to the indexes.
+        :param player: the Player, with name and symbol.
+        :param ally: True if it is an ally, False if it is an enemy.
+        """
+        if ally:
+            self.allies[player.symbol] = player
+        else:
+            self.enemies[player.symbol] = player
+        self.indexPlayer(player, ally)
+
+    def indexPlayer(self, player, ally):
+        """
+        Add a player (or Karen, once her symbol is known) to the indexes.
+        """
+        self.byName[player.name] = player
+        self.bySymbol[player.symbol] = player
+        self.isAlly[player.symbol] = ally
+
+    def playerByName(self, name):
+        """
+        :return: the Player (Karen, ally or enemy) with that name, None if unknown.
+        """
+        return self.byName.get(name)
+
+    def playerBySymbol(self, symbol):
+        """
+        :return: the Player (Karen, ally or enemy) with that symbol, None if unknown.
+        """
+        return self.bySymbol.get(symbol)
+
+    @property
+    def serverMap(self):
+        """
+        :return: the map as rows of symbols, serverMap[y][x], decoded from serverGrid when read. None before the first
+        LOOK. Read-only: write a cell with setCell.
+        """
+        if self.serverGrid is None:
+            return None
+        return gridRows(self.serverGrid)
+
+    def setCell(self, x, y, symbol):
+        """
+        Write a symbol in a map cell.
+        :param x: the column.
+        :param y: the row.
+        :param symbol: the one-character symbol.
+        """
+        if self.serverGrid is not None:
+            self.serverGrid[y, x] = ord(symbol)
+
+
+class gridRows(object):
+    """
+    Read-only view of a uint8 map as rows of symbols: a row is decoded into a string only when it is read, the grid
+    stays the only copy of the map.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __len__(self):
+        return len(self.grid)
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [self[i] for i in range(*y.indices(len(self.grid)))]
+        return self.grid[y].tobytes().decode('latin-1')
+
+    def __iter__(self):
+        for y in range(len(self.grid)):
+            yield self[y]
+
+
+# maximum number of received chat messages waiting for the chatAnalyzer
+CHAT_QUEUE_SIZE = 1024
+
+
+class agentContext(object):
+    """
+    The state of one Karen: her game and the chat messages waiting for her chatAnalyzer. Every Karen runs inside her
+    own context, so many of them can live in the same process (see host.py).
+    """
+
+    def __init__(self):
+        self.game = None
+        self.chatQueue = Queue(CHAT_QUEUE_SIZE)
+
+    def postMessage(self, text, timestamp):
+        """
+        Queue a received chat message for the chatAnalyzer. When the queue is full the oldest message is dropped, so
+        the receiver never blocks.
+        :param text: one chat line, without the newline.
+        :param timestamp: the time.monotonic() of its arrival.
+        """
+        while True:
+            try:
+                self.chatQueue.put_nowait((text, timestamp))
+                return
+            except Full:
+                try:
+                    self.chatQueue.get_nowait()
+                except Empty:
+                    pass
+
+
+# context of the running Karen; the processes with a single Karen never set it and use defaultContext
+currentContext = ContextVar('agentContext')
+defaultContext = agentContext()
+
+
+def context():
+    """
+    :return: the agentContext of the calling Karen.
+    """
+    return currentContext.get(defaultContext)
+
+
+def useContext(agent):
+    """
+    Run the calling thread (or task) inside an agentContext.
+    :param agent: the agentContext.
+    :return: the agentContext.
+    """
+    currentContext.set(agent)
+    return agent
+
+
+def startThread(thread):
+    """
+    Start a thread inside the context of the calling Karen: gameStatus.game and the chat queue seen by the thread are
+    hers.
+    :param thread: a Thread not started yet.
+    """
+    run = thread.run
+    thread.run = partial(copy_context().run, run)
+    thread.start()
+
+
+def __getattr__(name):
+    # gameStatus.game and gameStatus.chatQueue are the ones of the calling Karen
+    if name == 'game' or name == 'chatQueue':
+        return getattr(context(), name)
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+
+def postMessage(text, timestamp):
+    """
+    Queue a received chat message for the chatAnalyzer of the calling Karen (see agentContext.postMessage).
+    """
+    context().postMessage(text, timestamp)
@@ -0,0 +1,43 @@
+import numpy as np
+
+"""
+Parser of the LOOK responses: the raw block becomes a uint8 grid (one byte per cell, row y and column x) without
+splitting it in rows and characters.
+"""
+
+
+def parseLook(block):
+    """
+    Turn the raw bytes of a LOOK block into a grid.
+    :param block: the rows of the map, each one terminated by a newline.
+    :return: the map as a (height, width) uint8 array. It is writable when block is a bytearray.
+    """
+    stride = block.find(b"\n") + 1
+    width = stride - 1
+    # tolerate "\r\n" terminated rows
+    if width > 0 and block[width - 1] == 13:
+        width -= 1
+    height = len(block) // stride
+
+    grid = np.frombuffer(block, dtype=np.uint8, count=height * stride).reshape(height, stride)[:, :width]
+    if not grid.flags.writeable:
+        grid = grid.copy()
+    return grid
+
+
+def locateSymbols(grid, symbols):
+    """
+    Find the position of some symbols (players, flags) in the grid with a single vectorized lookup.
+    :param grid: the uint8 map.
+    :param symbols: iterable of one-character symbols.
+    :return: dict symbol -> (x, y) for the symbols present in the map (the last occurrence wins).
+    """
+    codes = np.frombuffer("".join(symbols).encode('ascii'), dtype=np.uint8)
+    positions = dict()
+    if len(codes) == 0:
+        return positions
+
+    found = np.argwhere(np.isin(grid, codes))
+    for y, x in found.tolist():
+        positions[chr(grid[y, x])] = (x, y)
+    return positions
@@ -0,0 +1,99 @@
+import re
+from collections import namedtuple
+
+"""
+Parser of the STATUS responses. Every GA/ME/PL line becomes a typed record, a STATUS can be compared with the previous
+one and with the players as they are known now to know which players actually changed.
+"""
+
+# The fields of a line are "key=value" pairs in a fixed order: only the values are kept.
+FIELDS = re.compile(r"\w+=(\S*)")
+
+gameRecord = namedtuple('gameRecord', ['name', 'state', 'size'])
+meRecord = namedtuple('meRecord', ['symbol', 'name', 'team', 'loyalty', 'energy', 'score'])
+playerRecord = namedtuple('playerRecord', ['symbol', 'name', 'team', 'x', 'y', 'state'])
+
+# players: dict symbol -> playerRecord, in the order of the response
+statusRecord = namedtuple('statusRecord', ['game', 'me', 'players'])
+
+# new: symbols not present in the previous STATUS (or not known yet)
+# moved: list of (symbol, (oldX, oldY), (newX, newY))
+# stateChanged: list of (symbol, oldState, newState)
+# energyDelta, scoreDelta: variation of my energy and score
+statusDiff = namedtuple('statusDiff', ['new', 'moved', 'stateChanged', 'energyDelta', 'scoreDelta'])
+
+
+def toNumber(value):
+    """
+    :return: value as an int when it is an integer number, unchanged ow.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def parseStatus(block):
+    """
+    Parse a STATUS block.
+    :param block: the raw bytes (or the text) of the lines before «ENDOFSTATUS».
+    :return: a statusRecord.
+    """
+    if not isinstance(block, str):
+        block = block.decode('utf-8')
+
+    game = None
+    me = None
+    players = dict()
+    for line in block.splitlines():
+        if line.startswith("PL:"):
+            values = FIELDS.findall(line)
+            players[values[0]] = playerRecord(values[0], values[1], values[2], int(values[3]), int(values[4]),
+                                              values[5])
+        elif line.startswith("ME:"):
+            values = FIELDS.findall(line)
+            me = meRecord(values[0], values[1], values[2], values[3], toNumber(values[4]), toNumber(values[5]))
+        elif line.startswith("GA:"):
+            values = FIELDS.findall(line)
+            game = gameRecord(values[0], values[1], values[2])
+
+    return statusRecord(game, me, players)
+
+
+def diffStatus(previous, current, known=None):
+    """
+    Compare a STATUS with the previous one.
+    :param previous: the previous statusRecord, None if this is the first one.
+    :param current: the new statusRecord.
+    :param known: function symbol -> the Player known now with that symbol, None if unknown. When given, positions and
+    states are compared with the known players instead of the previous STATUS: LOOK and the chat may have changed
+    them in between.
+    :return: a statusDiff.
+    """
+    if previous is None:
+        return statusDiff(list(current.players.keys()), [], [], 0, 0)
+
+    new = []
+    moved = []
+    stateChanged = []
+    for symbol, player in current.players.items():
+        before = previous.players.get(symbol)
+        if before is not None and known is not None:
+            before = known(symbol)
+        if before is None:
+            new.append(symbol)
+            continue
+        if before.x != player.x or before.y != player.y:
+            moved.append((symbol, (before.x, before.y), (player.x, player.y)))
+        if before.state != player.state:
+            stateChanged.append((symbol, before.state, player.state))
+
+    energyDelta = 0
+    scoreDelta = 0
+    if previous.me is not None and current.me is not None:
+        if isinstance(current.me.energy, int) and isinstance(previous.me.energy, int):
+            energyDelta = current.me.energy - previous.me.energy
+        if isinstance(current.me.score, int) and isinstance(previous.me.score, int):
+            scoreDelta = current.me.score - previous.me.score
+
+    return statusDiff(new, moved, stateChanged, energyDelta, scoreDelta)
@@ -0,0 +1,169 @@
+import asyncio
+import configparser
+import os
+import sys
+import time
+from random import randint
+from threading import Thread
+
+from connection.asyncConnection import asyncConnectToServer, asyncConnectToChat
+from connection.rateLimiter import tokenBucket, parseCosts
+from data_structure import gameStatus
+
+"""
+Single-process host: many Karens in one process. The server and chat connections of all of them are driven by one
+shared asyncio event loop, every Karen takes her decisions in her own thread inside her agentContext (see
+data_structure/gameStatus.py), and the models are loaded once for the whole process (see analyzers/models.py).
+Run it with: python host.py <karens> [room] (a new BQ1 room when no room is given)
+"""
+
+
+class loopServer(object):
+    """
+    Blocking facade of an asyncConnectToServer driven by the host loop, with the surface of connectToServer used by
+    Karen. The commands of a Karen are written in order, sendAsync returns without waiting for the response.
+    """
+    pipelined = True
+
+    def __init__(self, loop, connection):
+        self.loop = loop
+        self.connection = connection
+
+    def sendAsync(self, command, split=True):
+        """
+        :return: a concurrent.futures.Future that will hold the response from server.
+        """
+        return asyncio.run_coroutine_threadsafe(self.connection.send(command), self.loop)
+
+    def send(self, command, split=True):
+        return self.sendAsync(command, split).result()
+
+    def sendBlock(self, command):
+        return self.send(command, False)
+
+
+class loopChat(object):
+    """
+    Blocking facade of an asyncConnectToChat driven by the host loop, with the surface of ConnectToChat used by Karen.
+    """
+
+    def __init__(self, loop, connection):
+        self.loop = loop
+        self.connection = connection
+
+    def _wait(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def connectToChannel(self, game):
+        self._wait(self.connection.connectToChannel(game))
+
+    def leaveChannel(self, game):
+        self._wait(self.connection.leaveChannel(game))
+
+    def sendInChat(self, game, message):
+        self._wait(self.connection.sendInChat(game, message))
+
+
+class agentHost(object):
+    """
+    Runs Karens in this process. The event loop lives in its own thread; every agent is a thread running a target
+    like main.gamer or main.creator, which receives the serverSocket and chatSocket built on the loop.
+    """
+
+    def __init__(self, configFile=None):
+        config = configparser.ConfigParser()
+        config.read(configFile or os.environ.get('KAREN_CONFIG', 'config'))
+        self.host = config['connectionParam']['HOST']
+        self.port = config['connectionParam']['PORT']
+        self.delay = config['connectionParam']['DELAY']
+        self.chatHost = config['chatParam']['HOST']
+        self.chatPort = config['chatParam']['PORT']
+        self.burst = config.getfloat('rateParam', 'BURST', fallback=1.0)
+        self.costs = config.get('rateParam', 'COSTS', fallback=None)
+        self.maxSpeedup = config.getfloat('rateParam', 'MAXSPEEDUP', fallback=1.0)
+        # RECORD is the directory of the wire logs (see simulation/replay.py), empty to not record
+        self.recordDir = config.get('connectionParam', 'RECORD', fallback='')
+
+        self.loop = asyncio.new_event_loop()
+        self.loopThread = Thread(target=self.loop.run_forever, name="agentHost", daemon=True)
+        self.loopThread.start()
+        self.agents = []
+
+    def connect(self, name, agent, recorder=None):
+        """
+        Open the connections of an agent on the loop.
+        :param name: the name of the Karen, used in the chat.
+        :param agent: her agentContext, which receives her chat messages.
+        :param recorder: the wireRecorder of her traffic, None to not record.
+        :return: (loopServer, loopChat), None if a connection failed.
+        """
+        rate = 1 / float(self.delay)
+        limiter = tokenBucket(rate, capacity=self.burst, costs=parseCosts(self.costs), maxRate=rate * self.maxSpeedup)
+        server = asyncConnectToServer(self.host, self.port, self.delay, limiter, recorder)
+        chat = asyncConnectToChat(self.chatHost, self.chatPort, name, agent.postMessage, recorder)
+
+        if not asyncio.run_coroutine_threadsafe(server.open(), self.loop).result():
+            return None
+        if not asyncio.run_coroutine_threadsafe(chat.open(), self.loop).result():
+            return None
+        return loopServer(self.loop, server), loopChat(self.loop, chat)
+
+    def spawn(self, target, name, *args):
+        """
+        Start an agent.
+        :param target: the function run by the agent, called as target(name, *args, serverSocket=, chatSocket=).
+        :param name: the name of the Karen.
+        """
+        thread = Thread(target=self._run, args=(target, name, args), name=name)
+        thread.start()
+        self.agents.append(thread)
+        return thread
+
+    def _run(self, target, name, args):
+        agent = gameStatus.useContext(gameStatus.agentContext())
+        recorder = None
+        if self.recordDir != '':
+            from connection.recorder import wireRecorder
+            recorder = wireRecorder(os.path.join(self.recordDir, name + "_" + str(os.getpid()) + ".krec"))
+        try:
+            sockets = self.connect(name, agent, recorder)
+            if sockets is None:
+                print(name + ": connection failed.")
+                return
+            target(name, *args, serverSocket=sockets[0], chatSocket=sockets[1])
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+    def join(self):
+        for thread in self.agents:
+            thread.join()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+if __name__ == '__main__':
+    from analyzers.models import preload
+    from launcher import memory
+    from main import gamer, creator
+
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    started = time.perf_counter()
+    preload()
+    print("models loaded once in " + str(round(time.perf_counter() - started, 1)) + " s")
+
+    host = agentHost()
+    if len(sys.argv) > 2:
+        room = sys.argv[2]
+    else:
+        room = str(randint(300000, 9000000))
+        host.spawn(creator, 'KarenA', room, "BQ1")
+        number -= 1
+    for i in range(number):
+        host.spawn(gamer, 'Karen' + str(i), room)
+
+    # let the agents build their connections and threads before measuring
+    time.sleep(10)
+    usage = memory(os.getpid())
+    if usage is not None:
+        print(str(len(host.agents)) + " agents in one process: rss " + str(usage[0] // 1024) + " MB")
+    host.join()
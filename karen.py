@@ -1,16 +1,25 @@
 import configparser
+import os
 import re
 import time
 
-from analyzers.chatAnalyzer import chatAnalyzer
-from analyzers.gameAnalyzer import gameAnalyzer
-from analyzers.playersAnalyzer import playersAnalyzer
+from analyzers.chatAnalyzer import chatAnalyzer, subscribeGameHandlers
 from connection.chatConnection import ConnectToChat, ReceiveThread
+from connection.rateLimiter import tokenBucket, parseCosts
 from connection.serverConnection import connectToServer
-from strategy.fuzzyStrategy import *
-from strategy.lowLevelStrategy import lowLevelStrategy, lowLevelStrategyImpostor
-from strategy.onMapFunctions import deterministicMap, whereItMoved, deterministicImpostorMap
-from strategy.movement import *
+from data_structure import gameStatus
+from data_structure.gameStatus import Game, Player
+from data_structure.statusParser import parseStatus, diffStatus
+from strategy.movement import movement, rb_movement
+
+"""
+Only the connection, the parsers and the chat analysis are imported here. The subsystems built on numpy, scipy,
+skfuzzy, pathfinding and TensorFlow are imported by the methods that first use them, so that importing karen (and
+registering to a game) does not pay for them: see benchmarks/startupProfile.py.
+"""
+
+# direction of a MOVE -> (dx, dy) of the step
+STEPS = {"N": (0, -1), "S": (0, 1), "W": (-1, 0), "E": (1, 0)}
 
 
 class Karen:
@@ -18,41 +27,71 @@ class Karen:
     Karen identify the AI-subsystem that is able to play an AmongAIs match
     """
 
-    def __init__(self, name, strategyType):
+    def __init__(self, name, strategyType, serverSocket=None, chatSocket=None):
         """
         Construct a new 'Karen' object.
 
         :param name: The name of the AI
+        :param serverSocket: an already built server driver (e.g. the simulator), None to connect to the server.
+        :param chatSocket: an already built chat driver, None to connect to the chat system.
         :return: returns nothing
         """
         # Identify the Karen as a Player
-        gameStatus.game = Game(None)
+        gameStatus.context().game = Game(None)
         gameStatus.game.me = Player(name)
+        subscribeGameHandlers(gameStatus.game.events)
 
         gameStatus.game.me.movement = rb_movement(movement)
         self.strategyType = strategyType
 
+        # KAREN_CONFIG selects another config file, e.g. config_local for the local stand-in servers
         config = configparser.ConfigParser()
-        config.read('config')
+        config.read(os.environ.get('KAREN_CONFIG', 'config'))
 
         self.host = config['connectionParam']['HOST']
         self.port = config['connectionParam']['PORT']
         self.delay = config['connectionParam']['DELAY']
+        self.pipelined = config['connectionParam'].getboolean('PIPELINE', fallback=False)
+        # (action, direction, future) of the MOVE and SHOOT queued by doActions in pipelined mode
+        self.pendingActions = []
+
+        # adaptive rate limiter, starting from one command every DELAY seconds. MAXSPEEDUP above 1 lets it probe
+        # faster rates than DELAY
+        rate = 1 / float(self.delay)
+        self.limiter = tokenBucket(rate,
+                                   capacity=config.getfloat('rateParam', 'BURST', fallback=1.0),
+                                   costs=parseCosts(config.get('rateParam', 'COSTS', fallback=None)),
+                                   maxRate=rate * config.getfloat('rateParam', 'MAXSPEEDUP', fallback=1.0))
 
         self.host_chat = config['chatParam']['HOST']
         self.port_chat = config['chatParam']['PORT']
 
         self.maxWeight = int(config['envParam']["MAXWEIGHT"])
 
+        # RECORD is the directory of the wire logs (see simulation/replay.py), empty to not record
+        self.recorder = None
+        recordDir = config.get('connectionParam', 'RECORD', fallback='')
+        if recordDir != '' and serverSocket is None:
+            from connection.recorder import wireRecorder
+            self.recorder = wireRecorder(os.path.join(recordDir, name + "_" + str(os.getpid()) + ".krec"))
+
         # Initialize the connection to the server and the chat system
-        self.serverSocket = connectToServer(self.host, self.port, self.delay)
+        if serverSocket is not None:
+            self.serverSocket = serverSocket
+            self.pipelined = getattr(serverSocket, 'pipelined', False)
+        else:
+            self.serverSocket = connectToServer(self.host, self.port, self.delay, self.pipelined, self.limiter,
+                                                self.recorder)
 
         self.ChatHOST = config['chatParam']['HOST']
         self.ChatPORT = config['chatParam']['PORT']
 
-        self.chatSocket = ConnectToChat(self.ChatHOST, self.ChatPORT, gameStatus.game.me.name)
-        t_r = ReceiveThread('Receive', self.chatSocket.net, gameStatus.game.me.name)
-        t_r.start()
+        if chatSocket is not None:
+            self.chatSocket = chatSocket
+        else:
+            self.chatSocket = ConnectToChat(self.ChatHOST, self.ChatPORT, gameStatus.game.me.name)
+            t_r = ReceiveThread('Receive', self.chatSocket.net, gameStatus.game.me.name, self.recorder)
+            gameStatus.startThread(t_r)
 
     def createGame(self, gameName, flags):
         time.sleep(0.5)
@@ -154,184 +193,158 @@ class Karen:
     def lookStatus(self):
         """
         Retrieve information about the game status and of all the player (allies and enemies) in that room.
+        Only the players whose position or state differs from the one known now are updated.
         :return: True if information updated, False ow.
         """
-        response = self.serverSocket.send(gameStatus.game.name + " STATUS")
+        response = self.serverSocket.sendBlock(gameStatus.game.name + " STATUS")
+        self.settleActions()
 
         if response[0] == 'OK LONG':
-            for s in range(0, len(response)):
-                # Parse information about the Game
-                if response[s].startswith("GA:"):
-                    row = re.split(' |=', response[s])
-                    gameStatus.game.name = row[2]
-                    gameStatus.game.state = row[4]
-                    gameStatus.game.size = row[6]
-
-                # Parse information about Karen
-                if response[s].startswith("ME:"):
-                    row = re.split(' |=', response[s])
-                    gameStatus.game.me.symbol = row[2]
-                    gameStatus.game.me.name = row[4]
-                    gameStatus.game.me.team = row[6]
-                    gameStatus.game.me.loyalty = row[8]
-                    gameStatus.game.me.energy = row[10]
-                    gameStatus.game.me.score = row[12]
-
-                # Parse information about other players (allies or enemies)
-                elif response[s].startswith("PL:"):
-                    row = re.split(' |=', response[s])
-
-                    # Karen is also present in the PLAYER list
-                    if row[2] == gameStatus.game.me.symbol:
-
-                        # reset map cell
-                        if gameStatus.game.serverMap is not None:
-                            gameStatus.game.serverMap[gameStatus.game.me.y][gameStatus.game.me.x] = "."
-
-                        gameStatus.game.me.x = int(row[8])
-                        gameStatus.game.me.y = int(row[10])
-                        gameStatus.game.me.state = row[12]
-
-                        # refresh my position on the map
-                        if gameStatus.game.serverMap is not None:
-                            gameStatus.game.serverMap[gameStatus.game.me.y][
-                                gameStatus.game.me.x] = gameStatus.game.me.symbol
-
-                    # Not Karen, update information of other players
+            status = parseStatus(response.block)
+            previous = gameStatus.game.lastStatus
+            gameStatus.game.lastStatus = status
+
+            # Parse information about the Game
+            if status.game is not None:
+                gameStatus.game.name = status.game.name
+                gameStatus.game.state = status.game.state
+                gameStatus.game.size = status.game.size
+
+            # Parse information about Karen
+            me = gameStatus.game.me
+            if status.me is not None:
+                me.symbol, me.name, me.team, me.loyalty, me.energy, me.score = status.me
+                if gameStatus.game.bySymbol.get(me.symbol) is not me:
+                    gameStatus.game.indexPlayer(me, True)
+
+            # compared with the players as they are now: LOOK and the chat change them between two STATUS
+            diff = diffStatus(previous, status, self.playerBySymbol)
+            gameStatus.game.lastStatusDiff = diff
+
+            # Players never seen before (Karen is also present in the PLAYER list)
+            for symbol in diff.new:
+                record = status.players[symbol]
+                if symbol == me.symbol:
+                    self.refreshPosition(me, record.x, record.y)
+                    me.state = record.state
+
+                elif gameStatus.game.playerBySymbol(symbol) is None:
+                    pl = Player(record.name)
+                    pl.symbol = symbol
+                    pl.team = record.team
+                    pl.x = record.x
+                    pl.y = record.y
+                    pl.state = record.state
+                    gameStatus.game.addPlayer(pl, pl.team == me.team)
 
-                    else:
-                        if gameStatus.game.allies.get(row[2]) is None and gameStatus.game.enemies.get(row[2]) is None:
-                            pl = Player(row[4])
-                            pl.symbol = row[2]
-                            pl.team = row[6]
-                            pl.x = int(row[8])
-                            pl.y = int(row[10])
-                            pl.state = row[12]
-                            if pl.team == gameStatus.game.me.team:
-                                gameStatus.game.allies[pl.symbol] = pl
-                            else:
-                                gameStatus.game.enemies[pl.symbol] = pl
-
-                        elif gameStatus.game.allies.get(row[2]) is not None:
-
-                            # reset map cell
-                            if gameStatus.game.serverMap is not None:
-                                gameStatus.game.serverMap[gameStatus.game.allies.get(row[2]).y][
-                                    gameStatus.game.allies.get(row[2]).x] = "."
-                            gameStatus.game.allies.get(row[2]).x = int(row[8])
-                            gameStatus.game.allies.get(row[2]).y = int(row[10])
-                            gameStatus.game.allies.get(row[2]).state = row[12]
-
-                            # refresh ally position on the map
-                            if gameStatus.game.serverMap is not None:
-                                gameStatus.game.serverMap[gameStatus.game.allies.get(row[2]).y][
-                                    gameStatus.game.allies.get(row[2]).x] = gameStatus.game.allies.get(row[2]).symbol
-
-                        elif gameStatus.game.enemies.get(row[2]) is not None:
-
-                            # reset map cell
-                            if gameStatus.game.serverMap is not None:
-                                gameStatus.game.serverMap[gameStatus.game.enemies.get(row[2]).y][
-                                    gameStatus.game.enemies.get(row[2]).x] = "."
-                                # adding the action sequence made by an enemy.
-                                sequence = whereItMoved(gameStatus.game.enemies.get(row[2]).x, gameStatus.game.enemies.get(row[2]).y, int(row[8]), int(row[10]))
-                                """
-                                print(str(row[2]) + " prima sequenza: " + str(
-                                    gameStatus.game.enemies.get(row[2]).actionList))
-                                print(str(row[2]) + " Sequenza " + str(sequence))
-                                """
-                                gameStatus.game.enemies.get(row[2]).actionList.extend(sequence)
-
-                            gameStatus.game.enemies.get(row[2]).x = int(row[8])
-                            gameStatus.game.enemies.get(row[2]).y = int(row[10])
-                            gameStatus.game.enemies.get(row[2]).state = row[12]
-
-                            # refresh enemy position on the map
-                            if gameStatus.game.serverMap is not None:
-                                gameStatus.game.serverMap[gameStatus.game.enemies.get(row[2]).y][
-                                    gameStatus.game.enemies.get(row[2]).x] = gameStatus.game.enemies.get(row[2]).symbol
-
-            '''
-            if gameStatus.game.serverMap is not None:
-                for row in gameStatus.game.serverMap:
-                    print(row)
-            '''
+                else:
+                    pl = self.playerBySymbol(symbol)
+                    self.refreshPosition(pl, record.x, record.y)
+                    pl.state = record.state
+
+            # Players that moved or changed state
+            for symbol, before, after in diff.moved:
+                self.refreshPosition(self.playerBySymbol(symbol), after[0], after[1])
+
+            for symbol, before, after in diff.stateChanged:
+                self.playerBySymbol(symbol).state = after
 
             return True
 
         else:
             return False
 
-    def lookAtMap(self, firstTime):
+    def playerBySymbol(self, symbol):
+        """
+        :param symbol: the symbol of a player.
+        :return: the Player (Karen, ally or enemy), None if unknown.
+        """
+        if symbol == gameStatus.game.me.symbol:
+            return gameStatus.game.me
+        return gameStatus.game.playerBySymbol(symbol)
+
+    def refreshPosition(self, player, x, y):
+        """
+        Move a player to a new position, updating the map and the action sequence of the enemies.
+        :param player: the Player.
+        :param x: the new column.
+        :param y: the new row.
+        """
+        if gameStatus.game.serverMap is not None and player.x is not None and player.y is not None:
+            # reset map cell
+            gameStatus.game.setCell(player.x, player.y, ".")
+            if gameStatus.game.isAlly.get(player.symbol) is False:
+                from strategy.onMapFunctions import whereItMoved
+                # adding the action sequence made by an enemy.
+                player.actionList.extend(whereItMoved(player.x, player.y, x, y))
 
-        def split(word):
-            return [char for char in word]
+        player.x = x
+        player.y = y
 
+        # refresh the player position on the map
+        if gameStatus.game.serverMap is not None:
+            gameStatus.game.setCell(x, y, player.symbol)
+
+    def lookAtMap(self, firstTime):
         """
         Let the AI to look at the map (works only if the game started).
         This function update all the information about the players in the 'Game' structure.
         :param firstTime: True if this is the first time the function is called. Used to retrieve FLAGS position.
-        :return: The map if available, None ow.
+        :return: The map as a uint8 grid (also in gameStatus.game.serverGrid) if available, None ow.
         """
-        response = self.serverSocket.send(gameStatus.game.name + " LOOK")
+        response = self.serverSocket.sendBlock(gameStatus.game.name + " LOOK")
+        self.settleActions()
 
         if response[0] == 'OK LONG':
-            response.pop(0)
-            response.pop(len(response) - 1)
-            actualMap = []
-
-            for i in range(0, len(response)):
-
-                splitted = split(response[i])
-                for j in range(0, len(splitted)):
-                    # For each symbol in the map, check if it identifies a player. If so, update its position information
-                    if gameStatus.game.allies.get(splitted[j]) is not None:
-                        gameStatus.game.allies.get(splitted[j]).x = j
-                        gameStatus.game.allies.get(splitted[j]).y = i
-
-                    elif gameStatus.game.enemies.get(splitted[j]) is not None:
-
-                        # adding the action sequence made by an enemy.
-                        if firstTime is False:
-                            sequence = whereItMoved(gameStatus.game.enemies.get(splitted[j]).x, gameStatus.game.enemies.get(splitted[j]).y, j, i)
-
-                            gameStatus.game.enemies.get(splitted[j]).actionList.extend(sequence)
-
-
-
-                        gameStatus.game.enemies.get(splitted[j]).x = j
-                        gameStatus.game.enemies.get(splitted[j]).y = i
-                    elif gameStatus.game.me.symbol == splitted[j]:
-                        gameStatus.game.me.x = j
-                        gameStatus.game.me.y = i
-
-                    # Used only the first time that Karen looks at the map. Find FLAGS position
-                    if firstTime is True:
-
-                        if splitted[j] == "x" and gameStatus.game.me.symbol.isupper():
-                            gameStatus.game.wantedFlagName = "x"
-                            gameStatus.game.wantedFlagX = j
-                            gameStatus.game.wantedFlagY = i
-                        elif splitted[j] == "x" and gameStatus.game.me.symbol.islower():
-                            gameStatus.game.toBeDefendedFlagName = "x"
-                            gameStatus.game.toBeDefendedFlagX = j
-                            gameStatus.game.toBeDefendedFlagY = i
-                        elif splitted[j] == "X" and gameStatus.game.me.symbol.islower():
-                            gameStatus.game.wantedFlagName = "X"
-                            gameStatus.game.wantedFlagX = j
-                            gameStatus.game.wantedFlagY = i
-                        elif splitted[j] == "X" and gameStatus.game.me.symbol.isupper():
-                            gameStatus.game.toBeDefendedFlagName = "X"
-                            gameStatus.game.toBeDefendedFlagX = j
-                            gameStatus.game.toBeDefendedFlagY = i
-
-                actualMap.append(splitted)
-
-                if firstTime is True:
-                    gameStatus.game.mapWidth = len(actualMap[0])
-                    gameStatus.game.mapHeight = len(actualMap)
-
-            return actualMap
+            from data_structure.lookParser import parseLook, locateSymbols
+            from strategy.onMapFunctions import whereItMoved
+            grid = parseLook(response.block)
+
+            me = gameStatus.game.me
+            # every known player, Karen included
+            symbols = list(gameStatus.game.bySymbol.keys())
+            if me.symbol is not None and me.symbol not in gameStatus.game.bySymbol:
+                symbols.append(me.symbol)
+            # Used only the first time that Karen looks at the map. Find FLAGS position
+            if firstTime is True:
+                symbols.extend(["x", "X"])
+
+            # Update the position of every player found in the map
+            for symbol, (x, y) in locateSymbols(grid, symbols).items():
+                if symbol == me.symbol:
+                    me.x = x
+                    me.y = y
+
+                elif gameStatus.game.isAlly.get(symbol) is True:
+                    ally = gameStatus.game.bySymbol[symbol]
+                    ally.x = x
+                    ally.y = y
+
+                elif gameStatus.game.isAlly.get(symbol) is False:
+                    enemy = gameStatus.game.bySymbol[symbol]
+
+                    # adding the action sequence made by an enemy.
+                    if firstTime is False:
+                        enemy.actionList.extend(whereItMoved(enemy.x, enemy.y, x, y))
+
+                    enemy.x = x
+                    enemy.y = y
+
+                elif symbol == "x" and me.symbol.isupper() or symbol == "X" and me.symbol.islower():
+                    gameStatus.game.wantedFlagName = symbol
+                    gameStatus.game.wantedFlagX = x
+                    gameStatus.game.wantedFlagY = y
+
+                elif symbol == "x" or symbol == "X":
+                    gameStatus.game.toBeDefendedFlagName = symbol
+                    gameStatus.game.toBeDefendedFlagX = x
+                    gameStatus.game.toBeDefendedFlagY = y
+
+            if firstTime is True:
+                gameStatus.game.mapHeight, gameStatus.game.mapWidth = grid.shape
+
+            gameStatus.game.serverGrid = grid
+            return grid
 
         else:
             print("Map not retrieved.")
@@ -353,7 +366,7 @@ class Karen:
         if direction is None:
             return False
         response = self.serverSocket.send(gameStatus.game.name + " MOVE " + direction)
-        if response[0] == "OK moved":
+        if self.actionApplied("MOVE", direction, response) and response[0] == "OK moved":
             # print('Ok moved')
             return True
         return False
@@ -366,6 +379,65 @@ class Karen:
         """
         return self.serverSocket.send(gameStatus.game.name + " SHOOT " + direction)
 
+    def doActions(self, nextActions):
+        """
+        Issue a list of (action, direction) pairs. In pipelined mode the commands are only queued: their responses
+        arrive, in order, before the one of the next LOOK or STATUS, and are checked by settleActions before it is
+        parsed. A batch with a shoot is settled at once, the strategy needs to know if the bullet was fired.
+        :param nextActions: list of ("move"|"shoot", direction).
+        :return: True if at least one shoot has been applied by the server, False ow.
+        """
+        shot = False
+        for (action, direction) in nextActions:
+            if action == "move" and direction is not None:
+                if self.pipelined:
+                    self.pendingActions.append(("MOVE", direction, self.serverSocket.sendAsync(
+                        gameStatus.game.name + " MOVE " + direction)))
+                else:
+                    self.move(direction)
+            if action == "shoot":
+                if self.pipelined:
+                    self.pendingActions.append(("SHOOT", direction, self.serverSocket.sendAsync(
+                        gameStatus.game.name + " SHOOT " + direction)))
+                    shot = True
+                elif self.actionApplied("SHOOT", direction, self.shoot(direction)):
+                    shot = True
+        if shot and self.pipelined:
+            shot = self.settleActions()
+        return shot
+
+    def settleActions(self):
+        """
+        Wait for the responses of the MOVE and SHOOT queued by doActions and check them as move() and shoot() do.
+        :return: True if at least one of them is a shoot applied by the server, False ow.
+        """
+        shot = False
+        pending, self.pendingActions = self.pendingActions, []
+        for action, direction, future in pending:
+            try:
+                response = future.result()
+            except ConnectionError as e:
+                response = e
+            if self.actionApplied(action, direction, response) and action == "SHOOT":
+                shot = True
+        return shot
+
+    def actionApplied(self, action, direction, response):
+        """
+        Check the response of a MOVE or a SHOOT: a refused or lost command is logged, a successful MOVE moves Karen.
+        :param response: the serverResponse, or the exception of a command lost with the connection.
+        :return: True if the server applied the action.
+        """
+        if isinstance(response, Exception) or not response[0].startswith("OK"):
+            reason = str(response) if isinstance(response, Exception) else response[0]
+            print(gameStatus.game.me.name + ": " + action + " " + direction + " not applied: " + reason)
+            return False
+        me = gameStatus.game.me
+        if action == "MOVE" and response[0] == "OK moved" and me.x is not None and me.y is not None:
+            dx, dy = STEPS[direction]
+            self.refreshPosition(me, me.x + dx, me.y + dy)
+        return True
+
     def accuse(self, playerName):
         """
          Basic function that send the "ACCUSE" command to the server
@@ -398,17 +470,29 @@ class Karen:
         self.lookStatus()
 
         chat_analyzer = chatAnalyzer("chatAnalyzer")
-        chat_analyzer.start()
+        gameStatus.startThread(chat_analyzer)
 
-        while gameStatus.game.state == "LOBBY":
-            self.lookStatus()
+        try:
+            while gameStatus.game.state == "LOBBY":
+                self.lookStatus()
 
-        if gameStatus.game.state == "ACTIVE":
-            self.strategy(self.strategyType)
-        else:
-            print("Error. Game status from LOBBY to " + str(gameStatus.game.state) + gameStatus.game.me.name)
-            return False
-        return True
+            if gameStatus.game.state == "ACTIVE":
+                self.strategy(self.strategyType)
+            else:
+                print("Error. Game status from LOBBY to " + str(gameStatus.game.state) + gameStatus.game.me.name)
+                return False
+            return True
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Flush and close the wire log, if recording. Called when the match is over.
+        :return: -
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def strategy(self, strategyType):
         """
@@ -416,15 +500,15 @@ class Karen:
         :param strategyType: the type of the strategy. Defined in Karen's init
         :return: -
         """
+        from strategy.mapEngine import staticLayer
+        from strategy.onMapFunctions import deterministicMap
 
-        gameStatus.game.serverMap = self.lookAtMap(True)
+        self.lookAtMap(True)
+        # the terrain does not change during the match: the weighted maps only lay the players over it
+        gameStatus.game.staticLayer = staticLayer(gameStatus.game.serverGrid, gameStatus.game)
         gameStatus.game.weightedMap = deterministicMap(self.maxWeight)
 
-        players_analyzer = playersAnalyzer("playersAnalyzer")
-        players_analyzer.start()
-
-        game_analyzer = gameAnalyzer("gameAnalyzer", self.maxWeight)
-        game_analyzer.start()
+        self.startAnalyzers()
 
         if strategyType == "lowLevelStrategy":
             self.llStrategy()
@@ -439,24 +523,35 @@ class Karen:
             print("Hai sbagliato nome della strategy. Riprova controllando i param di Karen.")
             return False
 
+    def startAnalyzers(self):
+        """
+        Start the threads that analyze the game and the other players while the strategy runs.
+        """
+        from analyzers.gameAnalyzer import gameAnalyzer
+        from analyzers.playersAnalyzer import playersAnalyzer
+
+        players_analyzer = playersAnalyzer("playersAnalyzer")
+        gameStatus.startThread(players_analyzer)
+
+        game_analyzer = gameAnalyzer("gameAnalyzer", self.maxWeight)
+        gameStatus.startThread(game_analyzer)
+
     def llStrategy(self):
         """
         Call the lowLevelStrategy. Run to the flag with only basic forecasting decisions *PROTO1*
         :return: True at the end of the game
         """
+        from strategy.lowLevelStrategy import lowLevelStrategy
+        from strategy.onMapFunctions import deterministicMap
 
         while gameStatus.game.state != 'FINISHED' and gameStatus.game.me.state != "KILLED":
 
             nextActions = lowLevelStrategy(self.maxWeight, gameStatus.game.wantedFlagX, gameStatus.game.wantedFlagY)
             # self.chatSocket.sendInChat(gameStatus.game.name, "You are a bitch!!!")
-            for (action, direction) in nextActions:
-                if action == "move":
-                    self.move(direction)
-                if action == "shoot":
-                    self.shoot(direction)
+            self.doActions(nextActions)
 
             # AGGIORNAMENTO
-            gameStatus.game.serverMap = self.lookAtMap(False)
+            self.lookAtMap(False)
             gameStatus.game.weightedMap = deterministicMap(self.maxWeight)
 
             # self.lookStatus()
@@ -474,6 +569,9 @@ class Karen:
         """
         Call the fuzzyStrategy. Uses fuzzy rule to take the best decision.
         """
+        from strategy.fuzzyStrategy import FuzzyControlSystem
+        from strategy.lowLevelStrategy import lowLevelStrategy
+        from strategy.onMapFunctions import deterministicMap
 
         while gameStatus.game.state != 'FINISHED' and gameStatus.game.me.state != "KILLED":
             doIneedToCheckEnergy = False
@@ -540,18 +638,13 @@ class Karen:
 
                 nextActions = lowLevelStrategy(self.maxWeight, endx, endy)
 
-                for (action, direction) in nextActions:
-                    if action == "move":
-                        self.move(direction)
-                    if action == "shoot":
-                        self.shoot(direction)
-                        doIneedToCheckEnergy = True
+                doIneedToCheckEnergy = self.doActions(nextActions)
 
             # AGGIORNAMENTO
             if doIneedToCheckEnergy is True:
                 self.lookStatus()
             else:
-                gameStatus.game.serverMap = self.lookAtMap(False)
+                self.lookAtMap(False)
 
             gameStatus.game.weightedMap = deterministicMap(self.maxWeight)
 
@@ -574,7 +667,11 @@ class Karen:
         """
         Call the fuzzyStrategy related to the impostor. Uses fuzzy rule to take the best decision.
         """
-        gameStatus.game.weightedImpostorMap = deterministicImpostorMap(self.maxWeight)
+        from strategy.fuzzyStrategy import FuzzyControlSystemImpostor
+        from strategy.lowLevelStrategy import lowLevelStrategy
+        from strategy.onMapFunctions import deterministicMaps
+
+        gameStatus.game.weightedMap, gameStatus.game.weightedImpostorMap = deterministicMaps(self.maxWeight)
 
         while gameStatus.game.state != 'FINISHED' and gameStatus.game.me.state != "KILLED":
             doIneedToCheckEnergy = False
@@ -644,21 +741,15 @@ class Karen:
 
                 nextActions = lowLevelStrategy(self.maxWeight, endx, endy)
 
-                for (action, direction) in nextActions:
-                    if action == "move":
-                        self.move(direction)
-                    if action == "shoot":
-                        self.shoot(direction)
-                        doIneedToCheckEnergy = True
+                doIneedToCheckEnergy = self.doActions(nextActions)
 
             # AGGIORNAMENTO
             if doIneedToCheckEnergy is True:
                 self.lookStatus()
             else:
-                gameStatus.game.serverMap = self.lookAtMap(False)
+                self.lookAtMap(False)
 
-            gameStatus.game.weightedMap = deterministicMap(self.maxWeight)
-            gameStatus.game.weightedImpostorMap = deterministicImpostorMap(self.maxWeight)
+            gameStatus.game.weightedMap, gameStatus.game.weightedImpostorMap = deterministicMaps(self.maxWeight)
 
 
         if gameStatus.game.state != "FINISHED":
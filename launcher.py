@@ -0,0 +1,98 @@
+import gc
+import multiprocessing
+import sys
+import time
+from random import randint
+
+from analyzers.models import preload
+
+"""
+Pre-fork launcher: skfuzzy, scipy, the subsystems of Karen and the chat classifier are loaded once in this process, then the Karens are forked and share those pages copy-on-write instead of loading everything again each.
+TensorFlow is not fork-safe: every Karen loads it, and the LSTM, at her first prediction.
+Run it with: python launcher.py <karens> [room] (a new BQ1 room when no room is given)
+"""
+
+
+def memory(pid):
+    """
+    :return: (rss, uss) of a process in KB: resident pages and pages not shared with any other process. None if
+    /proc/<pid>/smaps_rollup is not available.
+    """
+    try:
+        with open("/proc/" + str(pid) + "/smaps_rollup") as smaps:
+            rss = 0
+            uss = 0
+            for line in smaps:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Private_"):
+                    uss += int(line.split()[1])
+            return rss, uss
+    except OSError:
+        return None
+
+
+def runAgent(target, args):
+    # the collector was disabled in the parent to keep the shared pages untouched until the fork
+    gc.enable()
+    target(*args)
+
+
+def launch(agents):
+    """
+    Load everything once, freeze the heap and fork one process per agent.
+    :param agents: list of (target, args): the function run by the agent (e.g. main.gamer) and its argument tuple.
+    :return: (processes, seconds spent loading)
+    """
+    gc.disable()
+    started = time.perf_counter()
+    preload(beforeFork=True)
+    loaded = time.perf_counter() - started
+
+    # the objects loaded so far are moved to the permanent generation: the collector of the children will not
+    # write in their pages
+    gc.freeze()
+    context = multiprocessing.get_context("fork")
+    processes = []
+    for target, args in agents:
+        process = context.Process(target=runAgent, args=(target, args))
+        process.start()
+        processes.append(process)
+    gc.enable()
+    return processes, loaded
+
+
+def report(processes):
+    """
+    Print the memory of every agent.
+    """
+    totalUss = 0
+    for process in processes:
+        usage = memory(process.pid)
+        if usage is None:
+            print(process.name + " pid " + str(process.pid) + ": memory not available")
+            continue
+        rss, uss = usage
+        totalUss += uss
+        print(process.name + " pid " + str(process.pid) + ": rss " + str(rss // 1024) + " MB, unique " +
+              str(uss // 1024) + " MB")
+    print("unique memory of all the agents: " + str(totalUss // 1024) + " MB")
+
+
+if __name__ == '__main__':
+    from main import gamer, creator
+
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    if len(sys.argv) > 2:
+        agents = [(gamer, ('Karen' + str(i), sys.argv[2])) for i in range(number)]
+    else:
+        room = str(randint(300000, 9000000))
+        agents = [(creator, ('KarenA', room, "BQ1"))] + [(gamer, ('Karen' + str(i), room)) for i in range(number - 1)]
+    processes, loaded = launch(agents)
+    print("models loaded once in " + str(round(loaded, 1)) + " s, " + str(len(processes)) + " agents forked")
+
+    # let the agents build their connections and threads before measuring
+    time.sleep(10)
+    report(processes)
+    for process in processes:
+        process.join()
@@ -8,8 +8,8 @@ Nuovo main per creare karen multi processo e non multithreading
 """
 
 
-def creator(name, gameName, parameters):
-    k = Karen(name, 'fuzzyStrategy')
+def creator(name, gameName, parameters, serverSocket=None, chatSocket=None):
+    k = Karen(name, 'fuzzyStrategy', serverSocket, chatSocket)
 
     if k.createGame(gameName, parameters):
         k.joinGame(gameName, "AI", "AI", "AI-02")
@@ -18,8 +18,8 @@ def creator(name, gameName, parameters):
             k.startGame()
 
 
-def gamer(name, gameName):
-    k = Karen(name, 'fuzzyStrategy')
+def gamer(name, gameName, serverSocket=None, chatSocket=None):
+    k = Karen(name, 'fuzzyStrategy', serverSocket, chatSocket)
     time.sleep(2)
 
     if k.joinGame(gameName, "AI", "AI", "AI-02") is True:
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from threading import Lock
+
+from nlp.linearScorer import loadClassifier
+
+"""
+Bounded LRU cache of the classifications, keyed by the normalized text of the message: the chat is full of repeated lines (spam,
+copy-pasted insults, announcements) that do not need the classifier again.
+"""
+
+CACHE_SIZE = 4096
+
+# the cache shared by the agents of this process, see sharedClassifier
+shared = None
+sharedLock = Lock()
+
+
+class classificationCache(object):
+    """
+    A classifier (see nlp.linearScorer) with an LRU cache in front. It is thread-safe, so the agents of a process can
+    share one.
+    """
+
+    def __init__(self, classifier, size=CACHE_SIZE):
+        self.classifier = classifier
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def predict(self, texts, keys=None):
+        """
+        :param texts: the normalized messages.
+        :param keys: the cache keys of the messages, the texts themselves if None. Messages with the same key share
+        one classification: the first of them is the one classified.
+        :return: the list of the predicted classes. The misses are classified in a single predict call.
+        """
+        if keys is None:
+            keys = texts
+        result = [None] * len(texts)
+        missing = dict()
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    result[i] = self.entries[key]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+                    self.misses += 1
+
+        if len(missing) > 0:
+            predicted = self.classifier.predict([texts[positions[0]] for positions in missing.values()])
+            with self.lock:
+                for (key, positions), value in zip(missing.items(), predicted):
+                    for i in positions:
+                        result[i] = value
+                    self.entries[key] = value
+                    self.entries.move_to_end(key)
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+        return result
+
+    def hitRate(self):
+        """
+        :return: the fraction of the lookups answered by the cache, 0 before the first lookup.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return self.hits / lookups if lookups > 0 else 0.0
+
+    def stats(self):
+        """
+        :return: dict with hits, misses, hitRate and the number of cached entries.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "hitRate": self.hits / lookups if lookups > 0 else 0.0,
+                    "entries": len(self.entries)}
+
+
+def sharedClassifier():
+    """
+    :return: the classificationCache of this process, built on the first call.
+    """
+    global shared
+    with sharedLock:
+        if shared is None:
+            shared = classificationCache(loadClassifier())
+        return shared
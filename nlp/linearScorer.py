@@ -0,0 +1,136 @@
+import math
+import mmap
+import os
+import pickle
+import re
+import struct
+import sys
+
+"""
+Misogyny classifier without sklearn: the TF-IDF vocabulary, the IDF weights and the logistic regression coefficients
+are compiled in a single file, memory-mapped by every Karen. The decision is a dict lookup per token and a sum.
+
+File format: HEADER (magic, tokens, intercept, negative class, positive class), the idf of every token (float64),
+the coefficient * idf of every token (float64), the tokens (utf-8, one per line) in the same order.
+Compile it with: python -m nlp.linearScorer [vectorizer] [model] [output]
+"""
+
+MAGIC = b"KLINEAR1"
+HEADER = struct.Struct("<8sQdqq")
+
+SCORER_FILE = 'nlp/misogyny.scorer'
+VECTORIZER_FILE = 'nlp/vectorizer.pk'
+MODEL_FILE = 'nlp/model_english_log_reg_tfidf.pk'
+
+# the default token_pattern of the sklearn vectorizers, the one of vectorizer.pk
+TOKEN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def compileScorer(vectorizerPath=VECTORIZER_FILE, modelPath=MODEL_FILE, outputPath=SCORER_FILE):
+    """
+    Export a TfidfVectorizer (word unigrams of the default analyzer, lowercase, no accent stripping, raw counts, l2
+    norm, no sublinear tf) and a binary LogisticRegression in the scorer format. This is the only step that needs
+    sklearn.
+    """
+    with open(vectorizerPath, "rb") as fin:
+        vectorizer = pickle.load(fin)
+    with open(modelPath, "rb") as fin:
+        model = pickle.load(fin)
+    # the normalization parameters live in the inner TfidfTransformer in the sklearn version of vectorizer.pk
+    tfidf = getattr(vectorizer, '_tfidf', vectorizer)
+    if vectorizer.ngram_range != (1, 1) or tfidf.norm != "l2" or tfidf.sublinear_tf or vectorizer.binary or \
+            vectorizer.analyzer != 'word' or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None or \
+            vectorizer.strip_accents is not None or vectorizer.token_pattern != TOKEN.pattern or \
+            not vectorizer.lowercase or len(model.classes_) != 2:
+        raise ValueError("unsupported vectorizer or model")
+
+    tokens = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    idf = vectorizer.idf_
+    weight = model.coef_[0] * idf
+
+    with open(outputPath, "wb") as fout:
+        fout.write(HEADER.pack(MAGIC, len(tokens), float(model.intercept_[0]), int(model.classes_[0]),
+                               int(model.classes_[1])))
+        fout.write(struct.pack("<%dd" % len(tokens), *idf))
+        fout.write(struct.pack("<%dd" % len(tokens), *weight))
+        fout.write("\n".join(tokens).encode('utf-8'))
+
+
+class linearScorer(object):
+    """
+    The compiled classifier. The weights stay in the memory-mapped file, shared by all the processes using it.
+    """
+
+    def __init__(self, path=SCORER_FILE):
+        with open(path, "rb") as fin:
+            self.buffer = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, self.intercept, negative, positive = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError(path + " is not a compiled scorer")
+        self.classes = (negative, positive)
+
+        view = memoryview(self.buffer)
+        start = HEADER.size
+        self.idf = view[start:start + 8 * count].cast('d')
+        self.weight = view[start + 8 * count:start + 16 * count].cast('d')
+        tokens = bytes(view[start + 16 * count:]).decode('utf-8').split("\n")
+        self.index = {token: i for i, token in enumerate(tokens)}
+
+    def decision(self, text):
+        """
+        :return: the decision_function of the logistic regression on the tf-idf vector of text.
+        """
+        counts = dict()
+        for token in TOKEN.findall(text.lower()):
+            i = self.index.get(token)
+            if i is not None:
+                counts[i] = counts.get(i, 0) + 1
+        if len(counts) == 0:
+            return self.intercept
+
+        dot = 0.0
+        norm = 0.0
+        for i, count in counts.items():
+            value = count * self.idf[i]
+            norm += value * value
+            dot += count * self.weight[i]
+        return self.intercept + dot / math.sqrt(norm)
+
+    def predict(self, texts):
+        """
+        :param texts: the preprocessed messages.
+        :return: the list of the predicted classes, as model.predict(vectorizer.transform(texts)).
+        """
+        return [self.classes[1] if self.decision(text) > 0 else self.classes[0] for text in texts]
+
+
+class sklearnClassifier(object):
+    """
+    The pickled vectorizer and model behind the same interface of linearScorer.
+    """
+
+    def __init__(self, vectorizerPath=VECTORIZER_FILE, modelPath=MODEL_FILE):
+        with open(vectorizerPath, "rb") as fin:
+            self.vectorizer = pickle.load(fin)
+        with open(modelPath, "rb") as fin:
+            self.model = pickle.load(fin)
+
+    def decision(self, text):
+        return float(self.model.decision_function(self.vectorizer.transform([text]))[0])
+
+    def predict(self, texts):
+        # the sparse tf-idf matrix goes to the model as it is
+        return self.model.predict(self.vectorizer.transform(texts))
+
+
+def loadClassifier(path=SCORER_FILE):
+    """
+    :return: the compiled linearScorer, or the sklearn models when it has not been compiled.
+    """
+    if os.path.exists(path):
+        return linearScorer(path)
+    return sklearnClassifier()
+
+
+if __name__ == '__main__':
+    compileScorer(*sys.argv[1:4])
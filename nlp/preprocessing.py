@@ -1,29 +1,55 @@
-import pandas as pd, re, numpy as np
+import re
+
+"""
+Normalization of the chat messages before the classification. The patterns are compiled once, the URL patterns are
+tried only when their literal part is in the sentence, and the special characters are removed in a single pass.
+"""
+
+# (pattern, replacement, literal without which the pattern cannot match)
+URL_PATTERNS = [
+    (re.compile(r"https?:\ / \ / (www\.)?[-a - zA - Z0–9 @: %._\+~# =]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0–9@:%_\+.~#?&//=]*)"),
+     ' ', 'http'),
+    (re.compile(r"[-a - zA - Z0–9 @: %._\+~  # =]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0–9@:%_\+.~#?&//=]*)"), ' ', '.'),
+    (re.compile(r'(https|http)?:\/\/(\w|\.|\-|\/|\?|\=|\&|\%)*\b'), '', '://'),
+    (re.compile(r'(www)(\w|\.|\-|\/|\?|\=|\&|\%)*\b'), '', 'www'),
+]
+
+# tag, # e emoji, poi i caratteri speciali rimasti: dopo le prime tre alternative restano solo '-' e '\t'
+SPECIALS = re.compile(r"(@[A-Za-z0–9_]+)|([^-9A-Za-z \t])|(\w+:\/\/\S+)|[-\t]")
+# caratteri rimasti soli dopo eliminazione char speciali
+LONELY = re.compile(r'\s+[a-zA-Z]\s+')
+SPACES = re.compile(r'\s+')
+
+# longest repeated substring collapsed by substitute_repeats
+MAX_REPEAT = 19
+REPEATS = dict()
 
 
 def remove_specials(sentence):
-    # elimino tag, # e emoji
-    sentence = re.sub(r"(@[A-Za-z0–9_]+)|([^-9A-Za-z \t])|(\w+:\/\/\S+)", " ", sentence)
-    # elimino caratteri speciali
-    sentence = re.sub(r'\W', ' ', sentence)
+    # elimino tag, # e emoji e caratteri speciali
+    sentence = SPECIALS.sub(' ', sentence)
     # elimino caratteri rimasti soli dopo eliminazione char speciali
-    sentence = re.sub(r'\s+[a-zA-Z]\s+', ' ', sentence)
+    sentence = LONELY.sub(' ', sentence)
     # elimino doppi spazi
-    sentence = re.sub(r'\s+', ' ', sentence)
+    sentence = SPACES.sub(' ', sentence)
     return (sentence)
 
 
 def remove_urls(sentence):
-    sentence = re.sub(
-        r"https?:\ / \ / (www\.)?[-a - zA - Z0–9 @: %._\+~# =]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0–9@:%_\+.~#?&//=]*)", ' ',
-        sentence)
-    sentence = re.sub(r"[-a - zA - Z0–9 @: %._\+~  # =]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0–9@:%_\+.~#?&//=]*)", ' ',
-                      sentence)
-    sentence = re.sub(r'(https|http)?:\/\/(\w|\.|\-|\/|\?|\=|\&|\%)*\b', '', sentence)
-    sentence = re.sub(r'(www)(\w|\.|\-|\/|\?|\=|\&|\%)*\b', '', sentence)
+    for pattern, replacement, literal in URL_PATTERNS:
+        if literal in sentence:
+            sentence = pattern.sub(replacement, sentence)
     return sentence
 
 
+def repeats_pattern(nchars, ntimes):
+    pattern = REPEATS.get((nchars, ntimes))
+    if pattern is None:
+        pattern = re.compile(r"(\S{{{}}})(\1{{{},}})".format(nchars, ntimes - 1))
+        REPEATS[(nchars, ntimes)] = pattern
+    return pattern
+
+
 def substitute_repeats_fixed_len(text, nchars, ntimes=3):
     """
          Find substrings that consist of `nchars` non-space characters
@@ -34,15 +60,17 @@ def substitute_repeats_fixed_len(text, nchars, ntimes=3):
          abbcccddddeeeee -> abbcde (nchars = 1, ntimes = 3)
          abababcccababab -> abcccab (nchars = 2, ntimes = 2)
     """
-    return re.sub(r"(\S{{{}}})(\1{{{},}})".format(nchars, ntimes - 1), r"\1", text)
+    return repeats_pattern(nchars, ntimes).sub(r"\1", text)
 
 
 def substitute_repeats(sentence, ntimes=3):
-    # Truncate consecutive repeats of short strings
-    for nchars in range(1, 20):
-        s = substitute_repeats_fixed_len(sentence, nchars, ntimes)
+    # Truncate consecutive repeats of short strings, from 1 to MAX_REPEAT characters long.
+    # A repeat needs a word of at least nchars * ntimes characters: longer nchars are skipped.
+    longest = max([len(word) for word in sentence.split()], default=0)
+    for nchars in range(1, min(MAX_REPEAT, longest // ntimes) + 1):
+        sentence = substitute_repeats_fixed_len(sentence, nchars, ntimes)
 
-    return s
+    return sentence
 
 
 def translate_foreign(sentence):
@@ -58,4 +86,3 @@ def pre_process(sentence, do_translation):
         sentence = translate_foreign(sentence)
 
     return sentence
-
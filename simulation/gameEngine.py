@@ -0,0 +1,397 @@
+import random
+import string
+import time
+
+"""
+Rules of an AmongAIs match, used by the local stand-in servers and by the headless simulator.
+The engine answers to the same commands of the real server with the same response lines.
+"""
+
+# map side for the 0/1/2 size flags, wide maps are twice as wide
+MAP_SIZES = {"0": 32, "1": 64, "2": 128}
+
+MAX_ENERGY = 256
+TRAP_DAMAGE = 32
+CAPTURE_SCORE = 10
+HIT_SCORE = 1
+
+# symbols that stop players and bullets
+WALLS = "#&"
+UNWALKABLE = "#@&"
+
+DIRECTIONS = {"N": (0, -1), "S": (0, 1), "W": (-1, 0), "E": (1, 0)}
+
+# team 0 players are uppercase and defend "X", team 1 players are lowercase and defend "x"
+TEAM_SYMBOLS = [[c for c in string.ascii_uppercase if c != "X"], [c for c in string.ascii_lowercase if c != "x"]]
+FLAGS = ["X", "x"]
+
+# stage 0: no shoot, stage 1: no capture the flag, stage 2: normal game (seconds from the start)
+STAGE_TIMES = (5, 15)
+GAME_DURATION = 300
+
+
+class enginePlayer(object):
+    """
+    A player as seen by the server.
+    """
+
+    def __init__(self, name, symbol, team, loyalty, nature, userInfo):
+        self.name = name
+        self.symbol = symbol
+        self.team = team
+        self.loyalty = loyalty
+        self.nature = nature
+        self.userInfo = userInfo
+        self.x = None
+        self.y = None
+        self.state = "ACTIVE"
+        self.energy = MAX_ENERGY
+        self.score = 0
+
+
+def generateMap(height, width, rng):
+    """
+    Random map with walls (#), unwalkable blocks (@), barriers (&), a river (~), traps (!) and recharges ($).
+    :return: the map as a list of rows (lists of symbols).
+    """
+    grid = [["."] * width for _ in range(height)]
+
+    def segment(symbol, length):
+        x = rng.randrange(4, width - 4)
+        y = rng.randrange(height)
+        dx, dy = rng.choice([(1, 0), (0, 1)])
+        for _ in range(length):
+            if 4 <= x < width - 4 and 0 <= y < height:
+                grid[y][x] = symbol
+            x += dx
+            y += dy
+
+    area = height * width
+    for _ in range(area // 120):
+        segment("#", rng.randrange(3, 9))
+    for _ in range(area // 600):
+        segment("&", rng.randrange(2, 5))
+    for _ in range(area // 300):
+        grid[rng.randrange(height)][rng.randrange(4, width - 4)] = "@"
+
+    # a meandering river in the middle of the map
+    x = width // 2
+    for y in range(height):
+        grid[y][x] = "~"
+        x = min(width - 5, max(4, x + rng.choice([-1, 0, 0, 1])))
+
+    for symbol, count in (("!", area // 400 + 1), ("$", area // 300 + 2)):
+        for _ in range(count):
+            grid[rng.randrange(height)][rng.randrange(4, width - 4)] = symbol
+
+    grid[height // 2][1] = FLAGS[0]
+    grid[height // 2][width - 2] = FLAGS[1]
+    return grid
+
+
+class gameEngine(object):
+    """
+    A single game room.
+    """
+
+    def __init__(self, name, flags="", seed=None, clock=time.time, stageTimes=STAGE_TIMES, duration=GAME_DURATION):
+        """
+        :param name: the game name.
+        :param flags: creation flags, Q squared / W wide map, 0/1/2 map size, B balanced teams, T training.
+        :param seed: seed of the random generator (map, impostors).
+        :param clock: function returning the current time in seconds, real or virtual.
+        :param stageTimes: seconds from the start when stage 1 and stage 2 begin.
+        :param duration: seconds from the start when the game ends.
+        """
+        self.name = name
+        self.flags = flags if flags is not None else ""
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.stageTimes = stageTimes
+        self.duration = duration
+
+        size = "1"
+        for c in self.flags:
+            if c in MAP_SIZES:
+                size = c
+        self.height = MAP_SIZES[size]
+        self.width = self.height * 2 if "W" in self.flags else self.height
+        self.grid = generateMap(self.height, self.width, self.rng)
+        # flag symbol -> (x, y)
+        self.flagCells = dict()
+        for y in range(self.height):
+            for x in range(self.width):
+                if self.grid[y][x] in FLAGS:
+                    self.flagCells[self.grid[y][x]] = (x, y)
+
+        self.state = "LOBBY"
+        self.stage = 0
+        self.started = None
+        self.players = dict()
+        self.bySymbol = dict()
+        self.accusations = dict()
+        self.judgements = []
+        self.winner = None
+
+        # chat notifications waiting to be delivered: list of (channel, text)
+        self.events = []
+
+    # ------------------------------------------------------------------------------------------------------------
+    # helpers
+
+    def notify(self, text):
+        self.events.append((self.name, text))
+
+    def drainEvents(self):
+        """
+        :return: the pending notifications, removing them from the engine.
+        """
+        events = self.events
+        self.events = []
+        return events
+
+    def occupant(self, x, y):
+        """
+        :return: the active player in a cell, None if empty.
+        """
+        for player in self.players.values():
+            if player.state == "ACTIVE" and player.x == x and player.y == y:
+                return player
+        return None
+
+    def freeCell(self, team):
+        """
+        :return: a free walkable cell on the side of the map of a team.
+        """
+        while True:
+            x = self.rng.randrange(0, 4) if team == 0 else self.rng.randrange(self.width - 4, self.width)
+            y = self.rng.randrange(self.height)
+            if self.grid[y][x] == "." and self.occupant(x, y) is None:
+                return x, y
+
+    def inside(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def finish(self, winner=None):
+        self.state = "FINISHED"
+        self.winner = winner
+        self.notify("Game finished!" if winner is None else "Game finished! Team " + str(winner) + " wins")
+
+    def tick(self):
+        """
+        Advance stages and end of the game according to the clock.
+        """
+        if self.state != "ACTIVE":
+            return
+        elapsed = self.clock() - self.started
+        if self.stage == 0 and elapsed >= self.stageTimes[0]:
+            self.stage = 1
+            self.notify("Hunting season open!")
+        if self.stage == 1 and elapsed >= self.stageTimes[1]:
+            self.stage = 2
+            self.notify("You can now catch the flag!")
+        if elapsed >= self.duration:
+            self.finish()
+
+    def checkTeams(self):
+        """
+        End the game when all the players of a team have been killed.
+        """
+        for team in (0, 1):
+            alive = [p for p in self.players.values() if p.team == team and p.state == "ACTIVE"]
+            if len(alive) == 0:
+                self.finish(1 - team)
+                return
+
+    # ------------------------------------------------------------------------------------------------------------
+    # commands
+
+    def join(self, name, nature, role, userInfo=None):
+        if self.state != "LOBBY":
+            return ["ERROR 405 Game already started"]
+        if name in self.players:
+            return ["ERROR 409 Name already in use"]
+
+        team = 0
+        counts = [len([p for p in self.players.values() if p.team == t]) for t in (0, 1)]
+        if counts[1] < counts[0]:
+            team = 1
+        if counts[team] >= len(TEAM_SYMBOLS[team]):
+            return ["ERROR 403 Game full"]
+
+        # the third player of each team is an impostor, unless this is a training game
+        loyalty = team
+        if counts[team] == 2 and "T" not in self.flags:
+            loyalty = 1 - team
+
+        player = enginePlayer(name, TEAM_SYMBOLS[team][counts[team]], team, loyalty, nature, userInfo)
+        player.x, player.y = self.freeCell(team)
+        self.players[name] = player
+        self.bySymbol[player.symbol] = player
+        return ["OK team=" + str(team) + " loyalty=" + str(loyalty)]
+
+    def start(self):
+        if self.state != "LOBBY":
+            return ["ERROR 405 Game already started"]
+        self.state = "ACTIVE"
+        self.started = self.clock()
+        self.notify("Now starting!")
+        return ["OK Game started"]
+
+    def status(self, name=None):
+        response = ["OK LONG", "GA: name=" + self.name + " state=" + self.state + " size=" + self.flags]
+        me = self.players.get(name)
+        if me is not None:
+            response.append("ME: symbol=" + me.symbol + " name=" + me.name + " team=" + str(me.team) +
+                            " loyalty=" + str(me.loyalty) + " energy=" + str(me.energy) + " score=" + str(me.score))
+        for player in self.players.values():
+            response.append("PL: symbol=" + player.symbol + " name=" + player.name + " team=" + str(player.team) +
+                            " x=" + str(player.x) + " y=" + str(player.y) + " state=" + player.state)
+        response.append("«ENDOFSTATUS»")
+        return response
+
+    def look(self, name):
+        if self.state == "LOBBY":
+            return ["ERROR 405 Game not started"]
+        rows = [row[:] for row in self.grid]
+        for player in self.players.values():
+            if player.state == "ACTIVE":
+                rows[player.y][player.x] = player.symbol
+        return ["OK LONG"] + ["".join(row) for row in rows] + ["«ENDOFMAP»"]
+
+    def activePlayer(self, name):
+        """
+        :return: (player, None) if the player can act, (None, error response) ow.
+        """
+        if self.state != "ACTIVE":
+            return None, ["ERROR 405 Game not active"]
+        player = self.players.get(name)
+        if player is None:
+            return None, ["ERROR 403 Not joined"]
+        if player.state != "ACTIVE":
+            return None, ["ERROR 406 You are dead"]
+        return player, None
+
+    def move(self, name, direction):
+        player, error = self.activePlayer(name)
+        if error is not None:
+            return error
+        if direction not in DIRECTIONS:
+            return ["ERROR 400 Wrong direction"]
+
+        dx, dy = DIRECTIONS[direction]
+        x = player.x + dx
+        y = player.y + dy
+        if not self.inside(x, y) or self.grid[y][x] in UNWALKABLE or self.occupant(x, y) is not None:
+            return ["OK blocked"]
+
+        cell = self.grid[y][x]
+        if cell in FLAGS:
+            # a flag can be taken only by the other team, in stage 2
+            if cell == FLAGS[player.team] or self.stage < 2:
+                return ["OK blocked"]
+            player.x, player.y = x, y
+            player.score += CAPTURE_SCORE
+            self.finish(player.team)
+            return ["OK moved"]
+
+        player.x, player.y = x, y
+        if cell == "$":
+            player.energy = MAX_ENERGY
+        elif cell == "!":
+            player.energy = max(0, player.energy - TRAP_DAMAGE)
+        return ["OK moved"]
+
+    def shoot(self, name, direction):
+        player, error = self.activePlayer(name)
+        if error is not None:
+            return error
+        if direction not in DIRECTIONS:
+            return ["ERROR 400 Wrong direction"]
+        if self.stage == 0:
+            return ["ERROR 405 Shoot not allowed"]
+        if player.energy <= 0:
+            return ["ERROR 407 No energy"]
+
+        player.energy -= 1
+        self.notify(player.name + " shot " + direction)
+
+        dx, dy = DIRECTIONS[direction]
+        x = player.x + dx
+        y = player.y + dy
+        while self.inside(x, y):
+            if self.grid[y][x] in WALLS:
+                return ["OK " + self.grid[y][x]]
+            target = self.occupant(x, y)
+            if target is not None:
+                target.state = "KILLED"
+                player.score += HIT_SCORE
+                self.notify(player.name + " hit " + target.name)
+                self.checkTeams()
+                return ["OK " + target.symbol]
+            x += dx
+            y += dy
+        return ["OK ."]
+
+    def accuse(self, name, accused):
+        player, error = self.activePlayer(name)
+        if error is not None:
+            return error
+        target = self.players.get(accused)
+        if target is None:
+            return ["ERROR 404 Player not found"]
+
+        if len(self.accusations) == 0:
+            self.notify("EMERGENCY MEETING! Called by " + player.name)
+        self.accusations[name] = accused
+
+        # condemned when accused by more than half of the active players
+        active = len([p for p in self.players.values() if p.state == "ACTIVE"])
+        votes = len([a for a in self.accusations.values() if a == accused])
+        if votes * 2 > active:
+            target.state = "KILLED"
+            self.accusations = dict()
+            self.notify("EMERGENCY MEETING! condamned " + target.name)
+            self.checkTeams()
+        return ["OK"]
+
+    def judge(self, name, judged, nature):
+        if self.players.get(name) is None:
+            return ["ERROR 403 Not joined"]
+        target = self.players.get(judged)
+        if target is None:
+            return ["ERROR 404 Player not found"]
+        self.judgements.append((name, judged, nature))
+        return ["OK"]
+
+    def nop(self):
+        return ["OK"]
+
+    def command(self, name, words):
+        """
+        Execute a game command.
+        :param name: the name of the player that sent the command, None if not joined.
+        :param words: the command words after the game name ("MOVE", "N").
+        :return: the response lines.
+        """
+        self.tick()
+        kind = words[0] if len(words) > 0 else ""
+        if kind == "JOIN" and len(words) >= 4:
+            return self.join(words[1], words[2], words[3], words[4] if len(words) > 4 else None)
+        if kind == "START":
+            return self.start()
+        if kind == "STATUS":
+            return self.status(name)
+        if kind == "LOOK":
+            return self.look(name)
+        if kind == "MOVE" and len(words) == 2:
+            return self.move(name, words[1])
+        if kind == "SHOOT" and len(words) == 2:
+            return self.shoot(name, words[1])
+        if kind == "ACCUSE" and len(words) == 2:
+            return self.accuse(name, words[1])
+        if kind == "JUDGE" and len(words) == 3:
+            return self.judge(name, words[1], words[2])
+        if kind == "NOP":
+            return self.nop()
+        return ["ERROR 400 Unknown command"]
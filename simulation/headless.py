@@ -0,0 +1,285 @@
+import time
+from concurrent.futures import Future
+
+from analyzers.chatAnalyzer import chatAnalysis
+from analyzers.gameAnalyzer import calculateFlagDistances, myEuclideanDistanceToFlag, actualActivePlayers, \
+    aroundMeSituation, nearestSafeCell, nextActionsPrediction
+from analyzers.playersAnalyzer import socialDeduction
+from connection.serverConnection import serverResponse, commandLatency
+from data_structure import gameStatus
+from karen import Karen
+from simulation.gameEngine import gameEngine, DIRECTIONS, FLAGS, WALLS, UNWALKABLE
+
+"""
+Headless in-process simulator: Karen plays against scripted bots on a gameEngine, in virtual time. Every command
+advances the virtual clock by the rate limit delay, so a full match takes no real waiting.
+The wall time left is the one of Karen's decisions: on the size 2 maps it is tens of seconds or more, mostly in the A*
+of the pathfinding library (its open list is scanned linearly at every step). The pathfinding Grid is built once per
+weighted map (see strategy/pathFinder.py).
+"""
+
+
+class matchTimeout(Exception):
+    """
+    Raised by simulatedConnection when a match runs past its wall-clock limit.
+    """
+
+
+class virtualClock(object):
+    """
+    Clock advanced by the simulator instead of by the wall time.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class scriptedBot(object):
+    """
+    Simple opponent driven by the simulator: shoot an aligned enemy when possible, otherwise walk to the flag.
+    """
+
+    def __init__(self, engine, name):
+        self.engine = engine
+        self.name = name
+
+    def aligned(self, player):
+        """
+        :return: the direction of an enemy in line of fire, None if there is none.
+        """
+        for direction, (dx, dy) in DIRECTIONS.items():
+            x = player.x + dx
+            y = player.y + dy
+            while self.engine.inside(x, y) and self.engine.grid[y][x] not in WALLS:
+                target = self.engine.occupant(x, y)
+                if target is not None:
+                    if target.team != player.loyalty:
+                        return direction
+                    break
+                x += dx
+                y += dy
+        return None
+
+    def act(self):
+        player = self.engine.players[self.name]
+        if self.engine.state != "ACTIVE" or player.state != "ACTIVE":
+            return
+
+        if self.engine.stage >= 1 and player.energy > 0:
+            direction = self.aligned(player)
+            if direction is not None:
+                self.engine.shoot(self.name, direction)
+                return
+
+        goalX, goalY = self.engine.flagCells[FLAGS[1 - player.team]]
+        options = []
+        for direction, (dx, dy) in DIRECTIONS.items():
+            x = player.x + dx
+            y = player.y + dy
+            if self.engine.inside(x, y) and self.engine.grid[y][x] not in UNWALKABLE:
+                options.append((abs(goalX - x) + abs(goalY - y) + self.engine.rng.random() * 3, direction))
+        if len(options) > 0:
+            self.engine.move(self.name, min(options)[1])
+
+
+class simulatedConnection(object):
+    """
+    Replacement of connectToServer: commands are executed by a gameEngine. After every command the virtual clock
+    advances by 'delay', the bots act, the @GameServer notifications reach the chat analysis and 'onTick' runs.
+    """
+    pipelined = False
+
+    def __init__(self, engine, clock, delay, playerName, bots, onTick=None, deadline=None):
+        """
+        :param deadline: time.perf_counter() value after which every command raises matchTimeout, None for no limit.
+        """
+        self.deadline = deadline
+        self.engine = engine
+        self.clock = clock
+        self.delay = float(delay)
+        self.playerName = playerName
+        self.bots = bots
+        self.onTick = onTick
+        self.latency = commandLatency()
+        self.commands = 0
+
+    def send(self, command, split=True):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise matchTimeout("wall-clock limit exceeded after " + str(self.commands) + " commands")
+        requested = time.time()
+        words = command.split(" ")
+        if words[0] == "NEW":
+            lines = ["ERROR 409 Game already exists"]
+        elif words[0] != self.engine.name:
+            lines = ["ERROR 404 Game not found"]
+        else:
+            lines = self.engine.command(self.playerName, words[1:])
+
+        response = serverResponse(lines[:1])
+        if lines[0] == "OK LONG":
+            response.block = bytearray("".join(line + "\n" for line in lines[1:-1]).encode('utf-8'))
+            response.terminator = lines[-1]
+            if split:
+                response.extend(lines[1:])
+        # the command is answered here, the rest is the simulated world moving on until the next command
+        written = time.time()
+
+        self.commands += 1
+        self.clock.advance(self.delay)
+        for bot in self.bots:
+            bot.act()
+        self.engine.tick()
+        for channel, text in self.engine.drainEvents():
+            chatAnalysis(None, (channel + " @GameServer " + text, self.clock()))
+        if self.onTick is not None:
+            self.onTick()
+
+        answered = time.time()
+        self.latency.record(command, requested, written, answered)
+        return response
+
+    def sendBlock(self, command):
+        return self.send(command, False)
+
+    def sendAsync(self, command, split=True):
+        future = Future()
+        future.set_result(self.send(command, split))
+        return future
+
+
+class simulatedChat(object):
+    """
+    Replacement of ConnectToChat: the messages of Karen are only collected.
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def connectToChannel(self, game):
+        return
+
+    def leaveChannel(self, game):
+        return
+
+    def sendInChat(self, game, message):
+        self.sent.append((game, message))
+
+
+class headlessKaren(Karen):
+    """
+    Karen playing on a simulatedConnection: the analyzers run inline after every command instead of in threads.
+    """
+
+    def __init__(self, name, strategyType, connection, lstmModel=None):
+        Karen.__init__(self, name, strategyType, serverSocket=connection, chatSocket=simulatedChat())
+        self.lstmModel = lstmModel
+        self.analyzing = False
+        connection.onTick = self.analyze
+
+    def analyze(self):
+        """
+        One step of gameAnalyzer and playersAnalyzer.
+        """
+        if not self.analyzing or gameStatus.game.state != "ACTIVE":
+            return
+        myEuclideanDistanceToFlag()
+        actualActivePlayers()
+        aroundMeSituation(self.maxWeight)
+        nearestSafeCell()
+        if self.lstmModel is not None:
+            nextActionsPrediction(self.lstmModel)
+        if gameStatus.game.emergencyMeeting == 1:
+            socialDeduction()
+
+    def startAnalyzers(self):
+        calculateFlagDistances()
+        self.analyzing = True
+        self.analyze()
+
+    def waitToStart(self):
+        self.lookStatus()
+        while gameStatus.game.state == "LOBBY":
+            self.lookStatus()
+        if gameStatus.game.state == "ACTIVE":
+            self.strategy(self.strategyType)
+            return True
+        return False
+
+
+class headlessMatch(object):
+    """
+    A match between a headlessKaren and scripted bots.
+    """
+
+    def __init__(self, strategyType="fuzzyStrategy", flags="BQ1", players=6, seed=None, impostor=False,
+                 delay=0.3, stageTimes=(5, 15), duration=300, lstmModel=None, wallLimit=None):
+        """
+        :param strategyType: the strategy of Karen.
+        :param flags: the game creation flags.
+        :param players: total number of players (Karen included).
+        :param seed: seed of the map and of the bots.
+        :param impostor: if True Karen joins as the impostor of her team (third player of team 0).
+        :param delay: virtual seconds taken by every command.
+        :param stageTimes: virtual seconds from the start when stage 1 and stage 2 begin.
+        :param duration: virtual duration of the match.
+        :param lstmModel: the LSTM model used by nextActionsPrediction, None to skip the prediction.
+        :param wallLimit: wall-clock seconds after which run raises matchTimeout (checked at every command), None for
+        no limit.
+        """
+        self.wallLimit = wallLimit
+        self.clock = virtualClock()
+        self.engine = gameEngine("sim" + str(seed), flags, seed=seed, clock=self.clock, stageTimes=stageTimes,
+                                 duration=duration)
+        self.strategyType = strategyType
+        self.playerName = "Karen"
+
+        # players join alternating teams: Karen is the 5th to join (third of team 0) when impostor
+        karenIndex = 4 if impostor else 0
+        names = []
+        for i in range(max(players, karenIndex + 2)):
+            names.append(self.playerName if i == karenIndex else "bot" + str(i))
+        for name in names:
+            self.engine.join(name, "AI", "AI")
+
+        bots = [scriptedBot(self.engine, name) for name in names if name != self.playerName]
+        self.connection = simulatedConnection(self.engine, self.clock, delay, self.playerName, bots)
+        self.karen = headlessKaren(self.playerName, strategyType, self.connection, lstmModel)
+
+    def run(self):
+        """
+        Play the match.
+        :return: dict with the outcome of the match.
+        :raise matchTimeout: if the match runs past wallLimit.
+        """
+        started = time.perf_counter()
+        if self.wallLimit is not None:
+            self.connection.deadline = started + self.wallLimit
+        me = self.engine.players[self.playerName]
+
+        gameStatus.game.name = self.engine.name
+        gameStatus.game.me.team = str(me.team)
+        gameStatus.game.me.loyalty = str(me.loyalty)
+        self.engine.start()
+        self.karen.waitToStart()
+
+        return {"strategy": self.strategyType,
+                "flags": self.engine.flags,
+                "impostor": me.team != me.loyalty,
+                "winner": self.engine.winner,
+                "won": self.engine.winner is not None and self.engine.winner == me.loyalty,
+                "alive": me.state == "ACTIVE",
+                "score": me.score,
+                "ticks": self.connection.commands,
+                "virtualTime": self.clock() - self.engine.started,
+                "wallTime": time.perf_counter() - started,
+                "latency": self.connection.latency.summary()}
+
+
+if __name__ == '__main__':
+    print(headlessMatch(seed=1).run())
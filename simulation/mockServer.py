@@ -0,0 +1,172 @@
+import configparser
+import socketserver
+import sys
+import time
+from threading import Thread, Lock
+
+from simulation.gameEngine import gameEngine
+
+"""
+Local stand-in for the AmongAIs game and chat servers, for offline runs and benchmarks.
+Start it with: python -m simulation.mockServer [configFile]
+and run the Karens with the same config: KAREN_CONFIG=config_local python main.py
+"""
+
+# consecutive "Too fast" after which the connection is closed, as Jarvis does
+MAX_TOO_FAST = 10
+
+
+class mockWorld(object):
+    """
+    State shared by the two servers: the game rooms and the chat channels.
+    """
+
+    def __init__(self, delay):
+        self.delay = float(delay)
+        self.lock = Lock()
+        self.games = dict()
+        self.channels = dict()
+
+    def broadcast(self, channel, sender, text):
+        """
+        Send a chat line to every member of a channel.
+        """
+        line = (channel + " " + sender + " " + text + "\n").encode('utf-8')
+        with self.lock:
+            members = list(self.channels.get(channel, ()))
+        for member in members:
+            try:
+                member.sendall(line)
+            except OSError:
+                self.leave(channel, member)
+
+    def join(self, channel, conn):
+        with self.lock:
+            self.channels.setdefault(channel, set()).add(conn)
+
+    def leave(self, channel, conn):
+        with self.lock:
+            self.channels.get(channel, set()).discard(conn)
+
+    def notifier(self):
+        """
+        Advance the games clock and deliver the @GameServer notifications.
+        """
+        while True:
+            with self.lock:
+                games = list(self.games.values())
+            for game in games:
+                with self.lock:
+                    game.tick()
+                    events = game.drainEvents()
+                for channel, text in events:
+                    self.broadcast(channel, "@GameServer", text)
+            time.sleep(0.05)
+
+
+class gameHandler(socketserver.StreamRequestHandler):
+    """
+    A connection to the game server: one line per command, one response per command.
+    """
+
+    def handle(self):
+        world = self.server.world
+        player = None
+        last = 0.0
+        tooFast = 0
+
+        for line in self.rfile:
+            command = line.decode('utf-8').strip()
+            if command == "":
+                continue
+
+            now = time.time()
+            if now - last < world.delay:
+                tooFast += 1
+                self.wfile.write(b"ERROR 401 Too fast\n")
+                if tooFast >= MAX_TOO_FAST:
+                    return
+                last = now
+                continue
+            tooFast = 0
+            last = now
+
+            words = command.split(" ")
+            with world.lock:
+                if words[0] == "NEW" and len(words) >= 2:
+                    if words[1] in world.games:
+                        response = ["ERROR 409 Game already exists"]
+                    else:
+                        world.games[words[1]] = gameEngine(words[1], words[2] if len(words) > 2 else "")
+                        response = ["OK Created"]
+                else:
+                    game = world.games.get(words[0])
+                    if game is None:
+                        response = ["ERROR 404 Game not found"]
+                    else:
+                        response = game.command(player, words[1:])
+                        if len(words) > 2 and words[1] == "JOIN" and response[0].startswith("OK"):
+                            player = words[2]
+
+            self.wfile.write(("\n".join(response) + "\n").encode('utf-8'))
+
+
+class chatHandler(socketserver.StreamRequestHandler):
+    """
+    A connection to the chat server: NAME, JOIN, LEAVE and POST commands.
+    """
+
+    def handle(self):
+        world = self.server.world
+        name = None
+        joined = set()
+        try:
+            for line in self.rfile:
+                words = line.decode('utf-8').rstrip("\n").split(" ", 2)
+                if words[0] == "NAME" and len(words) >= 2:
+                    name = words[1]
+                elif words[0] == "JOIN" and len(words) >= 2:
+                    world.join(words[1], self.connection)
+                    joined.add(words[1])
+                elif words[0] == "LEAVE" and len(words) >= 2:
+                    world.leave(words[1], self.connection)
+                    joined.discard(words[1])
+                elif words[0] == "POST" and len(words) == 3 and name is not None:
+                    world.broadcast(words[1], name, words[2])
+        finally:
+            for channel in joined:
+                world.leave(channel, self.connection)
+
+
+class mockTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, world):
+        socketserver.ThreadingTCPServer.__init__(self, address, handler)
+        self.world = world
+
+
+def startServers(gamePort, chatPort, delay, host="127.0.0.1"):
+    """
+    Start the game and chat servers in background threads.
+    :return: (gameServer, chatServer, world)
+    """
+    world = mockWorld(delay)
+    gameServer = mockTCPServer((host, int(gamePort)), gameHandler, world)
+    chatServer = mockTCPServer((host, int(chatPort)), chatHandler, world)
+    Thread(target=gameServer.serve_forever, daemon=True).start()
+    Thread(target=chatServer.serve_forever, daemon=True).start()
+    Thread(target=world.notifier, daemon=True).start()
+    return gameServer, chatServer, world
+
+
+if __name__ == '__main__':
+    config = configparser.ConfigParser()
+    config.read(sys.argv[1] if len(sys.argv) > 1 else 'config_local')
+
+    startServers(config['connectionParam']['PORT'], config['chatParam']['PORT'], config['connectionParam']['DELAY'])
+    print("Game server on port " + config['connectionParam']['PORT'] + ", chat server on port " +
+          config['chatParam']['PORT'] + ". CTRL+C to stop.")
+    while True:
+        time.sleep(1)
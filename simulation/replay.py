@@ -0,0 +1,115 @@
+import re
+import sys
+import time
+from concurrent.futures import Future
+
+from analyzers.chatAnalyzer import chatAnalysis
+from connection.rateLimiter import commandType
+from connection.recorder import readLog, COMMAND, CHAT
+from connection.serverConnection import serverResponse, splitBlock
+from data_structure import gameStatus
+from nlp.classificationCache import sharedClassifier
+from simulation.headless import headlessKaren
+
+"""
+Replay of a wire log written by a wireRecorder: the recorded responses and chat messages are fed back through Karen
+at full speed, without waiting for the rate limit.
+Run it with: python -m simulation.replay <log> [strategy]
+"""
+
+
+class replayConnection(object):
+    """
+    Replacement of connectToServer: every command gets the next recorded response. The chat messages recorded before
+    that response are analyzed first.
+    """
+    pipelined = False
+
+    def __init__(self, frames, classifier, onTick=None):
+        """
+        :param frames: the (kind, timestamp, value) frames of the log, from the first one to replay.
+        :param classifier: misogyny classifier for the chatAnalysis.
+        """
+        self.frames = frames
+        self.position = 0
+        self.classifier = classifier
+        self.onTick = onTick
+        self.lastCommand = None
+        self.responses = 0
+        self.chats = 0
+        # commands of Karen of a different type than the recorded ones (the replay diverged from the game)
+        self.mismatches = 0
+
+    def send(self, command, split=True):
+        while self.position < len(self.frames):
+            kind, timestamp, value = self.frames[self.position]
+            self.position += 1
+            if kind == COMMAND:
+                self.lastCommand = value
+            elif kind == CHAT:
+                chatAnalysis(self.classifier, (value, timestamp))
+                self.chats += 1
+            else:
+                if self.lastCommand is not None and commandType(self.lastCommand) != commandType(command):
+                    self.mismatches += 1
+                self.responses += 1
+                if split and value.block is not None:
+                    value = serverResponse(value[:1] + splitBlock(value.block) + [value.terminator])
+                if self.onTick is not None:
+                    self.onTick()
+                return value
+
+        # end of the log: the game is over for Karen
+        gameStatus.game.state = "FINISHED"
+        return serverResponse(["ERROR end of the replay"])
+
+    def sendBlock(self, command):
+        return self.send(command, False)
+
+    def sendAsync(self, command, split=True):
+        future = Future()
+        future.set_result(self.send(command, split))
+        return future
+
+
+def replay(path, strategyType="fuzzyStrategy"):
+    """
+    Replay a log from the JOIN of Karen.
+    :param path: the log file.
+    :param strategyType: the strategy of Karen.
+    :return: dict with the counters of the replay.
+    """
+    frames = list(readLog(path))
+    start = None
+    for i, (kind, timestamp, value) in enumerate(frames):
+        if kind == COMMAND and commandType(value) == "JOIN":
+            start = i
+    if start is None:
+        raise ValueError(path + " does not contain a JOIN")
+
+    words = frames[start][2].split(" ")
+    answer = next(i for i in range(start, len(frames)) if frames[i][0] != COMMAND and frames[i][0] != CHAT)
+    joined = frames[answer][2]
+    if not joined[0].startswith("OK"):
+        raise ValueError(path + ": the recorded JOIN failed")
+
+    connection = replayConnection(frames[answer + 1:], sharedClassifier())
+    karen = headlessKaren(words[2], strategyType, connection)
+
+    # the same as joinGame, without its wait
+    row = re.split(' |=', joined[0])
+    gameStatus.game.name = words[0]
+    gameStatus.game.me.team = row[2]
+    gameStatus.game.me.loyalty = row[4]
+
+    started = time.perf_counter()
+    karen.waitToStart()
+    return {"responses": connection.responses,
+            "chats": connection.chats,
+            "mismatches": connection.mismatches,
+            "classificationCache": connection.classifier.stats(),
+            "wallTime": time.perf_counter() - started}
+
+
+if __name__ == '__main__':
+    print(replay(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "fuzzyStrategy"))
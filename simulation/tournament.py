@@ -0,0 +1,110 @@
+import csv
+import sys
+import time
+import traceback
+from multiprocessing import Pool, cpu_count
+from random import Random
+
+from simulation.headless import headlessMatch
+
+"""
+Self-play tournament: thousands of headless matches spread over a process pool. Every finished match becomes a row of
+the results file as soon as it arrives, so the memory does not grow with the number of matches.
+Every match has a wall-clock limit: a match that runs past it becomes a row with its error.
+Run it with: python -m simulation.tournament [matches] [resultsFile] [processes] [wallLimit seconds]
+"""
+
+STRATEGIES = ("fuzzyStrategy", "lowLevelStrategy")
+SIZES = ("0", "1", "2")
+SHAPES = ("Q", "W")
+
+# wall-clock seconds a match may take
+WALL_LIMIT = 120
+
+COLUMNS = ["match", "seed", "strategy", "flags", "impostor", "winner", "won", "alive", "score", "ticks",
+           "virtualTime", "wallTime", "commands", "decisionMean", "decisionMax", "error"]
+
+
+def matchSpecs(matches, seed=0, wallLimit=WALL_LIMIT):
+    """
+    Generate the matches of the tournament: every strategy plays loyal and impostor on every map.
+    :param wallLimit: wall-clock seconds a match may take, None for no limit.
+    :return: generator of dicts with the parameters of headlessMatch.
+    """
+    rng = Random(seed)
+    layouts = [(strategy, impostor, shape + size)
+               for strategy in STRATEGIES for impostor in (False, True) for shape in SHAPES for size in SIZES]
+    for i in range(matches):
+        strategy, impostor, layout = layouts[i % len(layouts)]
+        yield {"match": i,
+               "seed": rng.getrandbits(32),
+               "strategy": strategy,
+               "impostor": impostor,
+               "flags": "B" + layout,
+               "wallLimit": wallLimit}
+
+
+def playMatch(spec):
+    """
+    Worker: play one match.
+    :return: the row of the results file.
+    """
+    row = dict.fromkeys(COLUMNS, "")
+    row.update(spec)
+    try:
+        result = headlessMatch(spec["strategy"], spec["flags"], seed=spec["seed"], impostor=spec["impostor"],
+                               wallLimit=spec["wallLimit"]).run()
+    except Exception:
+        row["error"] = traceback.format_exc().splitlines()[-1]
+        return row
+
+    # the decision latency is the time Karen spends between an answer and her next command
+    latency = result.pop("latency")
+    commands = sum(kind["count"] for kind in latency.values())
+    row.update(result)
+    row["commands"] = commands
+    if commands > 0:
+        row["decisionMean"] = sum(kind["own"] * kind["count"] for kind in latency.values()) / commands
+        row["decisionMax"] = max(kind["ownMax"] for kind in latency.values())
+    return row
+
+
+def runTournament(matches, output, processes=None, seed=0, chunksize=4, wallLimit=WALL_LIMIT):
+    """
+    Play the tournament and stream the results in a csv file, one column per field.
+    :param matches: number of matches.
+    :param output: path of the results file.
+    :param processes: size of the pool, the number of cores by default.
+    :param wallLimit: wall-clock seconds a match may take, None for no limit.
+    :return: dict (strategy, impostor) -> [played, won, ticks] over the matches without errors.
+    """
+    totals = dict()
+    started = time.perf_counter()
+    specs = matchSpecs(matches, seed, wallLimit)
+    with open(output, "w", newline="") as results, Pool(processes or cpu_count()) as pool:
+        writer = csv.DictWriter(results, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for done, row in enumerate(pool.imap_unordered(playMatch, specs, chunksize), 1):
+            writer.writerow(row)
+            if row["error"] == "":
+                total = totals.setdefault((row["strategy"], row["impostor"]), [0, 0, 0])
+                total[0] += 1
+                total[1] += 1 if row["won"] else 0
+                total[2] += row["ticks"]
+            if done % 100 == 0:
+                results.flush()
+                print(str(done) + "/" + str(matches) + " matches, " +
+                      str(round(done / (time.perf_counter() - started), 1)) + " matches/s")
+    return totals
+
+
+if __name__ == '__main__':
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    output = sys.argv[2] if len(sys.argv) > 2 else "tournament.csv"
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    wallLimit = float(sys.argv[4]) if len(sys.argv) > 4 else WALL_LIMIT
+
+    totals = runTournament(matches, output, processes, wallLimit=wallLimit)
+    for (strategy, impostor), (played, won, ticks) in sorted(totals.items()):
+        print(strategy + (" impostor" if impostor else " loyal") + ": win rate " + str(round(won / played, 3)) +
+              ", mean ticks " + str(round(ticks / played, 1)) + " over " + str(played) + " matches")
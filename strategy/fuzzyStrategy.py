@@ -1,7 +1,7 @@
 from strategy.pathFinder import findPath, findPath4Fuzzy
 from data_structure import gameStatus
 from data_structure.gameStatus import *
-from karen import *
+import time
 import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
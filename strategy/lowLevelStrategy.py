@@ -1,5 +1,8 @@
 from data_structure import gameStatus
 from data_structure.gameStatus import *
+from strategy.mapEngine import lineOfFire
+
+RIVER = ord("~")
 
 
 def lowLevelStrategy(maxWeight, endx, endy):
@@ -16,11 +19,14 @@ def lowLevelStrategy(maxWeight, endx, endy):
         print("Exception generated by movement.move")
         return nextActions
 
-    # se sto in linea con altri, sparo
+    # se sto in linea con altri, sparo (solo a chi posso colpire: niente muri o alleati in mezzo)
+    segments, cuts = lineOfFire(gameStatus.game, gameStatus.game.allies.keys())
+    me = (gameStatus.game.me.x, gameStatus.game.me.y)
     for key in gameStatus.game.enemies:
         enemy = gameStatus.game.enemies.get(key)
 
-        if enemy.state == "ACTIVE" and gameStatus.game.weightedMap[gameStatus.game.me.y][gameStatus.game.me.x] == int(maxWeight / 2):
+        if enemy.state == "ACTIVE" and gameStatus.game.weightedMap[gameStatus.game.me.y][gameStatus.game.me.x] == int(maxWeight / 2) \
+                and segments.canHit(me, (enemy.x, enemy.y), cuts):
             if gameStatus.game.me.x == enemy.x:
                 if gameStatus.game.me.y > enemy.y:
                     nextActions.append(("shoot", "N"))
@@ -37,7 +43,7 @@ def lowLevelStrategy(maxWeight, endx, endy):
     if direction == "E" and gameStatus.game.weightedMap[gameStatus.game.me.y][gameStatus.game.me.x + 1] == int(maxWeight / 2):
 
         # my x becomes  x+1
-        if gameStatus.game.serverMap[gameStatus.game.me.y][gameStatus.game.me.x + 1] == "~":
+        if gameStatus.game.serverGrid[gameStatus.game.me.y, gameStatus.game.me.x + 1] == RIVER:
             nextActions.append(("move", direction))
 
         else:
@@ -60,7 +66,7 @@ def lowLevelStrategy(maxWeight, endx, endy):
     elif direction == "W" and gameStatus.game.weightedMap[gameStatus.game.me.y][gameStatus.game.me.x - 1] == int(maxWeight / 2):
 
         # my x becomes  x-1
-        if gameStatus.game.serverMap[gameStatus.game.me.y][gameStatus.game.me.x - 1] == "~":
+        if gameStatus.game.serverGrid[gameStatus.game.me.y, gameStatus.game.me.x - 1] == RIVER:
             nextActions.append(("move", direction))
         else:
             for key in gameStatus.game.enemies:
@@ -82,7 +88,7 @@ def lowLevelStrategy(maxWeight, endx, endy):
     elif direction == "S" and gameStatus.game.weightedMap[gameStatus.game.me.y + 1][gameStatus.game.me.x] == int(maxWeight / 2):
 
         # my y becomes  y+1
-        if gameStatus.game.serverMap[gameStatus.game.me.y + 1][gameStatus.game.me.x] == "~":
+        if gameStatus.game.serverGrid[gameStatus.game.me.y + 1, gameStatus.game.me.x] == RIVER:
             nextActions.append(("move", direction))
         else:
             for key in gameStatus.game.enemies.keys():
@@ -104,7 +110,7 @@ def lowLevelStrategy(maxWeight, endx, endy):
     elif direction == "N" and gameStatus.game.weightedMap[gameStatus.game.me.y - 1][gameStatus.game.me.x] == int(maxWeight / 2):
 
         # my y becomes  y-1
-        if gameStatus.game.serverMap[gameStatus.game.me.y - 1][gameStatus.game.me.x] == "~":
+        if gameStatus.game.serverGrid[gameStatus.game.me.y - 1, gameStatus.game.me.x] == RIVER:
             nextActions.append(("move", direction))
 
         else:
@@ -169,7 +175,7 @@ def lowLevelStrategyImpostor(self, endx, endy):
         if direction == "E" and gameStatus.game.weightedImposotrMap[gameStatus.game.me.y][gameStatus.game.me.x + 1] == int(self.maxWeight / 2):
 
             # my x becomes  x+1
-            if gameStatus.game.serverMap[gameStatus.game.me.y][gameStatus.game.me.x + 1] == "~":
+            if gameStatus.game.serverGrid[gameStatus.game.me.y, gameStatus.game.me.x + 1] == RIVER:
                 nextActions.append(("move", direction))
 
             else:
@@ -192,7 +198,7 @@ def lowLevelStrategyImpostor(self, endx, endy):
         elif direction == "W" and gameStatus.game.weightedImpostorMap[gameStatus.game.me.y][gameStatus.game.me.x - 1] == int(self.maxWeight / 2):
 
             # my x becomes  x-1
-            if gameStatus.game.serverMap[gameStatus.game.me.y][gameStatus.game.me.x - 1] == "~":
+            if gameStatus.game.serverGrid[gameStatus.game.me.y, gameStatus.game.me.x - 1] == RIVER:
                 nextActions.append(("move", direction))
             else:
                 for key in gameStatus.game.allies:
@@ -214,7 +220,7 @@ def lowLevelStrategyImpostor(self, endx, endy):
         elif direction == "S" and gameStatus.game.weightedImpostorMap[gameStatus.game.me.y + 1][gameStatus.game.me.x] == int(self.maxWeight / 2):
 
             # my y becomes  y+1
-            if gameStatus.game.serverMap[gameStatus.game.me.y + 1][gameStatus.game.me.x] == "~":
+            if gameStatus.game.serverGrid[gameStatus.game.me.y + 1, gameStatus.game.me.x] == RIVER:
                 nextActions.append(("move", direction))
             else:
                 for key in gameStatus.game.allies.keys():
@@ -236,7 +242,7 @@ def lowLevelStrategyImpostor(self, endx, endy):
         elif direction == "N" and gameStatus.game.weightedImpostorMap[gameStatus.game.me.y - 1][gameStatus.game.me.x] == int(self.maxWeight / 2):
 
             # my y becomes  y-1
-            if gameStatus.game.serverMap[gameStatus.game.me.y - 1][gameStatus.game.me.x] == "~":
+            if gameStatus.game.serverGrid[gameStatus.game.me.y - 1, gameStatus.game.me.x] == RIVER:
                 nextActions.append(("move", direction))
 
             else:
@@ -0,0 +1,607 @@
+from bisect import bisect_left
+from itertools import chain
+
+import numpy as np
+
+"""
+Vectorized engine of the weighted maps. The map is the uint8 grid of lookParser: the terrain weights come from a
+symbol -> weight lookup table and the fire lines from the wall-bounded segments of rows and columns, so a ray is a
+slice fill instead of a walk cell by cell.
+The map is split in a static layer (the terrain, built once per game) and a dynamic layer (the players), a weighted map
+is the static terrain weights with the cells of the players and their fire lines laid over them.
+"""
+
+# cells that stop a fire line, besides the players of the team that is not hostile
+FIRE_BLOCKERS = "#&"
+
+# symbols of the terrain, which never changes during a match
+TERRAIN = ".~!#@$&"
+
+# weight of the symbols without a terrain weight: the weighted map keeps the symbol itself
+UNKNOWN = -1
+
+
+def symbolGrid(game):
+    """
+    :return: the map of the game as a (height, width) uint8 grid.
+    """
+    return game.serverGrid
+
+
+def symbolCodes(symbols):
+    """
+    :param symbols: iterable of one-character symbols.
+    :return: their codes as an uint8 array.
+    """
+    return np.frombuffer("".join(symbols).encode('ascii'), dtype=np.uint8)
+
+
+def symbolMask(symbols):
+    """
+    :return: bool array of 256 entries, True for the codes of the symbols: indexed with a grid it marks their cells.
+    """
+    mask = np.zeros(256, dtype=bool)
+    mask[symbolCodes(symbols)] = True
+    return mask
+
+
+def terrainTable(maxWeight, game):
+    """
+    Lookup table of the terrain weights, the same priority of the checks of the old per-cell pass (walkable first,
+    players last).
+    :return: int array of 256 entries, symbol code -> weight, UNKNOWN for the symbols without a weight.
+    """
+    table = np.full(256, UNKNOWN, dtype=np.int64)
+    players = list(game.allies.keys()) + list(game.enemies.keys())
+    if game.me.symbol is not None:
+        players.append(game.me.symbol)
+
+    # from the lowest priority to the highest one: every assignment overrides the previous ones
+    table[symbolCodes(players)] = 1
+    if game.toBeDefendedFlagName is not None:
+        table[ord(game.toBeDefendedFlagName)] = 0
+    if game.wantedFlagName is not None:
+        table[ord(game.wantedFlagName)] = 1
+    table[ord("&")] = 0
+    table[ord("$")] = 1
+    table[symbolCodes("#@")] = 0
+    table[ord("!")] = int(maxWeight)
+    table[ord("~")] = int(maxWeight / 3)
+    table[ord(".")] = 1
+    return table
+
+
+def lineSegments(walls):
+    """
+    The wall-bounded segments of the rows of a map.
+    :param walls: (height, width) bool array, True where a fire line stops.
+    :return: (ids, rows, starts, ends): the (height, width) segment id of every cell (-1 on the walls) and, for every id,
+    its row and its extent [start, end).
+    """
+    free = ~walls
+    first = free.copy()
+    first[:, 1:] &= walls[:, :-1]
+    last = free.copy()
+    last[:, :-1] &= walls[:, 1:]
+
+    ids = (np.cumsum(first.ravel()) - 1).reshape(walls.shape).astype(np.int32)
+    ids[walls] = -1
+    # np.nonzero scans in row order, the order of the ids
+    rows, starts = np.nonzero(first)
+    ends = np.nonzero(last)[1] + 1
+    return ids, rows.tolist(), starts.tolist(), ends.tolist()
+
+
+class segmentIndex(object):
+    """
+    Index of the wall-bounded segments of the rows and of the columns, built once per game from the walls and the
+    barriers. The players that stop the fire lines are not in the index: they cut the segments at lookup time (see
+    cuts), so the index stays valid while they move.
+    """
+
+    def __init__(self, walls):
+        """
+        :param walls: (height, width) bool array, True where a fire line stops.
+        """
+        self.width = walls.shape[1]
+        self.rowIds, self.rowLines, self.rowStarts, self.rowEnds = lineSegments(walls)
+        columnIds, self.columnLines, self.columnStarts, self.columnEnds = lineSegments(walls.T)
+        self.columnIds = columnIds.T
+
+    def cuts(self, cells):
+        """
+        :param cells: (rows, columns) of the players that stop the fire lines.
+        :return: (rowCuts, columnCuts): row segment id -> sorted columns of those players in it, column segment id ->
+        sorted rows.
+        """
+        rowCuts = dict()
+        columnCuts = dict()
+        for y, x in zip(cells[0].tolist(), cells[1].tolist()):
+            rowCuts.setdefault(int(self.rowIds[y, x]), []).append(x)
+            columnCuts.setdefault(int(self.columnIds[y, x]), []).append(y)
+        for positions in list(rowCuts.values()) + list(columnCuts.values()):
+            positions.sort()
+        return rowCuts, columnCuts
+
+    def rowBounds(self, y, x, cuts=None):
+        """
+        :param cuts: the result of self.cuts, None if no player stops the fire lines.
+        :return: (start, end): the cells of row y reached by a fire line through (x, y) are [start, end).
+        """
+        segment = int(self.rowIds[y, x])
+        if segment < 0:
+            return x, x
+        return narrow(x, self.rowStarts[segment], self.rowEnds[segment], cuts[0].get(segment) if cuts else None)
+
+    def columnBounds(self, y, x, cuts=None):
+        """
+        :return: (start, end): the cells of column x reached by a fire line through (x, y) are [start, end).
+        """
+        segment = int(self.columnIds[y, x])
+        if segment < 0:
+            return y, y
+        return narrow(y, self.columnStarts[segment], self.columnEnds[segment], cuts[1].get(segment) if cuts else None)
+
+    def canHit(self, shooter, target, cuts=None):
+        """
+        :param shooter: (x, y) of the shooter.
+        :param target: (x, y) of the target.
+        :return: True if the two cells are on the same row or column and nothing stops a fire line between them.
+        """
+        (x, y), (targetX, targetY) = shooter, target
+        if y == targetY:
+            start, end = self.rowBounds(y, x, cuts)
+            return start <= targetX < end
+        if x == targetX:
+            start, end = self.columnBounds(y, x, cuts)
+            return start <= targetY < end
+        return False
+
+
+def narrow(position, start, end, cuts):
+    """
+    :param cuts: sorted positions of the players in the segment [start, end), or None.
+    :return: the part of the segment around position not cut by the players, empty if a player is in position.
+    """
+    if not cuts:
+        return start, end
+    i = bisect_left(cuts, position)
+    if i < len(cuts) and cuts[i] == position:
+        return position, position
+    if i > 0:
+        start = cuts[i - 1] + 1
+    if i < len(cuts):
+        end = cuts[i]
+    return start, end
+
+
+def fireLines(y, x, height, width):
+    """
+    The rays of a player at (x, y), as the old recursiveMap calls drew them.
+    :return: (main, around): lists of ('row', y, x) and ('column', y, x) rays, each one the segment through the cell.
+    'main' holds the row and the column of the player, 'around' the rows above and below starting from the column of
+    the player and the columns on the left and on the right starting from the row of the player.
+    """
+    main = [('row', y, x), ('column', y, x)]
+    around = []
+    vertical = y - 1 >= 0 or y + 1 < height
+    horizontal = x - 1 >= 0 or x + 1 < width
+    if y - 1 >= 0 and horizontal:
+        around.append(('row', y - 1, x))
+    if y + 1 < height and horizontal:
+        around.append(('row', y + 1, x))
+    if x - 1 >= 0 and vertical:
+        around.append(('column', y, x - 1))
+    if x + 1 < width and vertical:
+        around.append(('column', y, x + 1))
+    return main, around
+
+
+def rayCells(rays, segments, cuts, known):
+    """
+    :param segments: the segmentIndex of the map.
+    :param cuts: the players that stop the fire lines, see segmentIndex.cuts.
+    :param known: dict ray -> cells of the rays already bounded with the same cuts, filled by the call.
+    :return: the cells reached by every ray, as slices of the flattened grid: a ray never holds a cell twice.
+    """
+    width = segments.width
+    cells = []
+    for ray in rays:
+        found = known.get(ray)
+        if found is None:
+            direction, y, x = ray
+            if direction == 'row':
+                start, end = segments.rowBounds(y, x, cuts)
+                found = np.s_[y * width + start:y * width + end]
+            else:
+                start, end = segments.columnBounds(y, x, cuts)
+                found = np.s_[start * width + x:end * width + x:width]
+            known[ray] = found
+        cells.append(found)
+    return cells
+
+
+def paintRays(weights, painted, cells, weight):
+    """
+    Paint the cells of some rays with a weight, leaving the cells already painted untouched (the first fire line
+    reaching a cell decides its weight).
+    :param weights: the flattened weights.
+    :param painted: the flattened bool array of the cells already painted.
+    :param cells: the cells of the rays, see rayCells.
+    """
+    for ray in cells:
+        free = ~painted[ray]
+        weights[ray][free] = weight
+        painted[ray] = True
+
+
+class staticLayer(object):
+    """
+    The terrain of a game, built from the first LOOK: walls, barriers, rivers, traps, recharges and flags do not move
+    during a match. The cells covered by a player at that time are 'hidden': their terrain is read from the current map
+    every time.
+    """
+
+    def __init__(self, grid, game):
+        """
+        :param grid: the uint8 map of the first LOOK.
+        :param game: the Game, with the names of the flags.
+        """
+        flags = "".join(name for name in (game.wantedFlagName, game.toBeDefendedFlagName) if name is not None)
+        self.terrain = grid.copy()
+        self.terrain.flags.writeable = False
+        self.walls = symbolMask(FIRE_BLOCKERS)[grid]
+        self.walls.flags.writeable = False
+        self.segments = segmentIndex(self.walls)
+        self.hidden = np.nonzero(~symbolMask(TERRAIN + flags)[grid])
+        self.weights = dict()
+
+    def terrainWeights(self, maxWeight, game):
+        """
+        :return: the (height, width) weights of the terrain, computed once for every maxWeight. Read only.
+        """
+        key = (maxWeight, game.wantedFlagName, game.toBeDefendedFlagName)
+        weights = self.weights.get(key)
+        if weights is None:
+            weights = terrainTable(maxWeight, game)[self.terrain]
+            weights.flags.writeable = False
+            self.weights[key] = weights
+        return weights
+
+
+class dynamicLayer(object):
+    """
+    The players on the map, the symbol -> (y, x) of every known player found in his cell of the current map, and the
+    fire lines kept up to date move by move (see fireLineMap).
+    """
+
+    def __init__(self):
+        self.positions = dict()
+        self.fireLines = dict()
+
+    def refresh(self, grid, game):
+        """
+        Find the players in the current map.
+        """
+        positions = dict()
+        players = list(game.bySymbol.items())
+        if game.me is not None and game.me.symbol is not None:
+            players.append((game.me.symbol, game.me))
+        for symbol, player in players:
+            if player.x is not None and player.y is not None and grid[player.y, player.x] == ord(symbol):
+                positions[symbol] = (player.y, player.x)
+        self.positions = positions
+
+    def cells(self, symbols=None):
+        """
+        :param symbols: the players to consider, None for all of them.
+        :return: (rows, columns) of their cells, ready to index a grid.
+        """
+        if symbols is None:
+            found = list(self.positions.values())
+        else:
+            found = [self.positions[symbol] for symbol in symbols if symbol in self.positions]
+        return np.array([y for y, _ in found], dtype=np.intp), np.array([x for _, x in found], dtype=np.intp)
+
+
+def mapLayers(game):
+    """
+    :return: (grid, static, dynamic) of the current map of the game. The static layer is built the first time (see
+    Karen.strategy) and kept in game.staticLayer, the dynamic layer is kept in game.dynamicLayer and refreshed.
+    """
+    grid = symbolGrid(game)
+    if game.staticLayer is None or game.staticLayer.terrain.shape != grid.shape:
+        game.staticLayer = staticLayer(grid, game)
+    if game.dynamicLayer is None:
+        game.dynamicLayer = dynamicLayer()
+    game.dynamicLayer.refresh(grid, game)
+    return grid, game.staticLayer, game.dynamicLayer
+
+
+class threatSpec(object):
+    """
+    One of the views computed by threatViews.
+    """
+
+    def __init__(self, maxWeight, hostile, blocking, around=True):
+        """
+        :param hostile: the Players whose fire lines are painted (only the active ones).
+        :param blocking: the symbols of the players that stop the fire lines.
+        :param around: False to paint only the row and the column of every hostile player.
+        """
+        self.maxWeight = maxWeight
+        self.hostile = list(hostile)
+        self.blocking = frozenset(blocking)
+        self.around = around
+
+
+def threatViews(game, views):
+    """
+    Weighted maps seen from several sides, computed from scratch in one pass: the static terrain weights, the players
+    laid over them and the fire lines of the hostile players of every view, half weight on their row and column and a
+    quarter around them. The strongest fire line crossing a cell decides its weight.
+    The layers are refreshed once, the terrain with the players is weighted once for every maxWeight, the players that
+    stop the fire lines cut the segments once for every set of them and every ray is bounded once for every set.
+    :param views: list of threatSpec.
+    :return: list of (weights, painted), one per view: (height, width) int array and the bool array of the fire line
+    cells.
+    """
+    grid, static, dynamic = mapLayers(game)
+    height, width = grid.shape
+    players = dynamic.cells()
+    terrains = dict()
+    cuts = dict()
+    lines = dict()
+
+    result = []
+    for view in views:
+        if view.maxWeight not in terrains:
+            table = terrainTable(view.maxWeight, game)
+            terrain = static.terrainWeights(view.maxWeight, game).copy()
+            terrain[static.hidden] = table[grid[static.hidden]]
+            terrain[players] = table[grid[players]]
+            terrains[view.maxWeight] = terrain
+        if view.blocking not in cuts:
+            cuts[view.blocking] = (static.segments.cuts(dynamic.cells(view.blocking)), dict())
+        blockers, known = cuts[view.blocking]
+
+        weights = terrains[view.maxWeight].copy()
+        painted = np.zeros(grid.shape, dtype=bool)
+        flatWeights, flatPainted = weights.reshape(-1), painted.reshape(-1)
+        rays = []
+        for player in view.hostile:
+            if player.state == "ACTIVE":
+                if (player.y, player.x) not in lines:
+                    lines[(player.y, player.x)] = fireLines(player.y, player.x, height, width)
+                rays.append(lines[(player.y, player.x)])
+        for main, _ in rays:
+            paintRays(flatWeights, flatPainted, rayCells(main, static.segments, blockers, known),
+                      int(view.maxWeight / 2))
+        if view.around:
+            for _, others in rays:
+                paintRays(flatWeights, flatPainted, rayCells(others, static.segments, blockers, known),
+                          int(view.maxWeight / 4))
+        result.append((weights, painted))
+    return result
+
+
+def threatView(maxWeight, game, hostile, blocking, around=True):
+    """
+    Weighted map seen from one side, computed from scratch (see threatViews).
+    :param hostile: the Players whose fire lines are painted (only the active ones).
+    :param blocking: the symbols of the players that stop the fire lines.
+    :param around: False to paint only the row and the column of every hostile player.
+    :return: (weights, painted): (height, width) int array and the bool array of the fire line cells.
+    """
+    return threatViews(game, [threatSpec(maxWeight, hostile, blocking, around)])[0]
+
+
+class fireLineMap(object):
+    """
+    Weighted map of one side kept up to date move by move. Every cell counts the half weight and the quarter weight
+    fire lines crossing it: after a LOOK only the lines of the hostile players that moved, and of the ones whose
+    segments a moving blocker entered or left, are cleared and painted again, and only the rows with a cell whose
+    weight changed are built again in the weighted map. The strongest line crossing a cell decides its weight, as in
+    threatView.
+    """
+
+    def __init__(self, maxWeight, hostile, blocking):
+        """
+        :param hostile: the Game attribute with the hostile players ('enemies' or 'allies').
+        :param blocking: the Game attribute with the players that stop their fire lines.
+        """
+        self.maxWeight = maxWeight
+        self.hostile = hostile
+        self.blocking = blocking
+        self.static = None
+
+    def reset(self, grid, static, game):
+        """
+        Start again from a map without fire lines.
+        """
+        self.static = static
+        self.width = grid.shape[1]
+        # half and quarter weight lines crossing every cell, indexed by the flat cells
+        self.counts = np.zeros((2, grid.size), dtype=np.int16)
+        # hostile symbol -> ((x, y) of the painted lines, [(half or quarter, direction, segment, cells, rows), ...]):
+        # cells is a slice of the flat cells, rows the range (first, last) of the rows it crosses
+        self.rays = dict()
+        # blocking symbol -> (y, x)
+        self.blockers = dict()
+        # cells where the current map and not the terrain decides the weight: the hidden cells and the cells of the
+        # players laid at the last update
+        self.hidden = np.ravel_multi_index(static.hidden, grid.shape)
+        self.isHidden = np.zeros(grid.size, dtype=bool)
+        self.isHidden[self.hidden] = True
+        self.overlay = set()
+        # the symbols and the bytes of the terrain table of the last update
+        self.symbols = grid.ravel().copy()
+        self.table = None
+        self.terrain = static.terrainWeights(self.maxWeight, game).ravel()
+        self.base = self.terrain.copy()
+        self.weights = None
+        self.weightedMap = None
+
+    def update(self, game, grid, static, dynamic, table, bounds):
+        """
+        :param table: the terrainTable of the current game for self.maxWeight.
+        :param bounds: dict set of blocking symbols -> (cuts, known) of rayCells for the current map, shared by the
+        sides updated together and filled by the call.
+        :return: the weighted map of the current map, as a list of rows. The rows not changed since the previous
+        update are shared with the map it returned: they must not be edited.
+        """
+        if static is not self.static or grid.size != self.base.size:
+            self.reset(grid, static, game)
+        symbols = grid.ravel()
+
+        # players and hidden cells laid over the terrain, the cells left by the players go back to the terrain. The
+        # hidden cells are weighted again only where the map or the terrain table changed
+        if table.tobytes() != self.table:
+            hidden = self.hidden.tolist()
+            self.table = table.tobytes()
+        else:
+            hidden = self.hidden[symbols[self.hidden] != self.symbols[self.hidden]].tolist()
+        overlay = set(y * self.width + x for y, x in dynamic.positions.values())
+        # the rows with a cell whose weight may have changed
+        changed = np.zeros(grid.shape[0], dtype=bool)
+        for cell in chain(hidden, overlay, self.overlay - overlay):
+            symbol = symbols[cell]
+            weight = table[symbol] if cell in overlay or self.isHidden[cell] else self.terrain[cell]
+            # the cells without a weight keep their symbol, which may have changed
+            if weight != self.base[cell] or (weight == UNKNOWN and symbol != self.symbols[cell]):
+                self.base[cell] = weight
+                changed[cell // self.width] = True
+            self.symbols[cell] = symbol
+        self.overlay = overlay
+
+        # the segments entered or left by a blocker: the lines crossing them must be cut again
+        blocking = getattr(game, self.blocking)
+        blockers = dict((symbol, cell) for symbol, cell in dynamic.positions.items() if symbol in blocking)
+        moved = set(self.blockers.items()) ^ set(blockers.items())
+        self.blockers = blockers
+        segments = (set(int(static.segments.rowIds[y, x]) for _, (y, x) in moved),
+                    set(int(static.segments.columnIds[y, x]) for _, (y, x) in moved))
+
+        hostile = getattr(game, self.hostile)
+        dirty = set(symbol for symbol in self.rays if symbol not in hostile)
+        for symbol, player in hostile.items():
+            position = (player.x, player.y) if player.state == "ACTIVE" else None
+            if self.rays.get(symbol, (None,))[0] != position:
+                dirty.add(symbol)
+        if len(moved) > 0:
+            for symbol, (_, rays) in self.rays.items():
+                if any(segment in segments[direction == 'column'] for _, direction, segment, _, _ in rays):
+                    dirty.add(symbol)
+
+        if len(dirty) > 0:
+            key = frozenset(blockers)
+            if key not in bounds:
+                bounds[key] = (static.segments.cuts(dynamic.cells(key)), dict())
+            cuts, known = bounds[key]
+            height, width = grid.shape
+            # when most of the lines are painted again it is cheaper to start from empty counts and paint all of
+            # them than to clear the rays one by one
+            cleared = 2 * len(dirty.intersection(self.rays)) >= len(self.rays)
+            if cleared:
+                self.counts[:] = 0
+                dirty.update(self.rays)
+            for symbol in dirty:
+                _, rays = self.rays.pop(symbol, (None, []))
+                for kind, _, _, cells, (first, last) in rays:
+                    if not cleared:
+                        self.counts[kind, cells] -= 1
+                    changed[first:last] = True
+
+                player = hostile.get(symbol)
+                if player is None or player.state != "ACTIVE":
+                    continue
+                rays = []
+                for kind, selected in enumerate(fireLines(player.y, player.x, height, width)):
+                    for (direction, y, x), cells in zip(selected, rayCells(selected, static.segments, cuts, known)):
+                        if direction == 'row':
+                            segment = int(static.segments.rowIds[y, x])
+                            rows = (y, y + 1) if cells.start < cells.stop else (y, y)
+                        else:
+                            segment = int(static.segments.columnIds[y, x])
+                            rows = (cells.start // width, cells.stop // width)
+                        self.counts[kind, cells] += 1
+                        changed[rows[0]:rows[1]] = True
+                        rays.append((kind, direction, segment, cells, rows))
+                self.rays[symbol] = ((player.x, player.y), rays)
+
+        rows = np.flatnonzero(changed)
+        if self.weightedMap is None or 2 * len(rows) > grid.shape[0]:
+            # most of the rows may have changed: all of them are built again at once
+            self.weights = self.compose(np.s_[:])
+            self.weightedMap = weightsToMap(self.weights.reshape(grid.shape), grid)
+        elif len(rows) > 0:
+            # only the rows with a cell whose weight changed are built again (the symbol of the cells without a
+            # weight may have changed), the other ones are shared with the previous maps
+            cells = (rows[:, np.newaxis] * self.width + np.arange(self.width)).ravel()
+            weights = self.compose(cells)
+            different = ((weights != self.weights[cells]) | (weights == UNKNOWN)).reshape(len(rows), self.width)
+            rows = rows[different.any(axis=1)]
+            weights = weights.reshape(different.shape)[different.any(axis=1)]
+            self.weights.reshape(grid.shape)[rows] = weights
+            for y, row in zip(rows.tolist(), weightsToMap(weights, grid[rows])):
+                self.weightedMap[y] = row
+        return list(self.weightedMap)
+
+    def compose(self, cells):
+        """
+        :param cells: flat indices of the cells.
+        :return: their weights: the strongest fire line crossing them, the terrain if there is none.
+        """
+        half, quarter = self.counts
+        return np.where(half[cells] > 0, int(self.maxWeight / 2),
+                        np.where(quarter[cells] > 0, int(self.maxWeight / 4), self.base[cells]))
+
+
+def weightedViews(maxWeight, game, sides):
+    """
+    The weighted maps of some sides, each one updated incrementally from the previous call (see fireLineMap). The
+    layers are refreshed and the terrain table is built once for all of them, the rays are bounded through rayCells
+    once for every set of blocking players, as in threatViews.
+    :param sides: list of (hostile, blocking): the Game attribute with the hostile players ('enemies' or 'allies') and
+    the one with the players that stop their fire lines.
+    :return: list of weighted maps as lists of rows, one per side.
+    """
+    grid, static, dynamic = mapLayers(game)
+    table = terrainTable(maxWeight, game)
+    bounds = dict()
+    maps = []
+    for hostile, blocking in sides:
+        key = (hostile, blocking, maxWeight)
+        lines = dynamic.fireLines.get(key)
+        if lines is None:
+            lines = fireLineMap(maxWeight, hostile, blocking)
+            dynamic.fireLines[key] = lines
+        maps.append(lines.update(game, grid, static, dynamic, table, bounds))
+    return maps
+
+
+def weightedView(maxWeight, game, hostile, blocking):
+    """
+    The weighted map of one side, updated incrementally from the previous call (see weightedViews).
+    :return: the weighted map as a list of rows.
+    """
+    return weightedViews(maxWeight, game, [(hostile, blocking)])[0]
+
+
+def weightsToMap(weights, grid):
+    """
+    :return: the weighted map as a list of rows, the cells without a weight keep their symbol.
+    """
+    weightedMap = weights.tolist()
+    for y, x in np.argwhere(weights == UNKNOWN).tolist():
+        weightedMap[y][x] = chr(grid[y, x])
+    return weightedMap
+
+
+def lineOfFire(game, blocking):
+    """
+    :param blocking: the symbols of the players that stop the fire lines.
+    :return: (segments, cuts) of the current map, for segments.canHit(shooter, target, cuts).
+    """
+    grid, static, dynamic = mapLayers(game)
+    return static.segments, static.segments.cuts(dynamic.cells(blocking))
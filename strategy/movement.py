@@ -1,5 +1,4 @@
 import random
-from strategy.pathFinder import *
 
 
 # The idea of using class for movement came out to standardize the code in Karen.
@@ -49,6 +48,8 @@ class rb_movement(movement):
         # for row in actualMap:
         #    print (row)
 
+        # pathfinding is imported at the first move, not when Karen is built
+        from strategy.pathFinder import findPath
         path = findPath(actualMap, player, endx, endy)
         if len(path) < 2:
             return None, None
@@ -1,7 +1,9 @@
+import numpy as np
 from scipy.spatial import distance
 
 from data_structure import gameStatus
 from data_structure.gameStatus import *
+from strategy.mapEngine import threatView, weightedView, weightedViews
 
 """
 Discourage Karen to allign with enemies. If there is no other way, go and shoot.
@@ -9,122 +11,12 @@ Discourage Karen to allign with enemies. If there is no other way, go and shoot.
 
 
 def deterministicMap(maxWeight):
-
-    value = [int(maxWeight / 2), int(maxWeight / 4)]
-    walkable = ["."]
-    river = ["~"]
-    trap = ["!"]
-    obstacles = ["#", "@"]
-    recharge = ["$"]
-    barrier = ["&"]
-    allies = gameStatus.game.allies.keys()
-    enemies = gameStatus.game.enemies.keys()
-    serverMap = gameStatus.game.serverMap
-    weightedMap = [row[:] for row in serverMap]
-
-    def recursiveMap(count, j, rec_weightedMap, weight):
-        """
-        Recursive map generation. Resamble Cellular Automata decision adding weight to the map consistently with the distance from enemies
-        :param count: the horizontal coordinate
-        :param j: the vertical coordinate
-        :param rec_weightedMap: the map
-        :param weight: the weight of being in [i:,:j] position
-        :return: a weighted map
-        """
-        # da  muro a nemico
-        for position in range(enemy.x, -1, -1):
-            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
-                    rec_weightedMap[count][position] not in list(allies):
-                if isinstance(rec_weightedMap[count][position], int) is False:
-                    rec_weightedMap[count][position] = weight
-            else:
-                break
-
-        # da nemico a muro
-        for position in range(enemy.x, len(rec_weightedMap[count])):
-            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
-                    rec_weightedMap[count][position] not in list(allies):
-                if isinstance(rec_weightedMap[count][position], int) is False:
-                    rec_weightedMap[count][position] = weight
-            else:
-                break
-
-        # Controllo per colonne
-        for position in range(enemy.y, -1, -1):
-            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
-                    rec_weightedMap[position][j] not in list(allies):
-                if isinstance(rec_weightedMap[position][j], int) is False:
-                    rec_weightedMap[position][j] = weight
-            else:
-                break
-        # print("POS ENEMY: " + str(enemy.x) + " " +str(enemy.y) +  "j value : " + str(j) + " max for value " + str(len(rec_weightedMap[j])))
-        for position in range(enemy.y, len(rec_weightedMap)):
-            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
-                    rec_weightedMap[position][j] not in list(allies):
-                if isinstance(rec_weightedMap[position][j], int) is False:
-                    rec_weightedMap[position][j] = weight
-            else:
-                break
-
-        return rec_weightedMap
-
-    # ---------------------------------------------------------------------------------------------------
-    # For each enemy that is still alive, create a weighted map assigning value to all the position in the map around the enemy
-    for enemykey in gameStatus.game.enemies.keys():
-        enemy = gameStatus.game.enemies.get(enemykey)
-        if enemy.state == "ACTIVE":
-            # First call to assign weight to the enemy's 'x column' and 'y row' coordinate
-            weightedMap = recursiveMap(enemy.y, enemy.x, weightedMap, int(maxWeight / 2))
-
-            # Recursive calls giving the already weighted to assign weight to all the coordinate around the enemy player
-            if enemy.y - 1 >= 0:
-                if enemy.x - 1 >= 0:
-                    weightedMap = recursiveMap(enemy.y - 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
-                if enemy.x + 1 < gameStatus.game.mapWidth:
-                    weightedMap = recursiveMap(enemy.y - 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
-
-            if enemy.y + 1 < gameStatus.game.mapHeight:
-                if enemy.x - 1 >= 0:
-                    weightedMap = recursiveMap(enemy.y + 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
-                if enemy.x + 1 < len(weightedMap[0]):
-                    weightedMap = recursiveMap(enemy.y + 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
-
-    # For each position, assign different weight considering their nature
-    for i in range(0, gameStatus.game.mapHeight):
-        for j in range(0, gameStatus.game.mapWidth):
-
-            if weightedMap[i][j] in value:
-                None
-
-            elif serverMap[i][j] in walkable:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] in river:
-                weightedMap[i][j] = int(maxWeight / 3)
-
-            elif serverMap[i][j] in trap:
-                weightedMap[i][j] = int(maxWeight)
-
-            elif serverMap[i][j] in obstacles:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] in recharge:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] in barrier:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] == gameStatus.game.wantedFlagName:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] == gameStatus.game.toBeDefendedFlagName:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] in allies or serverMap[i][j] in enemies or serverMap[i][
-                j] == gameStatus.game.me.symbol:
-                weightedMap[i][j] = 1
-
-    return weightedMap
+    """
+    Weighted map of the loyal Karen, updated by the vectorized engine from the previous one (see strategy/mapEngine.py):
+    the fire lines are the ones of the enemies, stopped by the allies.
+    :return: the weighted map as a list of rows.
+    """
+    return weightedView(maxWeight, gameStatus.game, 'enemies', 'allies')
 
 
 """
@@ -133,122 +25,21 @@ Same as deterministic map. here the map is computed considering allies as enemie
 
 
 def deterministicImpostorMap(maxWeight):
+    """
+    :return: the weighted map of the impostor as a list of rows: the fire lines are the ones of the allies, stopped by
+    the enemies.
+    """
+    return weightedView(maxWeight, gameStatus.game, 'allies', 'enemies')
 
-    value = [int(maxWeight / 2), int(maxWeight / 4)]
-    walkable = ["."]
-    river = ["~"]
-    trap = ["!"]
-    obstacles = ["#", "@"]
-    recharge = ["$"]
-    barrier = ["&"]
-    enemies = gameStatus.game.allies.keys()
-    allies = gameStatus.game.enemies.keys()
-    serverMap = gameStatus.game.serverMap
-    weightedMap = [row[:] for row in serverMap]
-
-    def recursiveMap(count, j, rec_weightedMap, weight):
-        """
-        Recursive map generation. Resamble Cellular Automata decision adding weight to the map consistently with the distance from enemies
-        :param count: the horizontal coordinate
-        :param j: the vertical coordinate
-        :param rec_weightedMap: the map
-        :param weight: the weight of being in [i:,:j] position
-        :return: a weighted map
-        """
-        # da  muro a nemico
-        for position in range(enemy.x, -1, -1):
-            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
-                    rec_weightedMap[count][position] not in list(allies):
-                if isinstance(rec_weightedMap[count][position], int) is False:
-                    rec_weightedMap[count][position] = weight
-            else:
-                break
-
-        # da nemico a muro
-        for position in range(enemy.x, len(rec_weightedMap[count])):
-            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
-                    rec_weightedMap[count][position] not in list(allies):
-                if isinstance(rec_weightedMap[count][position], int) is False:
-                    rec_weightedMap[count][position] = weight
-            else:
-                break
-
-        # Controllo per colonne
-        for position in range(enemy.y, -1, -1):
-            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
-                    rec_weightedMap[position][j] not in list(allies):
-                if isinstance(rec_weightedMap[position][j], int) is False:
-                    rec_weightedMap[position][j] = weight
-            else:
-                break
-        # print("POS ENEMY: " + str(enemy.x) + " " +str(enemy.y) +  "j value : " + str(j) + " max for value " + str(len(rec_weightedMap[j])))
-        for position in range(enemy.y, len(rec_weightedMap)):
-            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
-                    rec_weightedMap[position][j] not in list(allies):
-                if isinstance(rec_weightedMap[position][j], int) is False:
-                    rec_weightedMap[position][j] = weight
-            else:
-                break
-
-        return rec_weightedMap
-
-    # ---------------------------------------------------------------------------------------------------
-    # For each enemy that is still alive, create a weighted map assigning value to all the position in the map around the enemy
-    for enemykey in gameStatus.game.allies.keys():
-        enemy = gameStatus.game.allies.get(enemykey)
-        if enemy.state == "ACTIVE":
-            # First call to assign weight to the enemy's 'x column' and 'y row' coordinate
-            weightedMap = recursiveMap(enemy.y, enemy.x, weightedMap, int(maxWeight / 2))
-
-            # Recursive calls giving the already weighted to assign weight to all the coordinate around the enemy player
-            if enemy.y - 1 >= 0:
-                if enemy.x - 1 >= 0:
-                    weightedMap = recursiveMap(enemy.y - 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
-                if enemy.x + 1 < gameStatus.game.mapWidth:
-                    weightedMap = recursiveMap(enemy.y - 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
-
-            if enemy.y + 1 < gameStatus.game.mapHeight:
-                if enemy.x - 1 >= 0:
-                    weightedMap = recursiveMap(enemy.y + 1, enemy.x - 1, weightedMap, int(maxWeight / 4))
-                if enemy.x + 1 < len(weightedMap[0]):
-                    weightedMap = recursiveMap(enemy.y + 1, enemy.x + 1, weightedMap, int(maxWeight / 4))
-
-    # For each position, assign different weight considering their nature
-    for i in range(0, gameStatus.game.mapHeight):
-        for j in range(0, gameStatus.game.mapWidth):
 
-            if weightedMap[i][j] in value:
-                None
-
-            elif serverMap[i][j] in walkable:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] in river:
-                weightedMap[i][j] = int(maxWeight / 3)
-
-            elif serverMap[i][j] in trap:
-                weightedMap[i][j] = int(maxWeight)
-
-            elif serverMap[i][j] in obstacles:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] in recharge:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] in barrier:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] == gameStatus.game.wantedFlagName:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] == gameStatus.game.toBeDefendedFlagName:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] in allies or serverMap[i][j] in enemies or serverMap[i][
-                j] == gameStatus.game.me.symbol:
-                weightedMap[i][j] = 1
-
-    return weightedMap
+def deterministicMaps(maxWeight):
+    """
+    The weighted maps of the loyal Karen and of the impostor, updated together (see deterministicMap and
+    deterministicImpostorMap).
+    :return: (loyal weighted map, impostor weighted map).
+    """
+    loyal, impostor = weightedViews(maxWeight, gameStatus.game, [('enemies', 'allies'), ('allies', 'enemies')])
+    return loyal, impostor
 
 
 """
@@ -257,120 +48,25 @@ Given a list of players, find the coordinates needed to go to kill them
 
 
 def findFireLineCoordinateForKilling(playerList):
-
-    walkable = ["."]
-    river = ["~"]
-    trap = ["!"]
-    obstacles = ["#", "@"]
-    recharge = ["$"]
-    barrier = ["&"]
-    allies = gameStatus.game.allies.keys()
-    enemies = playerList
-    serverMap = gameStatus.game.serverMap
-    weightedMap = [row[:] for row in serverMap]
+    """
+    :param playerList: the symbols of the enemies to kill.
+    :return: (x, y) of the cell on their fire lines nearest to the flag to defend, (0, 0) if there is none nearer
+    than the width of the map.
+    """
     maxWeight = 32
-    value = [int(maxWeight / 2), int(maxWeight / 4)]
-
-    def recursiveMap(count, j, rec_weightedMap, weight):
-        """
-        Recursive map generation. Resamble Cellular Automata decision adding weight to the map consistently with the distance from enemies
-        :param count: the horizontal coordinate
-        :param j: the vertical coordinate
-        :param rec_weightedMap: the map
-        :param weight: the weight of being in [i:,:j] position
-        :return: a weighted map
-        """
-        # da  muro a nemico
-        for position in range(enemy.x, -1, -1):
-            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
-                    rec_weightedMap[count][position] not in list(allies):
-                if isinstance(rec_weightedMap[count][position], int) is False:
-                    rec_weightedMap[count][position] = weight
-            else:
-                break
-
-        # da nemico a muro
-        for position in range(enemy.x, len(rec_weightedMap[count])):
-            if rec_weightedMap[count][position] != '#' and rec_weightedMap[count][position] != "&" and \
-                    rec_weightedMap[count][position] not in list(allies):
-                if isinstance(rec_weightedMap[count][position], int) is False:
-                    rec_weightedMap[count][position] = weight
-            else:
-                break
-
-        # Controllo per colonne
-        for position in range(enemy.y, -1, -1):
-            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
-                    rec_weightedMap[position][j] not in list(allies):
-                if isinstance(rec_weightedMap[position][j], int) is False:
-                    rec_weightedMap[position][j] = weight
-            else:
-                break
-        # print("POS ENEMY: " + str(enemy.x) + " " +str(enemy.y) +  "j value : " + str(j) + " max for value " + str(len(rec_weightedMap[j])))
-        for position in range(enemy.y, len(rec_weightedMap)):
-            if rec_weightedMap[position][j] != '#' and rec_weightedMap[position][j] != "&" and \
-                    rec_weightedMap[position][j] not in list(allies):
-                if isinstance(rec_weightedMap[position][j], int) is False:
-                    rec_weightedMap[position][j] = weight
-            else:
-                break
-
-        return rec_weightedMap
-
-    # ---------------------------------------------------------------------------------------------------
-    # For each enemy that is still alive, create a weighted map assigning value to all the position in the map around the enemy
-    for enemykey in enemies:
-        enemy = gameStatus.game.enemies.get(enemykey)
-        if enemy.state == "ACTIVE":
-            # First call to assign weight to the enemy's 'x column' and 'y row' coordinate
-            weightedMap = recursiveMap(enemy.y, enemy.x, weightedMap, int(maxWeight / 2))
-
-
-    # For each position, assign different weight considering their nature
-    for i in range(0, gameStatus.game.mapHeight):
-        for j in range(0, gameStatus.game.mapWidth):
-
-            if weightedMap[i][j] in value:
-                None
-
-            elif serverMap[i][j] in walkable:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] in river:
-                weightedMap[i][j] = int(maxWeight / 3)
-
-            elif serverMap[i][j] in trap:
-                weightedMap[i][j] = int(maxWeight)
-
-            elif serverMap[i][j] in obstacles:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] in recharge:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] in barrier:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] == gameStatus.game.wantedFlagName:
-                weightedMap[i][j] = 1
-
-            elif serverMap[i][j] == gameStatus.game.toBeDefendedFlagName:
-                weightedMap[i][j] = 0
-
-            elif serverMap[i][j] in allies or serverMap[i][j] in enemies or serverMap[i][
-                j] == gameStatus.game.me.symbol:
-                weightedMap[i][j] = 1
-
-    coordinateForKilling = [gameStatus.game.mapWidth, 0, 0]
-    for i in range(0, gameStatus.game.mapHeight):
-       for j in range(0, gameStatus.game.mapWidth):
-
-        if gameStatus.game.weightedMap[i][j] == maxWeight / 2:
-            manhattan = distance.cityblock([gameStatus.game.toBeDefendedFlagX, gameStatus.game.toBeDefendedFlagY], [j, i])
-            if  coordinateForKilling[0] > int(manhattan):
-                coordinateForKilling = [int(manhattan), j, i]
-
-    return coordinateForKilling[1], coordinateForKilling[2]
+    weights, _ = threatView(maxWeight, gameStatus.game, [gameStatus.game.enemies.get(k) for k in playerList],
+                            gameStatus.game.allies.keys(), around=False)
+
+    cells = np.argwhere(weights == maxWeight / 2)
+    if len(cells) == 0:
+        return 0, 0
+    manhattan = np.abs(cells[:, 1] - gameStatus.game.toBeDefendedFlagX) + \
+        np.abs(cells[:, 0] - gameStatus.game.toBeDefendedFlagY)
+    # the first cell in row order wins the ties
+    nearest = int(np.argmin(manhattan))
+    if manhattan[nearest] >= gameStatus.game.mapWidth:
+        return 0, 0
+    return int(cells[nearest, 1]), int(cells[nearest, 0])
 
 
 """
@@ -1,3 +1,5 @@
+from threading import local
+
 from pathfinding.core.diagonal_movement import DiagonalMovement
 from pathfinding.core.grid import Grid
 from pathfinding.finder.bi_a_star import BiAStarFinder  # the best one
@@ -15,6 +17,24 @@ from pathfinding.finder.ida_star import IDAStarFinder
 # You can use negative values to describe different types of obstacles.
 # It does not make a difference for the path finding algorithm but it might be useful for your later map evaluation.
 
+# The Grid of the last weighted map searched by every thread: Karen searches the same map for several steps, and the
+# playersAnalyzer thread must not share the nodes of the main thread.
+lastGrid = local()
+
+
+def gridOf(weightedMap):
+    """
+    :param weightedMap: the weighted and parsed map.
+    :return: a Grid of the map, built once per map (building it costs more than cleaning its nodes up).
+    """
+    cached = getattr(lastGrid, 'cached', None)
+    if cached is not None and cached[0] is weightedMap:
+        cached[1].cleanup()
+        return cached[1]
+    grid = Grid(matrix=weightedMap)
+    lastGrid.cached = (weightedMap, grid)
+    return grid
+
 
 def findPath4Fuzzy(weightedMap, startx, starty, endx, endy):
     """
@@ -26,7 +46,7 @@ def findPath4Fuzzy(weightedMap, startx, starty, endx, endy):
     :return: next position coordinates
     """
 
-    grid = Grid(matrix=weightedMap)
+    grid = gridOf(weightedMap)
 
     start = grid.node(startx, starty)
     end = grid.node(endx, endy)
@@ -55,7 +75,7 @@ def findPath(weightedMap, player, endx, endy):
     """
 
 
-    grid = Grid(matrix=weightedMap)
+    grid = gridOf(weightedMap)
 
     start = grid.node(player.x, player.y)
     end = grid.node(endx, endy)